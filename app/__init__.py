@@ -1,6 +1,16 @@
-from flask import Flask, session
+from flask import Flask, current_app, session
 from .config import Config
 from .extensions import db, mail, setup_jinja_filters
+from .instrumentation import init_instrumentation
+from .nplusone import init_nplusone
+from .notifications import init_notification_templates, init_webhook_registry
+from .digests import init_notification_routing
+from .analytics import init_report_cache
+from .lifecycle import LIFECYCLE_COLUMNS
+from .sla import init_sla, load_sla_monitor
+from .assignment import init_assignment, load_workload_index
+from .duplicates import init_duplicates, load_duplicate_index
+from .uploads import StreamingUploadRequest
 from datetime import datetime
 from sqlalchemy import inspect, text
 
@@ -17,9 +27,12 @@ def inject_current_year():
 # --------------------------
 # Create Flask App
 # --------------------------
-def create_app():
+def create_app(config_object=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_object)
+
+    # Stream file uploads straight to disk with incremental checks
+    app.request_class = StreamingUploadRequest
 
     # Initialize extensions
     db.init_app(app)
@@ -31,6 +44,19 @@ def create_app():
     # Register context processor
     app.context_processor(inject_current_year)
 
+    # Compile notification email templates once
+    init_notification_templates(app)
+    init_webhook_registry(app)
+    init_notification_routing(app)
+    init_report_cache(app)
+    init_sla(app)
+    init_assignment(app)
+    init_duplicates(app)
+
+    # Register maintenance CLI commands
+    from .cli import register_commands
+    register_commands(app)
+
     # Import and register blueprints
     from .routes.main import main_bp
     from .routes.user import user_bp
@@ -49,6 +75,22 @@ def create_app():
         db.create_all()
         ensure_schema()
 
+        # Index open complaints' SLA deadlines
+        if app.config.get('SLA_ENABLED'):
+            load_sla_monitor(app)
+
+        # Open workload per admin for auto-assignment
+        load_workload_index(app)
+
+        # Signatures of open complaints for duplicate detection
+        load_duplicate_index(app)
+
+        # Per-endpoint latency and SQL metrics (/metrics)
+        init_instrumentation(app)
+
+        # Repeated-statement (N+1) detection for tests and staging
+        init_nplusone(app)
+
     return app
 
 
@@ -69,6 +111,11 @@ def ensure_schema():
         statements.append('ALTER TABLE complaints ADD COLUMN resolution_notes TEXT')
     if 'archived' not in complaint_columns:
         statements.append("ALTER TABLE complaints ADD COLUMN archived BOOLEAN NOT NULL DEFAULT FALSE")
+    for column in LIFECYCLE_COLUMNS:
+        if column not in complaint_columns:
+            statements.append(f'ALTER TABLE complaints ADD COLUMN {column} TIMESTAMP')
+    if 'duplicate_of_id' not in complaint_columns:
+        statements.append('ALTER TABLE complaints ADD COLUMN duplicate_of_id INTEGER')
 
     # Complaint logs table updates
     if 'target_admin_id' not in log_columns:
@@ -113,3 +160,46 @@ def ensure_schema():
             db.session.commit()
         except Exception:
             db.session.rollback()
+
+    # Digest outbox leases (column added after the notification queue)
+    queue_columns = {col['name'] for col in inspector.get_columns('notification_queue')}
+    if 'claimed_at' not in queue_columns:
+        try:
+            db.session.execute(text('ALTER TABLE notification_queue ADD COLUMN claimed_at TIMESTAMP'))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+
+    # Attachment thumbnails (table added after the content-addressed store)
+    attachment_columns = {col['name'] for col in inspector.get_columns('attachments')}
+    if 'thumbnail_path' not in attachment_columns:
+        try:
+            db.session.execute(text('ALTER TABLE attachments ADD COLUMN thumbnail_path VARCHAR(120)'))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+
+    # Keyset pagination index for activity logs
+    try:
+        db.session.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_complaint_logs_timestamp_id '
+            'ON complaint_logs ("timestamp", id)'
+        ))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+    # Lifecycle timestamp indexes (timing metrics aggregate these columns)
+    # the status index the SLA monitor loads open complaints through
+    # and the duplicate parent lookup
+    for column in LIFECYCLE_COLUMNS + ('status', 'duplicate_of_id'):
+        try:
+            db.session.execute(text(f'CREATE INDEX IF NOT EXISTS ix_complaints_{column} ON complaints ({column})'))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+
+    # Optional monthly partitioning of activity logs
+    if current_app.config.get('LOG_PARTITIONING'):
+        from .partitions import ensure_log_partitions
+        ensure_log_partitions(current_app.config.get('LOG_PARTITION_MONTHS_AHEAD', 3))
@@ -0,0 +1,404 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import case, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.sql.visitors import InternalTraversal
+from sqlalchemy.types import DateTime, Float, Integer, TypeDecorator
+from .extensions import db
+from .models import Complaint, ComplaintTag, Lab, Tag
+
+BUCKET_UNITS = ('day', 'week', 'month', 'year')
+# Unix epoch (1970-01-01) was a Thursday; weeks start on Monday like date_trunc('week')
+_EPOCH_MONDAY_OFFSET = 4 * 86400
+
+# Resolution-time histogram: (label, upper bound in hours); the last bucket is open-ended
+RESOLUTION_BUCKETS = (
+    ('0-1h', 1), ('1-3h', 3), ('3-8h', 8), ('8-24h', 24),
+    ('1-3d', 72), ('3-7d', 168), ('7d+', None)
+)
+RESOLUTION_PERCENTILES = (0.5, 0.9, 0.99)
+
+# Trend breakdowns: series key -> column grouped on
+TREND_BREAKDOWNS = {
+    'lab': Lab.name,
+    'category': Complaint.category,
+    'status': Complaint.status
+}
+TREND_MAX_BUCKETS = 366
+
+
+# --------------------------
+# SQL Expressions
+# --------------------------
+def dialect_name():
+    return db.session.get_bind().dialect.name
+
+def supports_percentile_cont():
+    """Ordered-set aggregates (percentile_cont ... WITHIN GROUP) are PostgreSQL-only here."""
+    return dialect_name() == 'postgresql'
+
+class elapsed_seconds(FunctionElement):
+    """Seconds between two timestamp columns: elapsed_seconds(start, end)."""
+    type = Float()
+    inherit_cache = True
+
+@compiles(elapsed_seconds)
+def _elapsed_seconds_default(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return f"EXTRACT(EPOCH FROM ({compiler.process(end, **kw)} - {compiler.process(start, **kw)}))"
+
+@compiles(elapsed_seconds, 'sqlite')
+def _elapsed_seconds_sqlite(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return (f"(CAST(strftime('%s', {compiler.process(end, **kw)}) AS INTEGER)"
+            f" - CAST(strftime('%s', {compiler.process(start, **kw)}) AS INTEGER))")
+
+class BucketStart(TypeDecorator):
+    """
+    Result type of time_bucket(): a naive UTC datetime on every dialect
+    (SQLite returns the bucket as integer epoch seconds).
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'sqlite':
+            return dialect.type_descriptor(Integer())
+        return dialect.type_descriptor(DateTime())
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, datetime):
+            return value
+        return datetime.utcfromtimestamp(int(value))
+
+class time_bucket(FunctionElement):
+    """
+    Start of the day/week/month/year containing a timestamp:
+    time_bucket('month', Complaint.created_at). Group and order by it.
+    """
+    type = BucketStart()
+    inherit_cache = True
+    # unit is rendered into the SQL, so it must be part of the statement cache key
+    _traverse_internals = FunctionElement._traverse_internals + [('unit', InternalTraversal.dp_string)]
+
+    def __init__(self, unit, column, **kw):
+        if unit not in BUCKET_UNITS:
+            raise ValueError(f"Unsupported time bucket: {unit}")
+        self.unit = unit
+        super().__init__(column, **kw)
+
+@compiles(time_bucket)
+def _time_bucket_default(element, compiler, **kw):
+    column, = list(element.clauses)
+    return f"date_trunc('{element.unit}', {compiler.process(column, **kw)})"
+
+@compiles(time_bucket, 'sqlite')
+def _time_bucket_sqlite(element, compiler, **kw):
+    column = compiler.process(list(element.clauses)[0], **kw)
+    if element.unit == 'day':
+        return f"((CAST(strftime('%s', {column}) AS INTEGER) / 86400) * 86400)"
+    if element.unit == 'week':
+        return (f"(((CAST(strftime('%s', {column}) AS INTEGER) - {_EPOCH_MONDAY_OFFSET}) / 604800) * 604800"
+                f" + {_EPOCH_MONDAY_OFFSET})")
+    return f"CAST(strftime('%s', {column}, 'start of {element.unit}') AS INTEGER)"
+
+
+# --------------------------
+# Filters
+# --------------------------
+def complaint_filters(lab_id=None, category=None, date_from=None, date_to=None):
+    """
+    SQL criteria for report filters. date_from/date_to bound created_at
+    (date_to is exclusive; pass the day after for an inclusive end date).
+    """
+    criteria = []
+    if lab_id:
+        criteria.append(Complaint.lab_id == lab_id)
+    if category:
+        criteria.append(Complaint.category == category)
+    if date_from:
+        criteria.append(Complaint.created_at >= date_from)
+    if date_to:
+        criteria.append(Complaint.created_at < date_to)
+    return criteria
+
+
+# --------------------------
+# Resolution Time
+# --------------------------
+def _percentiles_in_order(seconds, criteria, count):
+    """
+    Linear-interpolated percentiles (same definition as percentile_cont) for
+    databases without ordered-set aggregates: each one reads at most two
+    rows at its rank from an ORDER BY ... LIMIT 2 OFFSET k query.
+    """
+    values = {}
+    for fraction in RESOLUTION_PERCENTILES:
+        position = fraction * (count - 1)
+        offset = int(position)
+        rows = db.session.query(seconds).filter(*criteria)\
+            .order_by(seconds.asc()).limit(2).offset(offset).all()
+        if not rows:
+            values[fraction] = None
+            continue
+        lower = rows[0][0]
+        upper = rows[1][0] if len(rows) > 1 else lower
+        values[fraction] = lower + (upper - lower) * (position - offset)
+    return values
+
+def resolution_stats(criteria=()):
+    """
+    Resolution-time statistics for resolved complaints matching criteria,
+    computed in the database: count, avg/min/max seconds, the
+    RESOLUTION_BUCKETS histogram and p50/p90/p99. PostgreSQL does it all in
+    one aggregate query (percentile_cont); elsewhere the percentiles take
+    one small extra query each.
+    :return: dict
+    """
+    seconds = elapsed_seconds(Complaint.created_at, Complaint.resolved_at)
+    criteria = [Complaint.resolved_at.isnot(None), *criteria]
+
+    columns = [
+        func.count().label('count'),
+        func.avg(seconds).label('avg'),
+        func.min(seconds).label('min'),
+        func.max(seconds).label('max')
+    ]
+    lower = None
+    for label, upper in RESOLUTION_BUCKETS:
+        conditions = []
+        if lower is not None:
+            conditions.append(seconds >= lower * 3600)
+        if upper is not None:
+            conditions.append(seconds < upper * 3600)
+        columns.append(func.sum(case((db.and_(*conditions), 1), else_=0)).label(label))
+        lower = upper
+
+    ordered_set = supports_percentile_cont()
+    if ordered_set:
+        columns += [
+            func.percentile_cont(fraction).within_group(seconds.asc()).label(f'p{int(fraction * 100)}')
+            for fraction in RESOLUTION_PERCENTILES
+        ]
+
+    row = db.session.query(*columns).filter(*criteria).one()._mapping
+    count = row['count'] or 0
+
+    if ordered_set:
+        percentiles = {fraction: row[f'p{int(fraction * 100)}'] for fraction in RESOLUTION_PERCENTILES}
+    elif count:
+        percentiles = _percentiles_in_order(seconds, criteria, count)
+    else:
+        percentiles = {fraction: None for fraction in RESOLUTION_PERCENTILES}
+
+    return {
+        'count': count,
+        'avg_seconds': float(row['avg']) if row['avg'] is not None else None,
+        'min_seconds': float(row['min']) if row['min'] is not None else None,
+        'max_seconds': float(row['max']) if row['max'] is not None else None,
+        'buckets': {label: int(row[label] or 0) for label, _ in RESOLUTION_BUCKETS},
+        'percentiles': {
+            f'p{int(fraction * 100)}': float(value) if value is not None else None
+            for fraction, value in percentiles.items()
+        }
+    }
+
+def admin_workload_stats(admin_ids):
+    """
+    Per-admin totals over complaints currently assigned to them, in one
+    grouped query: assigned, resolved, in progress, and the mean time from
+    submission to first assignment.
+    :return: {admin_id: row}
+    """
+    if not admin_ids:
+        return {}
+    rows = db.session.query(
+        Complaint.assigned_admin_id.label('admin_id'),
+        func.count(Complaint.id).label('total_assigned'),
+        func.sum(case((Complaint.status == 'Resolved', 1), else_=0)).label('resolved_count'),
+        func.sum(case((Complaint.status == 'In Progress', 1), else_=0)).label('in_progress_count'),
+        func.avg(elapsed_seconds(Complaint.created_at, Complaint.first_assigned_at)).label('response_seconds')
+    ).filter(Complaint.assigned_admin_id.in_(admin_ids)).group_by(Complaint.assigned_admin_id)
+    return {row.admin_id: row for row in rows}
+
+def average_resolution_seconds(criteria=()):
+    """Mean resolution time of resolved complaints, or None if there are none."""
+    value = db.session.query(func.avg(elapsed_seconds(Complaint.created_at, Complaint.resolved_at)))\
+        .filter(Complaint.resolved_at.isnot(None), *criteria).scalar()
+    return float(value) if value is not None else None
+
+
+# --------------------------
+# Counts Over Time
+# --------------------------
+def counts_by_bucket(unit, criteria=(), limit=None):
+    """
+    Complaint counts per time bucket of created_at, oldest first.
+    :return: list of (bucket start datetime, count)
+    """
+    bucket = time_bucket(unit, Complaint.created_at).label('bucket')
+    query = db.session.query(bucket, func.count(Complaint.id).label('count'))\
+        .filter(*criteria).group_by(bucket).order_by(bucket)
+    if limit:
+        query = query.limit(limit)
+    return [(row.bucket, row.count) for row in query]
+
+
+# --------------------------
+# Tags
+# --------------------------
+def tag_counts(criteria=(), limit=None):
+    """
+    Complaints per tag, most used first, from complaint_tags (the
+    complaints table is only joined when there are criteria).
+    :return: list of (tag name, count)
+    """
+    count = func.count(ComplaintTag.complaint_id).label('count')
+    query = db.session.query(Tag.name, count).join(ComplaintTag, ComplaintTag.tag_id == Tag.id)
+    if criteria:
+        query = query.join(Complaint, Complaint.id == ComplaintTag.complaint_id).filter(*criteria)
+    query = query.group_by(Tag.name).order_by(count.desc(), Tag.name)
+    if limit:
+        query = query.limit(limit)
+    return [(row.name, row.count) for row in query]
+
+
+# --------------------------
+# Trends
+# --------------------------
+def floor_bucket(unit, moment):
+    """Python twin of time_bucket(): start of the bucket containing moment."""
+    day = datetime(moment.year, moment.month, moment.day)
+    if unit == 'day':
+        return day
+    if unit == 'week':
+        return day - timedelta(days=day.weekday())
+    if unit == 'month':
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+def next_bucket(unit, start):
+    if unit == 'day':
+        return start + timedelta(days=1)
+    if unit == 'week':
+        return start + timedelta(weeks=1)
+    if unit == 'month':
+        return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    return start.replace(year=start.year + 1)
+
+def bucket_range(unit, start, end):
+    """Bucket starts covering [start, end), i.e. the labels of a gap-filled series."""
+    buckets = []
+    current = floor_bucket(unit, start)
+    while current < end:
+        buckets.append(current)
+        current = next_bucket(unit, current)
+    return buckets
+
+def complaint_trend(unit, start, end, breakdown=None, criteria=()):
+    """
+    Complaints created in [start, end) per time bucket, optionally split into
+    one series per lab/category/status. The database returns only non-empty
+    (bucket, key) groups; every series is then filled with zeros so all of
+    them line up with `labels`.
+    :return: {'labels': [...], 'series': [{'key', 'counts', 'total'}], 'total': [...]}
+    """
+    if unit not in BUCKET_UNITS:
+        raise ValueError(f"Unsupported granularity: {unit}")
+    if breakdown is not None and breakdown not in TREND_BREAKDOWNS:
+        raise ValueError(f"Unsupported breakdown: {breakdown}")
+    buckets = bucket_range(unit, start, end)
+    if len(buckets) > TREND_MAX_BUCKETS:
+        raise ValueError(f"Range too large: {len(buckets)} {unit} buckets (max {TREND_MAX_BUCKETS})")
+
+    bucket = time_bucket(unit, Complaint.created_at).label('bucket')
+    groups = [bucket]
+    if breakdown:
+        groups.append(TREND_BREAKDOWNS[breakdown].label('key'))
+    query = db.session.query(*groups, func.count(Complaint.id).label('count'))
+    if breakdown == 'lab':
+        query = query.join(Lab, Lab.id == Complaint.lab_id)
+    rows = query.filter(Complaint.created_at >= start, Complaint.created_at < end, *criteria)\
+        .group_by(*groups).all()
+
+    index = {moment: position for position, moment in enumerate(buckets)}
+    series = {}
+    total = [0] * len(buckets)
+    for row in rows:
+        position = index.get(row.bucket)
+        if position is None:
+            continue
+        counts = series.setdefault(row.key if breakdown else 'all', [0] * len(buckets))
+        counts[position] += row.count
+        total[position] += row.count
+
+    return {
+        'labels': [moment.date().isoformat() for moment in buckets],
+        'series': [
+            {'key': key, 'counts': counts, 'total': sum(counts)}
+            for key, counts in sorted(series.items(), key=lambda item: (-sum(item[1]), str(item[0])))
+        ],
+        'total': total
+    }
+
+
+class ReportCache:
+    """
+    Small in-process TTL cache for report results, keyed by the request's
+    parameters (range, granularity, filters). Oldest entries are evicted
+    past max_entries.
+    """
+
+    def __init__(self, ttl=300, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get_or_compute(self, key, compute):
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and now - entry[0] <= self.ttl:
+            return entry[1]
+        value = compute()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                self._entries.pop(oldest, None)
+            self._entries[key] = (now, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def init_report_cache(app):
+    app.extensions['report_cache'] = ReportCache(app.config.get('REPORT_CACHE_TTL', 300))
+
+def cached_report(key, compute):
+    """compute() once per key per REPORT_CACHE_TTL (0 disables caching)."""
+    cache = current_app.extensions['report_cache']
+    if not cache.ttl:
+        return compute()
+    return cache.get_or_compute(key, compute)
+
+
+# --------------------------
+# Formatting
+# --------------------------
+def format_short_duration(seconds):
+    """45m, 2h 5m"""
+    minutes = int(seconds / 60)
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h {minutes % 60}m"
+
+def format_long_duration(seconds):
+    """5h, 3d 4h"""
+    hours = int(seconds / 3600)
+    if hours < 24:
+        return f"{hours}h"
+    return f"{hours // 24}d {hours % 24}h"
@@ -0,0 +1,217 @@
+import json
+import zlib
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from flask import current_app
+from sqlalchemy.orm import selectinload
+from .extensions import db
+from .models import (
+    ArchivedComplaint, Complaint, ComplaintAttachment, ComplaintLog, ComplaintTag, ComplaintViewRollup
+)
+
+COMPLAINT_FIELDS = (
+    'id', 'complaint_id', 'email', 'name', 'lab_id', 'assigned_admin_id', 'category',
+    'description', 'attachment_path', 'status', 'priority', 'tags', 'resolution_notes',
+    'archived', 'created_at', 'updated_at', 'first_assigned_at', 'first_in_progress_at',
+    'resolved_at', 'terminated_at', 'duplicate_of_id'
+)
+LOG_FIELDS = (
+    'id', 'admin_id', 'action', 'old_value', 'new_value', 'description',
+    'view_duration', 'target_admin_id', 'timestamp'
+)
+DATETIME_FIELDS = {
+    'created_at', 'updated_at', 'timestamp',
+    'first_assigned_at', 'first_in_progress_at', 'resolved_at', 'terminated_at'
+}
+
+
+# --------------------------
+# Serialization
+# --------------------------
+def _dump_row(obj, fields):
+    data = {}
+    for field in fields:
+        value = getattr(obj, field)
+        data[field] = value.isoformat() if isinstance(value, datetime) else value
+    return data
+
+def _load_row(data):
+    row = dict(data)
+    for field in DATETIME_FIELDS:
+        if row.get(field):
+            row[field] = datetime.fromisoformat(row[field])
+    return row
+
+def pack_complaint(complaint) -> bytes:
+    """
+    Serialize a complaint with its logs into a compressed payload.
+    Lab and admin names are snapshotted so reads need no joins.
+    """
+    data = _dump_row(complaint, COMPLAINT_FIELDS)
+    data['lab_name'] = complaint.lab.name if complaint.lab else None
+    data['assigned_admin_name'] = complaint.assigned_admin.name if complaint.assigned_admin else None
+
+    logs = []
+    for log in complaint.logs:
+        log_data = _dump_row(log, LOG_FIELDS)
+        log_data['admin_name'] = log.admin.name if log.admin else None
+        log_data['target_admin_name'] = log.target_admin.name if log.target_admin else None
+        logs.append(log_data)
+    data['logs'] = logs
+    # Blob references stay counted while the complaint sits in cold storage
+    data['attachments'] = [
+        {'filename': link.filename, 'url_path': link.url_path, 'thumbnail_path': link.thumbnail_path}
+        for link in complaint.attachments
+    ]
+    data['view_rollups'] = [
+        {
+            'admin_id': rollup.admin_id,
+            'day': rollup.day.isoformat(),
+            'view_count': rollup.view_count,
+            'total_view_duration': rollup.total_view_duration
+        }
+        for rollup in ComplaintViewRollup.query.filter_by(complaint_id=complaint.id)
+    ]
+
+    return zlib.compress(json.dumps(data, separators=(',', ':')).encode(), 9)
+
+def unpack_complaint(payload: bytes):
+    """
+    Rebuild a read-only complaint object from an archive payload.
+    Exposes the attributes the complaint templates use (lab, assigned_admin,
+    logs with admin/target_admin) and sets cold_storage=True.
+    """
+    data = _load_row(json.loads(zlib.decompress(payload)))
+    raw_logs = data.pop('logs', [])
+    lab_name = data.pop('lab_name', None)
+    assigned_admin_name = data.pop('assigned_admin_name', None)
+
+    logs = []
+    for raw in raw_logs:
+        log_data = _load_row(raw)
+        admin_name = log_data.pop('admin_name', None)
+        target_admin_name = log_data.pop('target_admin_name', None)
+        log_data['admin'] = (
+            SimpleNamespace(id=log_data['admin_id'], name=admin_name)
+            if log_data.get('admin_id') else None
+        )
+        log_data['target_admin'] = (
+            SimpleNamespace(id=log_data['target_admin_id'], name=target_admin_name)
+            if log_data.get('target_admin_id') else None
+        )
+        logs.append(SimpleNamespace(**log_data))
+
+    data['lab'] = SimpleNamespace(id=data.get('lab_id'), name=lab_name)
+    data['assigned_admin'] = (
+        SimpleNamespace(id=data['assigned_admin_id'], name=assigned_admin_name)
+        if data.get('assigned_admin_id') else None
+    )
+    data['logs'] = logs
+    data['attachments'] = [SimpleNamespace(**a) for a in data.get('attachments', [])]
+    data['cold_storage'] = True
+    return SimpleNamespace(**data)
+
+
+# --------------------------
+# Archival Pipeline
+# --------------------------
+def archive_stale_complaints(horizon_days: int = None, batch_size: int = None, max_batches: int = None):
+    """
+    Move complaints that have been archived for longer than the horizon,
+    together with their logs, out of the hot tables into archived_complaints.
+    Works in batches, committing after each one to keep transactions short.
+    :return: number of complaints moved
+    """
+    if horizon_days is None:
+        horizon_days = current_app.config['ARCHIVE_AFTER_DAYS']
+    if batch_size is None:
+        batch_size = current_app.config['ARCHIVE_BATCH_SIZE']
+
+    threshold = datetime.utcnow() - timedelta(days=horizon_days)
+    moved = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        candidates = Complaint.query.options(
+            selectinload(Complaint.logs).selectinload(ComplaintLog.admin),
+            selectinload(Complaint.logs).selectinload(ComplaintLog.target_admin),
+            selectinload(Complaint.lab),
+            selectinload(Complaint.assigned_admin),
+            selectinload(Complaint.attachments)
+        ).filter(
+            Complaint.archived.is_(True),
+            Complaint.updated_at < threshold
+        ).order_by(Complaint.id.asc()).limit(batch_size).all()
+
+        if not candidates:
+            break
+
+        ids = [c.id for c in candidates]
+        try:
+            db.session.add_all([
+                ArchivedComplaint(
+                    original_id=c.id,
+                    complaint_id=c.complaint_id,
+                    email=c.email,
+                    lab_id=c.lab_id,
+                    status=c.status,
+                    created_at=c.created_at,
+                    archived_at=c.updated_at,
+                    payload=pack_complaint(c)
+                )
+                for c in candidates
+            ])
+            ComplaintLog.query.filter(ComplaintLog.complaint_id.in_(ids))\
+                .delete(synchronize_session=False)
+            ComplaintViewRollup.query.filter(ComplaintViewRollup.complaint_id.in_(ids))\
+                .delete(synchronize_session=False)
+            ComplaintAttachment.query.filter(ComplaintAttachment.complaint_id.in_(ids))\
+                .delete(synchronize_session=False)
+            # Tags stay in the payload's tags string
+            ComplaintTag.query.filter(ComplaintTag.complaint_id.in_(ids))\
+                .delete(synchronize_session=False)
+            Complaint.query.filter(Complaint.id.in_(ids))\
+                .delete(synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error archiving complaints {ids[0]}-{ids[-1]}: {e}")
+            break
+
+        db.session.expire_all()
+        moved += len(ids)
+        batches += 1
+
+    return moved
+
+
+# --------------------------
+# Read-through
+# --------------------------
+def find_archived_complaint(complaint_id: str = None, original_id: int = None):
+    """
+    Look up a complaint in cold storage by public complaint ID or by its
+    former primary key. Returns a read-only complaint object or None.
+    """
+    query = ArchivedComplaint.query
+    if complaint_id:
+        query = query.filter_by(complaint_id=complaint_id)
+    elif original_id is not None:
+        query = query.filter_by(original_id=original_id)
+    else:
+        return None
+
+    row = query.first()
+    return unpack_complaint(row.payload) if row else None
+
+def find_archived_complaints(email: str = None, complaint_id: str = None):
+    """Cold-storage counterpart of the track page lookup."""
+    if not email and not complaint_id:
+        return []
+
+    query = ArchivedComplaint.query
+    if email:
+        query = query.filter_by(email=email)
+    if complaint_id:
+        query = query.filter_by(complaint_id=complaint_id)
+    return [unpack_complaint(row.payload) for row in query.all()]
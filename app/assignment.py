@@ -0,0 +1,239 @@
+import heapq
+import itertools
+import threading
+from types import SimpleNamespace
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .extensions import db
+from .models import Admin, Complaint, ComplaintLog
+
+OPEN_STATUSES = ('Pending', 'In Progress')
+ASSIGNMENT_POLICIES = ('off', 'least_loaded', 'round_robin')
+SNAPSHOT_FIELDS = ('id', 'status', 'priority', 'assigned_admin_id', 'archived')
+
+
+# --------------------------
+# Workload Index
+# --------------------------
+class WorkloadIndex:
+    """
+    Open complaints per active admin, by priority, plus a min-heap of admins
+    keyed for the configured policy:
+      least_loaded - (weighted open load, last assigned, id)
+      round_robin  - (last assigned, id)
+    Every change pushes a fresh heap entry and older ones are skipped on
+    pop, so picking an assignee and recording a change are O(log n).
+    """
+
+    def __init__(self, policy, weights):
+        self.policy = policy
+        self.weights = weights
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self._heap = []
+        self._loads = {}          # admin id -> {priority: open count}
+        self._last_assigned = {}  # admin id -> sequence number of their last pick
+        self._versions = {}       # admin id -> version of their current heap entry
+        self._complaints = {}     # complaint id -> (admin id, priority) counted in _loads
+        self._recount = set()     # admin ids (re)added whose open complaints are not counted yet
+
+    def score(self, admin_id):
+        return sum(self.weights.get(priority, 1) * count for priority, count in self._loads[admin_id].items())
+
+    def _push(self, admin_id):
+        version = self._versions.get(admin_id, 0) + 1
+        self._versions[admin_id] = version
+        last = self._last_assigned.get(admin_id, 0)
+        key = (last, admin_id) if self.policy == 'round_robin' else (self.score(admin_id), last, admin_id)
+        heapq.heappush(self._heap, (key, version, admin_id))
+
+    def _count(self, complaint_id, admin_id, priority):
+        """Make complaint_id count towards admin_id (or nobody)."""
+        previous = self._complaints.pop(complaint_id, None)
+        if previous == (admin_id, priority) and admin_id is not None:
+            self._complaints[complaint_id] = previous
+            return
+        if previous and previous[0] in self._loads:
+            loads = self._loads[previous[0]]
+            loads[previous[1]] = max(loads.get(previous[1], 0) - 1, 0)
+            self._push(previous[0])
+        if admin_id in self._loads:
+            self._complaints[complaint_id] = (admin_id, priority)
+            self._loads[admin_id][priority] = self._loads[admin_id].get(priority, 0) + 1
+            self._push(admin_id)
+
+    def load(self):
+        admin_ids = [row.id for row in Admin.query.with_entities(Admin.id).filter_by(is_active=True)]
+        rows = db.session.query(Complaint.id, Complaint.assigned_admin_id, Complaint.priority)\
+            .filter(Complaint.status.in_(OPEN_STATUSES), Complaint.archived.is_(False),
+                    Complaint.assigned_admin_id.isnot(None)).all()
+        with self._lock:
+            self._heap, self._versions, self._complaints, self._recount = [], {}, {}, set()
+            self._loads = {admin_id: {} for admin_id in admin_ids}
+            for row in rows:
+                self._count(row.id, row.assigned_admin_id, row.priority or 'Low')
+            for admin_id in admin_ids:
+                self._push(admin_id)
+            self.loaded = True
+
+    def recount(self):
+        """
+        Count the open complaints of admins added since the last call. A
+        restored admin may still hold complaints from before they were
+        deactivated; track_admin() runs in a commit hook where no SQL is
+        allowed, so their count is rebuilt here, before the next pick.
+        """
+        with self._lock:
+            admin_ids = list(self._recount)
+        if not admin_ids:
+            return
+        rows = db.session.query(Complaint.id, Complaint.assigned_admin_id, Complaint.priority)\
+            .filter(Complaint.status.in_(OPEN_STATUSES), Complaint.archived.is_(False),
+                    Complaint.assigned_admin_id.in_(admin_ids)).all()
+        with self._lock:
+            self._recount.difference_update(admin_ids)
+            for row in rows:
+                self._count(row.id, row.assigned_admin_id, row.priority or 'Low')
+
+    def pick(self):
+        """Next assignee under the policy (and reserve the turn), or None."""
+        with self._lock:
+            while self._heap:
+                _key, version, admin_id = self._heap[0]
+                if admin_id in self._loads and self._versions.get(admin_id) == version:
+                    self._last_assigned[admin_id] = next(self._sequence)
+                    self._push(admin_id)
+                    return admin_id
+                heapq.heappop(self._heap)
+        return None
+
+    def track(self, complaint):
+        """Re-count one complaint after it was created or changed."""
+        is_open = complaint.status in OPEN_STATUSES and not complaint.archived
+        with self._lock:
+            self._count(complaint.id, complaint.assigned_admin_id if is_open else None, complaint.priority or 'Low')
+
+    def track_admin(self, admin):
+        """Add or drop an admin when they are created, deactivated or restored."""
+        with self._lock:
+            if admin.is_active and admin.id not in self._loads:
+                self._loads[admin.id] = {}
+                self._recount.add(admin.id)
+                self._push(admin.id)
+            elif not admin.is_active and admin.id in self._loads:
+                del self._loads[admin.id]
+                self._versions.pop(admin.id, None)
+                self._recount.discard(admin.id)
+                for complaint_id, (admin_id, _) in list(self._complaints.items()):
+                    if admin_id == admin.id:
+                        del self._complaints[complaint_id]
+
+    def workload(self):
+        """{admin id: {priority: open count}} for active admins (call recount() first)."""
+        with self._lock:
+            return {admin_id: dict(loads) for admin_id, loads in self._loads.items()}
+
+
+def init_assignment(app):
+    policy = app.config.get('AUTO_ASSIGN_POLICY', 'off')
+    if policy not in ASSIGNMENT_POLICIES:
+        raise ValueError(f"AUTO_ASSIGN_POLICY must be one of {', '.join(ASSIGNMENT_POLICIES)}")
+    app.extensions['workload_index'] = WorkloadIndex(policy, app.config['AUTO_ASSIGN_WEIGHTS'])
+
+def load_workload_index(app):
+    """Count open assignments at startup; a failure leaves it to the first use."""
+    if app.config.get('AUTO_ASSIGN_POLICY', 'off') == 'off':
+        return
+    try:
+        app.extensions['workload_index'].load()
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ Workload index not loaded: {e}")
+
+def get_workload_index():
+    index = current_app.extensions['workload_index']
+    if not index.loaded:
+        index.load()
+    else:
+        index.recount()
+    return index
+
+
+# --------------------------
+# Change Tracking
+# --------------------------
+@event.listens_for(Complaint, 'after_insert')
+@event.listens_for(Complaint, 'after_update')
+def _remember_complaint(mapper, connection, target):
+    snapshot = SimpleNamespace(**{field: getattr(target, field) for field in SNAPSHOT_FIELDS})
+    Session.object_session(target).info.setdefault('workload_changed', []).append(snapshot)
+
+@event.listens_for(Admin, 'after_insert')
+@event.listens_for(Admin, 'after_update')
+def _remember_admin(mapper, connection, target):
+    snapshot = SimpleNamespace(id=target.id, is_active=target.is_active)
+    Session.object_session(target).info.setdefault('workload_admins', []).append(snapshot)
+
+@event.listens_for(Session, 'after_commit')
+def _apply_workload_changes(session):
+    complaints = session.info.pop('workload_changed', None)
+    admins = session.info.pop('workload_admins', None)
+    session.info.pop('workload_reserved', None)
+    if not (complaints or admins) or not has_app_context():
+        return
+    index = current_app.extensions.get('workload_index')
+    if index is None or not index.loaded:
+        return
+    for admin in admins or ():
+        index.track_admin(admin)
+    for complaint in complaints or ():
+        index.track(complaint)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_workload_changes(session):
+    session.info.pop('workload_changed', None)
+    session.info.pop('workload_admins', None)
+    # Give back load counted for assignments that were never committed
+    reserved = session.info.pop('workload_reserved', None)
+    index = current_app.extensions.get('workload_index') if has_app_context() else None
+    if reserved and index is not None and index.loaded:
+        for complaint_id in reserved:
+            index.track(SimpleNamespace(id=complaint_id, status=None, priority=None,
+                                        assigned_admin_id=None, archived=True))
+
+
+# --------------------------
+# Auto-assignment
+# --------------------------
+def auto_assign(complaint):
+    """
+    Assign a new (flushed, uncommitted) complaint under AUTO_ASSIGN_POLICY
+    and log it as ADMIN_ASSIGNED by System. The caller commits.
+    :return: the assigned Admin, or None (policy off / no active admins)
+    """
+    policy = current_app.config.get('AUTO_ASSIGN_POLICY', 'off')
+    if policy == 'off' or complaint.assigned_admin_id is not None:
+        return None
+    index = get_workload_index()
+    admin_id = index.pick()
+    admin = db.session.get(Admin, admin_id) if admin_id else None
+    if admin is None or not admin.is_active:
+        return None
+
+    complaint.assign(admin)
+    # Count it now so concurrent submissions spread out; released on rollback
+    index.track(SimpleNamespace(id=complaint.id, status=complaint.status, priority=complaint.priority,
+                                assigned_admin_id=admin.id, archived=False))
+    db.session.info.setdefault('workload_reserved', []).append(complaint.id)
+    db.session.add(ComplaintLog(
+        complaint_id=complaint.id,
+        admin_id=None,
+        action='ADMIN_ASSIGNED',
+        old_value=None,
+        new_value=admin.name,
+        description=f"Auto-assigned ({policy.replace('_', ' ')})",
+        target_admin_id=admin.id
+    ))
+    return admin
@@ -0,0 +1,315 @@
+import hashlib
+import mimetypes
+import os
+import re
+import time
+import unicodedata
+from urllib.parse import quote
+from flask import abort, current_app, request
+from sqlalchemy.exc import IntegrityError
+from werkzeug.http import dump_options_header
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+from .extensions import db
+from .models import Attachment, Complaint, ComplaintAttachment
+from .uploads import CHUNK_SIZE, HashingUploadFile, file_extension
+
+# ab/cd/<sha256>[/<filename>]
+STORE_PATH = re.compile(r'^([0-9a-f]{2})/([0-9a-f]{2})/([0-9a-f]{64})(?:/([^/]+))?$')
+# ab/cd/<sha256>.t<size>.<format>, written next to the blob by the thumbnail job
+THUMBNAIL_PATH = re.compile(r'^([0-9a-f]{2})/([0-9a-f]{2})/([0-9a-f]{64})\.t\d+\.(webp|jpg)$')
+THUMBNAIL_MIMETYPES = {'webp': 'image/webp', 'jpg': 'image/jpeg'}
+
+
+# --------------------------
+# Store Layout
+# --------------------------
+def store_key(sha256: str) -> str:
+    """Relative path of a blob inside the upload folder: ab/cd/<sha256>"""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+def store_path(sha256: str) -> str:
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], *store_key(sha256).split('/'))
+
+def attachment_url_path(sha256: str, filename: str) -> str:
+    """
+    Path served by main.uploaded_file. The trailing filename only names the
+    download; the bytes are addressed by the hash.
+    """
+    return f"{store_key(sha256)}/{filename}"
+
+def parse_attachment_path(path: str):
+    """Return (sha256, filename) for a store path, or None for legacy flat files."""
+    match = STORE_PATH.match(path or '')
+    if not match or match.group(1) + match.group(2) != match.group(3)[:4]:
+        return None
+    return match.group(3), match.group(4)
+
+def parse_thumbnail_path(path: str):
+    """Return the image format of a thumbnail path, or None."""
+    match = THUMBNAIL_PATH.match(path or '')
+    if not match or match.group(1) + match.group(2) != match.group(3)[:4]:
+        return None
+    return match.group(4)
+
+def guess_mimetype(filename: str) -> str:
+    """
+    Content type for a download name. Only allowed upload types get a real
+    type; the name is part of the URL, so anything else (e.g. .html) is
+    served as an opaque download.
+    """
+    if file_extension(filename) not in current_app.config['ALLOWED_EXTENSIONS']:
+        return 'application/octet-stream'
+    return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+
+# --------------------------
+# Serving
+# --------------------------
+def content_disposition(disposition: str, filename: str) -> str:
+    """
+    Content-Disposition value for a download name taken from the URL: the
+    name is quoted, and non-ASCII names get an ASCII fallback plus an
+    RFC 5987 filename* (the same rules werkzeug's send_file applies).
+    """
+    try:
+        filename.encode('ascii')
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        names = {'filename': simple, 'filename*': f"UTF-8''{quote(filename, safe='!#$&+^`|~')}"}
+    else:
+        names = {'filename': filename}
+    return dump_options_header(disposition, names)
+
+def send_upload(relative_path: str, download_name: str, etag: str = None, immutable: bool = False,
+                mimetype: str = None):
+    """
+    Build the response for a file under UPLOAD_FOLDER.
+    ATTACHMENT_OFFLOAD picks who streams the bytes:
+      'none'       - werkzeug (conditional requests and Range supported)
+      'x-sendfile' - Apache/lighttpd via X-Sendfile
+      'x-accel'    - nginx via X-Accel-Redirect to ATTACHMENT_ACCEL_PREFIX
+    Content-addressed files pass their hash as etag and immutable=True so
+    browsers and proxies cache them for ATTACHMENT_MAX_AGE without revalidating.
+    """
+    config = current_app.config
+    path = safe_join(config['UPLOAD_FOLDER'], relative_path)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    mode = config.get('ATTACHMENT_OFFLOAD', 'none')
+    mimetype = mimetype or guess_mimetype(download_name)
+    as_attachment = mimetype == 'application/octet-stream'
+    max_age = config['ATTACHMENT_MAX_AGE'] if immutable else None
+
+    if mode == 'x-accel':
+        # Answer revalidations here; nginx only sees requests that need bytes
+        if etag and request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(mimetype=mimetype)
+            response.headers['X-Accel-Redirect'] = f"{config['ATTACHMENT_ACCEL_PREFIX'].rstrip('/')}/{relative_path}"
+            disposition = 'attachment' if as_attachment else 'inline'
+            response.headers['Content-Disposition'] = content_disposition(disposition, download_name)
+        if etag:
+            response.set_etag(etag)
+        if max_age:
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+    else:
+        response = send_file(
+            path,
+            request.environ,
+            mimetype=mimetype,
+            as_attachment=as_attachment,
+            download_name=download_name,
+            etag=etag or True,
+            max_age=max_age,
+            use_x_sendfile=mode == 'x-sendfile',
+            response_class=current_app.response_class
+        )
+
+    if immutable:
+        response.cache_control.immutable = True
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+
+# --------------------------
+# Writing
+# --------------------------
+def store_upload(upload: HashingUploadFile) -> Attachment:
+    """
+    Put a finished upload into the store and return its Attachment row
+    (flushed, not committed). Identical content is stored once: when the
+    hash already exists the temp file is simply discarded.
+    """
+    try:
+        upload.finish()
+        attachment = Attachment.query.filter_by(sha256=upload.sha256).first()
+        path = store_path(upload.sha256)
+        if attachment is None or not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            upload.commit(path)
+    finally:
+        upload.close()
+
+    if attachment is not None:
+        return attachment
+
+    attachment = Attachment(sha256=upload.sha256, size=upload.size, ref_count=0)
+    try:
+        with db.session.begin_nested():
+            db.session.add(attachment)
+    except IntegrityError:
+        # Same content uploaded concurrently; the other row wins
+        attachment = Attachment.query.filter_by(sha256=upload.sha256).one()
+    return attachment
+
+def link_attachment(complaint, attachment: Attachment, filename: str) -> ComplaintAttachment:
+    """Attach a stored blob to a complaint and take a reference on it."""
+    link = ComplaintAttachment(complaint_id=complaint.id, attachment_id=attachment.id, filename=filename)
+    link.attachment = attachment
+    db.session.add(link)
+    db.session.query(Attachment).filter_by(id=attachment.id)\
+        .update({Attachment.ref_count: Attachment.ref_count + 1}, synchronize_session=False)
+    return link
+
+def release_attachments(complaint_ids):
+    """
+    Drop the attachment links of the given complaints and their references.
+    Blobs whose count reaches zero are removed by collect_garbage().
+    """
+    links = ComplaintAttachment.query.filter(ComplaintAttachment.complaint_id.in_(complaint_ids)).all()
+    for link in links:
+        db.session.query(Attachment).filter_by(id=link.attachment_id)\
+            .update({Attachment.ref_count: Attachment.ref_count - 1}, synchronize_session=False)
+        db.session.delete(link)
+    return len(links)
+
+
+# --------------------------
+# Maintenance
+# --------------------------
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def migrate_legacy_attachments(batch_size: int = 200):
+    """
+    Move flat `{complaint_id}_{filename}` uploads into the store.
+    Each file is hashed, renamed to ab/cd/<sha256> (or deleted if that
+    content is already stored), linked to its complaint, and the complaint's
+    attachment_path is rewritten. Missing files are reported and skipped.
+    :return: (migrated, deduplicated, missing)
+    """
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    migrated = deduplicated = missing = 0
+    last_id = 0
+
+    while True:
+        complaints = Complaint.query.filter(
+            Complaint.id > last_id,
+            Complaint.attachment_path.isnot(None),
+            Complaint.attachment_path != ''
+        ).order_by(Complaint.id.asc()).limit(batch_size).all()
+        if not complaints:
+            break
+        last_id = complaints[-1].id
+
+        try:
+            for complaint in complaints:
+                if parse_attachment_path(complaint.attachment_path):
+                    continue
+
+                legacy_path = os.path.join(upload_folder, complaint.attachment_path)
+                if not os.path.isfile(legacy_path):
+                    print(f"⚠️ Attachment missing for {complaint.complaint_id}: {complaint.attachment_path}")
+                    missing += 1
+                    continue
+
+                sha256 = _hash_file(legacy_path)
+                attachment = Attachment.query.filter_by(sha256=sha256).first()
+                path = store_path(sha256)
+                if os.path.exists(path):
+                    os.remove(legacy_path)
+                    deduplicated += 1
+                else:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(legacy_path, path)
+                if attachment is None:
+                    attachment = Attachment(sha256=sha256, size=os.path.getsize(path), ref_count=0)
+                    db.session.add(attachment)
+                    db.session.flush()
+
+                # Stored names were prefixed with the complaint ID
+                filename = complaint.attachment_path
+                prefix = f"{complaint.complaint_id}_"
+                if filename.startswith(prefix):
+                    filename = filename[len(prefix):]
+
+                link_attachment(complaint, attachment, filename)
+                complaint.attachment_path = attachment_url_path(sha256, filename)
+                migrated += 1
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error migrating attachments after complaint {last_id}: {e}")
+            break
+
+    return migrated, deduplicated, missing
+
+def collect_garbage(orphan_age: int = 3600):
+    """
+    Delete blobs nobody references: rows whose ref_count dropped to zero and
+    store files without a row (left behind by submissions that failed after
+    the upload was written) older than orphan_age seconds.
+    :return: number of files removed
+    """
+    removed = 0
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    candidates = Attachment.query.with_entities(Attachment.id, Attachment.sha256, Attachment.thumbnail_path)\
+        .filter(Attachment.ref_count <= 0).all()
+    for attachment_id, sha256, thumbnail_path in candidates:
+        paths = [store_path(sha256)]
+        if thumbnail_path:
+            paths.append(os.path.join(upload_folder, *thumbnail_path.split('/')))
+        try:
+            # Re-checked in the DELETE: an upload may have linked the blob since the SELECT
+            deleted = db.session.query(Attachment)\
+                .filter(Attachment.id == attachment_id, Attachment.ref_count <= 0)\
+                .delete(synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error collecting attachment {sha256}: {e}")
+            continue
+        if not deleted:
+            continue
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+
+    cutoff = time.time() - orphan_age
+    for shard in os.listdir(upload_folder) if os.path.isdir(upload_folder) else []:
+        shard_dir = os.path.join(upload_folder, shard)
+        if len(shard) != 2 or not os.path.isdir(shard_dir):
+            continue
+        for root, _dirs, files in os.walk(shard_dir):
+            # Thumbnails (<sha256>.t320.webp) belong to their blob
+            hashes = {name.split('.', 1)[0] for name in files}
+            known = {
+                row.sha256 for row in
+                Attachment.query.with_entities(Attachment.sha256).filter(Attachment.sha256.in_(hashes))
+            } if hashes else set()
+            for name in files:
+                path = os.path.join(root, name)
+                if name.split('.', 1)[0] not in known and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+
+    return removed
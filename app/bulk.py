@@ -0,0 +1,146 @@
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+from .extensions import db
+from .models import Admin, Complaint, ComplaintLog
+
+STATUSES = ('Pending', 'In Progress', 'Resolved', 'Terminated')
+PRIORITIES = ('Low', 'Medium', 'High')
+LOG_COLUMNS = ('complaint_id', 'admin_id', 'action', 'old_value', 'new_value', 'description',
+               'target_admin_id', 'timestamp')
+
+
+# --------------------------
+# Request Parsing
+# --------------------------
+def parse_bulk_update(data, max_items):
+    """
+    Validate a bulk update body:
+      {"ids": [...], "status": ..., "priority": ..., "assigned_admin_id": id or null,
+       "tags": "a,b", "archived": bool, "remarks": "..."}
+    Fields that are left out are not changed.
+    :return: (ids in request order without repeats, {field: value}, remarks)
+    :raises ValueError: with a message for the client
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Expected a JSON object')
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        raise ValueError('ids must be a non-empty list of complaint ids')
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > max_items:
+        raise ValueError(f'At most {max_items} complaints can be updated at once')
+
+    changes = {}
+    if 'status' in data:
+        if data['status'] not in STATUSES:
+            raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+        changes['status'] = data['status']
+    if 'priority' in data:
+        if data['priority'] not in PRIORITIES:
+            raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+        changes['priority'] = data['priority']
+    if 'assigned_admin_id' in data:
+        admin_id = data['assigned_admin_id']
+        if admin_id is not None and (not isinstance(admin_id, int) or isinstance(admin_id, bool)):
+            raise ValueError('assigned_admin_id must be an admin id or null')
+        changes['assigned_admin_id'] = admin_id
+    if 'tags' in data:
+        if not isinstance(data['tags'], str):
+            raise ValueError('tags must be a comma-separated string')
+        changes['tags'] = data['tags'].strip() or 'none'
+    if 'archived' in data:
+        if not isinstance(data['archived'], bool):
+            raise ValueError('archived must be true or false')
+        changes['archived'] = data['archived']
+    if not changes:
+        raise ValueError('Nothing to change: give status, priority, assigned_admin_id, tags or archived')
+    return ids, changes, data.get('remarks') or None
+
+
+# --------------------------
+# Applying
+# --------------------------
+def apply_bulk_update(ids, changes, actor, remarks=None):
+    """
+    Apply the same changes to many complaints in the current transaction:
+    one query loads them, the complaint updates flush together, and every
+    activity log row goes in with a single multi-row INSERT. The caller
+    notifies and commits.
+    :return: (per-id results, complaints whose status changed, complaints newly assigned)
+    :raises ValueError: if the assignee does not exist or is inactive
+    """
+    assignee = None
+    if changes.get('assigned_admin_id') is not None:
+        assignee = db.session.get(Admin, changes['assigned_admin_id'])
+        if assignee is None or not assignee.is_active:
+            raise ValueError('assigned_admin_id is not an active admin')
+
+    complaints = {
+        complaint.id: complaint for complaint in
+        Complaint.query.options(joinedload(Complaint.lab), joinedload(Complaint.assigned_admin))
+        .filter(Complaint.id.in_(ids))
+    }
+    now = datetime.utcnow()
+    actor_id = actor.id if actor else None
+    logs, results, status_changed, assigned = [], [], [], []
+
+    def log(complaint, action, old_value=None, new_value=None, target_admin_id=None):
+        logs.append(dict(zip(LOG_COLUMNS, (
+            complaint.id, actor_id, action, old_value, new_value, remarks, target_admin_id, now
+        ))))
+
+    for complaint_id in ids:
+        complaint = complaints.get(complaint_id)
+        if complaint is None:
+            results.append({'id': complaint_id, 'result': 'not_found'})
+            continue
+        changed = []
+
+        status = changes.get('status')
+        if status and status != complaint.status:
+            log(complaint, 'STATUS_CHANGED', complaint.status, status)
+            complaint.set_status(status, at=now)
+            status_changed.append(complaint)
+            changed.append('status')
+
+        priority = changes.get('priority')
+        if priority and priority != complaint.priority:
+            log(complaint, 'PRIORITY_CHANGED', complaint.priority, priority)
+            complaint.priority = priority
+            changed.append('priority')
+
+        if 'assigned_admin_id' in changes and complaint.assigned_admin_id != changes['assigned_admin_id']:
+            previous = complaint.assigned_admin
+            log(complaint, 'ADMIN_ASSIGNED' if assignee else 'ADMIN_UNASSIGNED',
+                previous.name if previous else None, assignee.name if assignee else None,
+                assignee.id if assignee else None)
+            complaint.assign(assignee, at=now)
+            if assignee:
+                assigned.append(complaint)
+            changed.append('assigned_admin_id')
+
+        tags = changes.get('tags')
+        if tags and tags != complaint.tags:
+            log(complaint, 'TAG_CHANGED', complaint.tags, tags)
+            complaint.tags = tags
+            changed.append('tags')
+
+        if 'archived' in changes and changes['archived'] != complaint.archived:
+            log(complaint, 'ARCHIVED' if changes['archived'] else 'UNARCHIVED',
+                'Archived' if complaint.archived else 'Active',
+                'Archived' if changes['archived'] else 'Active')
+            complaint.archived = changes['archived']
+            changed.append('archived')
+
+        results.append({
+            'id': complaint.id,
+            'complaint_id': complaint.complaint_id,
+            'result': 'updated' if changed else 'unchanged',
+            'changed': changed
+        })
+
+    if logs:
+        # Core insert: one executemany (a multi-row VALUES on PostgreSQL)
+        db.session.execute(insert(ComplaintLog.__table__), logs)
+    return results, status_changed, assigned
@@ -0,0 +1,132 @@
+import click
+
+# --------------------------
+# Maintenance Commands
+# --------------------------
+def register_commands(app):
+    """Register maintenance commands with the Flask CLI (`flask --app run <command>`)"""
+
+    @app.cli.command('archive-complaints')
+    @click.option('--days', type=int, default=None, help='Archive horizon in days (default: ARCHIVE_AFTER_DAYS).')
+    @click.option('--batch-size', type=int, default=None, help='Complaints moved per transaction.')
+    @click.option('--max-batches', type=int, default=None, help='Stop after this many batches.')
+    def archive_complaints_command(days, batch_size, max_batches):
+        """Move long-archived complaints and their logs to cold storage."""
+        from .archive import archive_stale_complaints
+
+        moved = archive_stale_complaints(days, batch_size, max_batches)
+        click.echo(f"✅ Moved {moved} complaint(s) to cold storage")
+
+    @app.cli.command('compact-logs')
+    @click.option('--batch-size', type=int, default=None, help='Log rows processed per transaction.')
+    @click.option('--max-batches', type=int, default=None, help='Stop after this many batches per action.')
+    @click.option('--pause', type=float, default=0.0, help='Seconds to sleep between batches.')
+    def compact_logs_command(batch_size, max_batches, pause):
+        """Apply activity log retention policies (LOG_RETENTION_POLICIES)."""
+        from .retention import apply_retention
+
+        results = apply_retention(batch_size=batch_size, max_batches=max_batches, pause=pause)
+        for action, removed in results.items():
+            click.echo(f"✅ {action}: compacted {removed} log row(s)")
+
+    @app.cli.command('ensure-log-partitions')
+    @click.option('--months-ahead', type=int, default=None, help='Future months to create (default: LOG_PARTITION_MONTHS_AHEAD).')
+    def ensure_log_partitions_command(months_ahead):
+        """Create upcoming monthly complaint_logs partitions (PostgreSQL; run daily from cron)."""
+        from .partitions import ensure_log_partitions
+
+        if months_ahead is None:
+            months_ahead = app.config['LOG_PARTITION_MONTHS_AHEAD']
+        created = ensure_log_partitions(months_ahead)
+        click.echo(f"✅ Created {len(created)} partition(s){': ' + ', '.join(created) if created else ''}")
+
+    @app.cli.command('migrate-attachments')
+    @click.option('--batch-size', type=int, default=200, help='Complaints migrated per transaction.')
+    def migrate_attachments_command(batch_size):
+        """Move flat uploads into the content-addressed attachment store."""
+        from .attachments import migrate_legacy_attachments
+
+        migrated, deduplicated, missing = migrate_legacy_attachments(batch_size)
+        click.echo(f"✅ Migrated {migrated} attachment(s), {deduplicated} duplicate file(s) removed, {missing} missing")
+
+    @app.cli.command('backfill-lifecycle')
+    @click.option('--batch-size', type=int, default=500, help='Complaints updated per transaction.')
+    def backfill_lifecycle_command(batch_size):
+        """Fill complaint lifecycle timestamps (assigned/in progress/resolved) from the activity log."""
+        from .lifecycle import backfill_lifecycle
+
+        updated = backfill_lifecycle(batch_size)
+        click.echo(f"✅ Backfilled lifecycle timestamps on {updated} complaint(s)")
+
+    @app.cli.command('migrate-tags')
+    @click.option('--batch-size', type=int, default=500, help='Complaints migrated per transaction.')
+    def migrate_tags_command(batch_size):
+        """Copy comma-separated complaint tags into the indexed tag tables."""
+        from .tags import backfill_tags
+
+        processed = backfill_tags(batch_size)
+        click.echo(f"✅ Migrated tags of {processed} complaint(s)")
+
+    @app.cli.command('sla-check')
+    def sla_check_command():
+        """Raise SLA breaches for open complaints now (e.g. from cron)."""
+        from .sla import check_sla_breaches, get_sla_monitor
+
+        get_sla_monitor().load()
+        raised = check_sla_breaches()
+        click.echo(f"✅ Raised {raised} SLA breach(es)")
+
+    @app.cli.command('triage-train')
+    @click.option('--epochs', type=int, default=8, help='Passes over the training data.')
+    def triage_train_command(epochs):
+        """Train the auto-triage model from historical complaints and their activity logs."""
+        from .triage import train_triage
+
+        model = train_triage(epochs)
+        if not model.heads:
+            click.echo("⚠️ Not enough labelled complaints to train a model")
+            return
+        model.save(app.config['TRIAGE_MODEL_PATH'])
+        examples = ', '.join(f"{name}: {count}" for name, count in model.examples.items())
+        click.echo(f"✅ Trained {', '.join(model.heads)} ({examples}) → {app.config['TRIAGE_MODEL_PATH']}")
+
+    @app.cli.command('triage-rescore')
+    @click.option('--apply', is_flag=True, help='Apply confident priority/tag suggestions, not just log them.')
+    @click.option('--batch-size', type=int, default=200, help='Complaints scored per transaction.')
+    def triage_rescore_command(apply, batch_size):
+        """Re-run auto-triage over open complaints with the current model."""
+        from .triage import rescore_open_complaints
+
+        scored = rescore_open_complaints(apply, batch_size)
+        if scored is None:
+            click.echo("⚠️ No triage model; run `flask --app run triage-train` first")
+            return
+        click.echo(f"✅ Re-scored {scored} open complaint(s)")
+
+    @app.cli.command('gc-attachments')
+    @click.option('--orphan-age', type=int, default=3600, help='Seconds before an unreferenced store file is removed.')
+    def gc_attachments_command(orphan_age):
+        """Delete attachment blobs that are no longer referenced."""
+        from .attachments import collect_garbage
+
+        removed = collect_garbage(orphan_age)
+        click.echo(f"✅ Removed {removed} unreferenced attachment file(s)")
+
+    @app.cli.command('generate-thumbnails')
+    @click.option('--batch-size', type=int, default=200, help='Attachments loaded per batch.')
+    @click.option('--force', is_flag=True, help='Regenerate existing thumbnails (e.g. after changing THUMBNAIL_SIZE).')
+    def generate_thumbnails_command(batch_size, force):
+        """Create missing thumbnails and PDF previews for stored attachments."""
+        from .thumbnails import backfill_thumbnails
+
+        generated, skipped = backfill_thumbnails(batch_size, force)
+        click.echo(f"✅ Generated {generated} thumbnail(s), skipped {skipped} non-previewable attachment(s)")
+
+    @app.cli.command('send-digests')
+    @click.option('--all', 'flush_all', is_flag=True, help='Send everything pending, not just digests that are due.')
+    def send_digests_command(flush_all):
+        """Send due notification digests (lab Discord posts and admin emails)."""
+        from .digests import flush_due_digests
+
+        sent = flush_due_digests(force=flush_all)
+        click.echo(f"✅ Sent {sent} digest(s)")
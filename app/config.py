@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 from datetime import timedelta
@@ -30,8 +31,19 @@ class Config:
     # File upload settings
     # --------------------------
     UPLOAD_FOLDER = os.path.join(basedir, '..', 'uploads')
-    MAX_CONTENT_LENGTH = 2 * 1024 * 1024  # 2 MB
+    MAX_ATTACHMENT_SIZE = int(os.getenv('MAX_ATTACHMENT_SIZE', 2 * 1024 * 1024))  # 2 MB per file
+    MAX_ATTACHMENTS = int(os.getenv('MAX_ATTACHMENTS', 5))  # files per complaint
+    # Hard cap on the whole request: attachments plus form fields
+    MAX_CONTENT_LENGTH = MAX_ATTACHMENT_SIZE * MAX_ATTACHMENTS + 256 * 1024
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf', 'gif', 'txt', 'doc', 'docx'}
+    # Who streams attachment bytes: none (app) | x-accel (nginx) | x-sendfile (Apache/lighttpd)
+    ATTACHMENT_OFFLOAD = os.getenv('ATTACHMENT_OFFLOAD', 'none').lower()
+    ATTACHMENT_ACCEL_PREFIX = os.getenv('ATTACHMENT_ACCEL_PREFIX', '/protected-uploads')  # nginx internal location
+    ATTACHMENT_MAX_AGE = int(os.getenv('ATTACHMENT_MAX_AGE', 365 * 24 * 3600))  # content-addressed files only
+    THUMBNAILS_ENABLED = os.getenv('THUMBNAILS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    THUMBNAIL_SIZE = int(os.getenv('THUMBNAIL_SIZE', 320))  # px, longest side
+    THUMBNAIL_FORMAT = os.getenv('THUMBNAIL_FORMAT', 'webp').lower()  # webp | jpg
+    THUMBNAIL_WORKERS = int(os.getenv('THUMBNAIL_WORKERS', 1))
 
     # --------------------------
     # Flask-Mail settings
@@ -43,6 +55,71 @@ class Config:
     MAIL_USERNAME = os.getenv('EMAIL_USER')
     MAIL_PASSWORD = os.getenv('EMAIL_PASS')
     MAIL_DEFAULT_SENDER = os.getenv('EMAIL_USER')
+    # Digest mode: batch lab Discord posts and admin emails over this many seconds (0 = send immediately)
+    NOTIFICATION_DIGEST_WINDOW = int(os.getenv('NOTIFICATION_DIGEST_WINDOW', 0))
+    NOTIFICATION_DIGEST_MAX_ITEMS = int(os.getenv('NOTIFICATION_DIGEST_MAX_ITEMS', 10))
+    NOTIFICATION_DIGEST_POLL_INTERVAL = int(os.getenv('NOTIFICATION_DIGEST_POLL_INTERVAL', 30))
+    NOTIFICATION_DIGEST_LEASE = int(os.getenv('NOTIFICATION_DIGEST_LEASE', 300))  # seconds before an unsent digest is retried
+    NOTIFICATION_DAILY_SUMMARY_HOUR = int(os.getenv('NOTIFICATION_DAILY_SUMMARY_HOUR', 8))  # UTC
+    # Compiled email template cache (default: system temp directory)
+    NOTIFICATION_TEMPLATE_CACHE_DIR = os.getenv('NOTIFICATION_TEMPLATE_CACHE_DIR')
+    # Seconds before the lab → Discord webhook map is reloaded from the database
+    DISCORD_WEBHOOK_CACHE_TTL = int(os.getenv('DISCORD_WEBHOOK_CACHE_TTL', 300))
+    # Seconds an admin's notification preferences are cached per worker
+    NOTIFICATION_PREFS_CACHE_TTL = int(os.getenv('NOTIFICATION_PREFS_CACHE_TTL', 60))
+    # Seconds report/trend results are cached per worker (0 = always query)
+    REPORT_CACHE_TTL = int(os.getenv('REPORT_CACHE_TTL', 300))
+
+
+    # --------------------------
+    # SLA settings
+    # --------------------------
+    SLA_ENABLED = os.getenv('SLA_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    # Hours a complaint may stay unassigned ('assign') / open ('resolve'), by priority
+    SLA_TARGETS = {
+        'High': {'assign': 1, 'resolve': 24},
+        'Medium': {'assign': 4, 'resolve': 72},
+        'Low': {'assign': 24, 'resolve': 168},
+    }
+    # Per-lab overrides, e.g. {"CC Lab": {"High": {"resolve": 8}}}
+    SLA_LAB_TARGETS = json.loads(os.getenv('SLA_LAB_TARGETS', '{}'))
+    SLA_POLL_INTERVAL = int(os.getenv('SLA_POLL_INTERVAL', 60))
+    SLA_AT_RISK_HOURS = int(os.getenv('SLA_AT_RISK_HOURS', 4))
+
+
+    # --------------------------
+    # Auto-assignment settings
+    # --------------------------
+    # New complaints go to an active admin: 'off', 'least_loaded' or 'round_robin'
+    AUTO_ASSIGN_POLICY = os.getenv('AUTO_ASSIGN_POLICY', 'off')
+    # least_loaded weighs each open complaint by priority
+    AUTO_ASSIGN_WEIGHTS = {'High': 3, 'Medium': 2, 'Low': 1}
+
+
+    # --------------------------
+    # Duplicate detection settings
+    # --------------------------
+    # Link new complaints to a similar open complaint in the same lab
+    DUPLICATE_DETECTION = os.getenv('DUPLICATE_DETECTION', 'false').lower() in ('1', 'true', 'yes')
+    # Minimum estimated Jaccard similarity of description shingles (0-1)
+    DUPLICATE_THRESHOLD = float(os.getenv('DUPLICATE_THRESHOLD', 0.6))
+
+
+    # --------------------------
+    # Auto-triage settings
+    # --------------------------
+    # Trained by `flask --app run triage-train`; no file, no suggestions
+    TRIAGE_MODEL_PATH = os.getenv('TRIAGE_MODEL_PATH', os.path.join(basedir, '..', 'instance', 'triage_model.json'))
+    # Apply confident priority/tag suggestions instead of only logging them
+    TRIAGE_AUTO_APPLY = os.getenv('TRIAGE_AUTO_APPLY', 'false').lower() in ('1', 'true', 'yes')
+    TRIAGE_MIN_CONFIDENCE = float(os.getenv('TRIAGE_MIN_CONFIDENCE', 0.7))
+
+
+    # --------------------------
+    # Bulk operations
+    # --------------------------
+    # Complaints one POST /admin/api/complaints/bulk may change
+    BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 500))
 
 
     # --------------------------
@@ -58,3 +135,40 @@ class Config:
     DISCORD_TECHNOSPHERE_WEBHOOK = os.getenv('DISCORD_TECHNOSPHERE_WEBHOOK')
     DISCORD_IBM_WEBHOOK = os.getenv('DISCORD_IBM_WEBHOOK')
 
+
+    # --------------------------
+    # Activity log settings
+    # --------------------------
+    # Total shown on log pages: 'exact', 'approximate' (planner estimate) or 'none'
+    LOG_COUNT_MODE = os.getenv('LOG_COUNT_MODE', 'approximate')
+    # Monthly range partitioning of complaint_logs (PostgreSQL only)
+    LOG_PARTITIONING = os.getenv('LOG_PARTITIONING', 'false').lower() in ('1', 'true', 'yes')
+    LOG_PARTITION_MONTHS_AHEAD = int(os.getenv('LOG_PARTITION_MONTHS_AHEAD', 3))
+
+    # --------------------------
+    # Cold storage archive settings
+    # --------------------------
+    # Archived complaints untouched for this many days move to archived_complaints
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 180))
+    ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 200))
+
+    # --------------------------
+    # Activity log retention settings
+    # --------------------------
+    # Per-action policies; actions not listed are kept forever.
+    # mode: 'rollup' (daily per-admin per-complaint view totals) or 'delete'
+    LOG_RETENTION_POLICIES = {
+        'ISSUE_VIEWED': {'mode': 'rollup', 'after_days': int(os.getenv('VIEW_LOG_RETENTION_DAYS', 30))},
+    }
+    LOG_RETENTION_BATCH_SIZE = int(os.getenv('LOG_RETENTION_BATCH_SIZE', 1000))
+
+    # --------------------------
+    # Instrumentation settings
+    # --------------------------
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')  # Bearer token for /metrics; unset = served in debug only
+    METRICS_SERVER_TIMING = None  # Emit Server-Timing headers; None follows DEBUG
+
+    # Flag requests repeating one statement shape: 'off', 'warn' or 'raise'
+    NPLUSONE_MODE = os.getenv('NPLUSONE_MODE', 'off')
+    NPLUSONE_THRESHOLD = int(os.getenv('NPLUSONE_THRESHOLD', 5))
@@ -0,0 +1,316 @@
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, func, or_
+from .extensions import db
+from .models import Admin, Lab, NotificationEvent, NotificationPreference
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+# --------------------------
+# Preferences
+# --------------------------
+DEFAULT_PREFERENCES = {
+    'email_notifications': True,
+    'assignment_notifications': True,
+    'status_notifications': True,
+    'daily_summary': False
+}
+
+# Which preference (besides email_notifications) lets an admin receive each event
+EVENT_PREFERENCES = {
+    'ADMIN_ASSIGNED': 'assignment_notifications',
+    'STATUS_CHANGED': 'status_notifications'
+}
+
+class PreferenceCache:
+    """
+    Notification preferences per admin id, as plain dicts. Misses are loaded
+    together in one query; saving invalidates the admin's entry, and entries
+    expire after `ttl` seconds so edits made by other workers apply too.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get_many(self, admin_ids):
+        admin_ids = {admin_id for admin_id in admin_ids if admin_id}
+        now = time.monotonic()
+        found, missing = {}, []
+        for admin_id in admin_ids:
+            entry = self._entries.get(admin_id)
+            if entry and now - entry[0] <= self.ttl:
+                found[admin_id] = entry[1]
+            else:
+                missing.append(admin_id)
+        if missing:
+            loaded = {admin_id: dict(DEFAULT_PREFERENCES) for admin_id in missing}
+            for row in NotificationPreference.query.filter(NotificationPreference.admin_id.in_(missing)):
+                loaded[row.admin_id] = {key: getattr(row, key) for key in DEFAULT_PREFERENCES}
+            with self._lock:
+                for admin_id, prefs in loaded.items():
+                    self._entries[admin_id] = (now, prefs)
+            found.update(loaded)
+        return found
+
+    def invalidate(self, admin_id=None):
+        with self._lock:
+            if admin_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(admin_id, None)
+
+def init_notification_routing(app):
+    app.extensions['notification_preferences'] = PreferenceCache(app.config.get('NOTIFICATION_PREFS_CACHE_TTL', 60))
+    # Events queued before a restart (or left by a crashed worker) still go out
+    app.before_request(_ensure_scheduler)
+
+def _preference_cache():
+    return current_app.extensions['notification_preferences']
+
+def get_notification_prefs(admin_id):
+    """Stored preferences for an admin as a dict (defaults if never saved)."""
+    if not admin_id:
+        return dict(DEFAULT_PREFERENCES)
+    return dict(_preference_cache().get_many([admin_id])[admin_id])
+
+def save_notification_prefs(admin_id, values):
+    prefs = db.session.get(NotificationPreference, admin_id)
+    if prefs is None:
+        prefs = NotificationPreference(admin_id=admin_id)
+        db.session.add(prefs)
+    for key in DEFAULT_PREFERENCES:
+        setattr(prefs, key, bool(values.get(key)))
+    _preference_cache().invalidate(admin_id)
+    return prefs
+
+def route_admin_event(event_type, admins, actor=None):
+    """
+    Admins that should be emailed about an event, with their preferences.
+    Inactive admins, the admin who made the change, and admins who turned
+    off email or this kind of notification are dropped. Preferences for all
+    candidates come from one cache lookup (at most one query).
+    :return: list of (admin, prefs)
+    """
+    actor_id = actor.id if actor else None
+    candidates = {admin.id: admin for admin in admins
+                  if admin is not None and admin.is_active and admin.id != actor_id}
+    if not candidates:
+        return []
+    preference = EVENT_PREFERENCES.get(event_type)
+    routes = []
+    for admin_id, prefs in _preference_cache().get_many(candidates).items():
+        if prefs['email_notifications'] and (preference is None or prefs[preference]):
+            routes.append((candidates[admin_id], prefs))
+    return routes
+
+
+# --------------------------
+# Queueing
+# --------------------------
+def digest_enabled():
+    return current_app.config.get('NOTIFICATION_DIGEST_WINDOW', 0) > 0
+
+def _next_daily_run(now):
+    hour = current_app.config.get('NOTIFICATION_DAILY_SUMMARY_HOUR', 8)
+    run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    return run if run > now else run + timedelta(days=1)
+
+def _queue(channel, recipient_id, event_type, complaint, summary, due_at):
+    db.session.add(NotificationEvent(
+        channel=channel,
+        recipient_id=recipient_id,
+        event_type=event_type,
+        complaint_ref=complaint.complaint_id,
+        summary=summary[:255],
+        due_at=due_at
+    ))
+    _ensure_scheduler()
+
+def queue_lab_event(lab, event_type, complaint, summary):
+    """
+    Queue a lab channel post for the next digest instead of posting now.
+    The event joins the caller's transaction, so it is only sent if the
+    change it describes is committed.
+    :return: True if queued, False if digests are off (caller sends directly)
+    """
+    if lab is None or not digest_enabled():
+        return False
+    window = current_app.config['NOTIFICATION_DIGEST_WINDOW']
+    _queue('discord', lab.id, event_type, complaint, summary, datetime.utcnow() + timedelta(seconds=window))
+    return True
+
+def queue_admin_event(admin, event_type, complaint, summary, prefs=None):
+    """
+    Queue an admin email for a digest: the daily summary if the admin chose
+    it, else the regular digest window when digests are on.
+    :param prefs: the admin's preferences, if already looked up
+    :return: True if queued, False if the caller should email now
+    """
+    if admin is None:
+        return False
+    now = datetime.utcnow()
+    prefs = prefs or get_notification_prefs(admin.id)
+    if prefs['daily_summary']:
+        due_at = _next_daily_run(now)
+    elif digest_enabled():
+        due_at = now + timedelta(seconds=current_app.config['NOTIFICATION_DIGEST_WINDOW'])
+    else:
+        return False
+    _queue('email', admin.id, event_type, complaint, summary, due_at)
+    return True
+
+
+# --------------------------
+# Flushing
+# --------------------------
+def _available(now, lease):
+    """Pending events not held by another worker's live lease."""
+    return and_(
+        NotificationEvent.sent_at.is_(None),
+        or_(NotificationEvent.claimed_at.is_(None), NotificationEvent.claimed_at <= now - lease)
+    )
+
+def _claim(events, now, lease):
+    """
+    Lease events for sending; returns False if another worker got there
+    first. A lease that is never completed (failed send, crashed worker)
+    expires, and the events are picked up again.
+    """
+    ids = [event.id for event in events]
+    claimed = NotificationEvent.query.filter(NotificationEvent.id.in_(ids), _available(now, lease))\
+        .update({NotificationEvent.claimed_at: now}, synchronize_session=False)
+    if claimed != len(ids):
+        db.session.rollback()
+        return False
+    db.session.commit()
+    return True
+
+def _mark_sent(events, now):
+    """Complete a lease once the digest went out."""
+    NotificationEvent.query.filter(
+        NotificationEvent.id.in_([event.id for event in events]),
+        NotificationEvent.claimed_at == now
+    ).update({NotificationEvent.sent_at: now}, synchronize_session=False)
+    db.session.commit()
+
+def _send_lab_digest(lab, events, max_items):
+    from .notifications import get_discord_webhook_for_lab, send_discord_notification
+
+    webhook_url = get_discord_webhook_for_lab(lab.name) if lab else None
+    if not webhook_url:
+        return True  # nobody to tell
+    lines = [f"• **{event.complaint_ref}** {event.summary}" for event in events[:max_items]]
+    if len(events) > max_items:
+        lines.append(f"…and {len(events) - max_items} more")
+    return send_discord_notification(webhook_url, {
+        "content": f"🗂️ **{len(events)} complaint update(s) in {lab.name}**",
+        "title": f"{lab.name} activity digest",
+        "description": '\n'.join(lines)[:4000],
+        "color": 3447003,
+        "timestamp": events[-1].created_at.isoformat()
+    })
+
+def _send_admin_digest(admin, events, max_items):
+    from .notifications import render_notification, send_email
+
+    if not admin or not admin.is_active:
+        return True  # nobody to tell
+    body, text_body = render_notification(
+        'digest', admin=admin, events=events[:max_items],
+        remaining=max(len(events) - max_items, 0), total=len(events)
+    )
+    return send_email(admin.email, f"🗂️ TechResolve digest: {len(events)} update(s)", body, text_body)
+
+def flush_due_digests(now=None, force=False):
+    """
+    Send one Discord post per lab and one email per admin covering all of
+    its pending events, for every recipient whose oldest event is due.
+    force=True flushes everything pending (e.g. at shutdown).
+    Events are only marked sent after their digest was delivered; a failed
+    digest is retried once its lease (NOTIFICATION_DIGEST_LEASE) expires.
+    :return: number of digests sent
+    """
+    now = now or datetime.utcnow()
+    max_items = current_app.config.get('NOTIFICATION_DIGEST_MAX_ITEMS', 10)
+    lease = timedelta(seconds=current_app.config.get('NOTIFICATION_DIGEST_LEASE', 300))
+
+    due = db.session.query(NotificationEvent.channel, NotificationEvent.recipient_id)\
+        .filter(_available(now, lease))\
+        .group_by(NotificationEvent.channel, NotificationEvent.recipient_id)
+    if not force:
+        due = due.having(func.min(NotificationEvent.due_at) <= now)
+    due = due.all()
+    if not due:
+        return 0
+
+    lab_ids = {recipient for channel, recipient in due if channel == 'discord'}
+    admin_ids = {recipient for channel, recipient in due if channel == 'email'}
+    labs = {lab.id: lab for lab in Lab.query.filter(Lab.id.in_(lab_ids))} if lab_ids else {}
+    admins = {admin.id: admin for admin in Admin.query.filter(Admin.id.in_(admin_ids))} if admin_ids else {}
+
+    pending = defaultdict(list)
+    for event in NotificationEvent.query.filter(
+        _available(now, lease),
+        NotificationEvent.created_at <= now
+    ).order_by(NotificationEvent.id.asc()):
+        pending[(event.channel, event.recipient_id)].append(event)
+
+    sent = 0
+    for key in due:
+        events = pending.get(tuple(key))
+        if not events or not _claim(events, now, lease):
+            continue
+        channel, recipient_id = key
+        try:
+            if channel == 'discord':
+                delivered = _send_lab_digest(labs.get(recipient_id), events, max_items)
+            else:
+                delivered = _send_admin_digest(admins.get(recipient_id), events, max_items)
+        except Exception as e:
+            print(f"❌ Error sending {channel} digest to {recipient_id}: {e}")
+            delivered = False
+        if delivered:
+            _mark_sent(events, now)
+            sent += 1
+        else:
+            print(f"⚠️ {channel} digest to {recipient_id} not delivered; retrying after the lease expires")
+    return sent
+
+
+# --------------------------
+# Scheduler
+# --------------------------
+def _run_scheduler(app):
+    interval = app.config.get('NOTIFICATION_DIGEST_POLL_INTERVAL', 30)
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                flush_due_digests()
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Digest scheduler error: {e}")
+
+def _ensure_scheduler():
+    """
+    Start the in-process digest thread on the first request (and when
+    something is queued), so events already waiting in notification_queue
+    are flushed after a restart.
+    """
+    global _scheduler
+    if current_app.config.get('TESTING') or _scheduler is not None:
+        return
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = threading.Thread(
+                target=_run_scheduler, args=(current_app._get_current_object(),),
+                name='digest-scheduler', daemon=True
+            )
+            _scheduler.start()
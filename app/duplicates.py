@@ -0,0 +1,217 @@
+import hashlib
+import re
+import threading
+from types import SimpleNamespace
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .extensions import db
+from .models import Complaint
+
+OPEN_STATUSES = ('Pending', 'In Progress')
+SHINGLE_SIZE = 5          # characters per shingle
+SIGNATURE_SIZE = 64       # MinHash slots
+BANDS = 16                # LSH bands of SIGNATURE_SIZE // BANDS rows each
+ROWS = SIGNATURE_SIZE // BANDS
+_EMPTY = (1 << 64) - 1
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+# --------------------------
+# MinHash Signatures
+# --------------------------
+def normalize(text):
+    return _NON_WORD.sub(' ', (text or '').lower()).strip()
+
+def signature(text):
+    """
+    MinHash signature of a text's character shingles, built with one
+    permutation hashing: each shingle is hashed once (64-bit) and only
+    lowers the minimum of the slot its top bits select, so the cost is one
+    hash per shingle instead of one per shingle per slot. Empty slots
+    borrow from the next filled slot (rotation densification).
+    :return: tuple of SIGNATURE_SIZE ints, or None for texts too short to compare
+    """
+    text = normalize(text)
+    if len(text) < SHINGLE_SIZE:
+        return None
+    slots = [_EMPTY] * SIGNATURE_SIZE
+    for shingle in {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big')
+        slot = value >> 58  # top 6 bits: 0..63
+        if value < slots[slot]:
+            slots[slot] = value
+    for i in range(SIGNATURE_SIZE):
+        offset = 1
+        while slots[i] == _EMPTY and offset < SIGNATURE_SIZE:
+            candidate = slots[(i + offset) % SIGNATURE_SIZE]
+            if candidate != _EMPTY:
+                slots[i] = candidate + offset  # distinguish borrowed values per slot
+            offset += 1
+    return tuple(slots)
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / SIGNATURE_SIZE
+
+
+# --------------------------
+# LSH Index
+# --------------------------
+class DuplicateIndex:
+    """
+    Signatures of open complaints, banded into per-lab LSH buckets. A lookup
+    hashes the text once and probes BANDS buckets, then checks the few
+    candidates' signatures, so it does not grow with the number of open
+    complaints.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._buckets = {}     # (lab id, band, band values) -> set of complaint ids
+        self._entries = {}     # complaint id -> (lab id, signature, parent id)
+
+    @staticmethod
+    def _bands(signature):
+        return [(band, signature[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+    def _remove(self, complaint_id):
+        entry = self._entries.pop(complaint_id, None)
+        if entry is None:
+            return
+        lab_id, sig, _ = entry
+        for band, values in self._bands(sig):
+            bucket = self._buckets.get((lab_id, band, values))
+            if bucket:
+                bucket.discard(complaint_id)
+                if not bucket:
+                    del self._buckets[(lab_id, band, values)]
+
+    def _add(self, complaint):
+        self._remove(complaint.id)
+        if complaint.status not in OPEN_STATUSES or complaint.archived:
+            return
+        sig = signature(complaint.description)
+        if sig is None:
+            return
+        self._entries[complaint.id] = (complaint.lab_id, sig, complaint.duplicate_of_id)
+        for band, values in self._bands(sig):
+            self._buckets.setdefault((complaint.lab_id, band, values), set()).add(complaint.id)
+
+    def load(self):
+        rows = db.session.query(
+            Complaint.id, Complaint.lab_id, Complaint.description, Complaint.status,
+            Complaint.archived, Complaint.duplicate_of_id
+        ).filter(Complaint.status.in_(OPEN_STATUSES)).all()
+        with self._lock:
+            self._buckets, self._entries = {}, {}
+            for row in rows:
+                self._add(row)
+            self.loaded = True
+
+    def track(self, complaint):
+        with self._lock:
+            self._add(complaint)
+
+    def find(self, lab_id, text, exclude=None):
+        """
+        The open complaint in the same lab that text most likely duplicates.
+        :return: (complaint id, its parent id or None, similarity) or None
+        """
+        sig = signature(text)
+        if sig is None:
+            return None
+        with self._lock:
+            candidates = set()
+            for band, values in self._bands(sig):
+                candidates |= self._buckets.get((lab_id, band, values), set())
+            candidates.discard(exclude)
+            best = None
+            for complaint_id in candidates:
+                score = similarity(sig, self._entries[complaint_id][1])
+                if score >= self.threshold and (best is None or (score, -complaint_id) > (best[1], -best[0])):
+                    best = (complaint_id, score)
+            if best is None:
+                return None
+            return (best[0], self._entries[best[0]][2], best[1])
+
+
+def init_duplicates(app):
+    app.extensions['duplicate_index'] = DuplicateIndex(app.config.get('DUPLICATE_THRESHOLD', 0.6))
+
+def load_duplicate_index(app):
+    """Index open complaints at startup; a failure leaves it to the first use."""
+    if not app.config.get('DUPLICATE_DETECTION'):
+        return
+    try:
+        app.extensions['duplicate_index'].load()
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ Duplicate index not loaded: {e}")
+
+def get_duplicate_index():
+    index = current_app.extensions['duplicate_index']
+    if not index.loaded:
+        index.load()
+    return index
+
+
+# --------------------------
+# Change Tracking
+# --------------------------
+@event.listens_for(Complaint, 'after_insert')
+@event.listens_for(Complaint, 'after_update')
+def _remember_complaint(mapper, connection, target):
+    snapshot = SimpleNamespace(
+        id=target.id, lab_id=target.lab_id, description=target.description, status=target.status,
+        archived=target.archived, duplicate_of_id=target.duplicate_of_id
+    )
+    Session.object_session(target).info.setdefault('duplicates_changed', []).append(snapshot)
+
+@event.listens_for(Session, 'after_commit')
+def _apply_duplicate_changes(session):
+    changed = session.info.pop('duplicates_changed', None)
+    if not changed or not has_app_context():
+        return
+    index = current_app.extensions.get('duplicate_index')
+    if index is None or not index.loaded:
+        return
+    for snapshot in changed:
+        index.track(snapshot)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_duplicate_changes(session):
+    session.info.pop('duplicates_changed', None)
+
+
+# --------------------------
+# Linking
+# --------------------------
+def link_duplicate(complaint):
+    """
+    Point a new (flushed, uncommitted) complaint at the open complaint it
+    duplicates, if any, and give it the parent's assignee. The caller
+    commits and skips the lab/assignment notifications for duplicates.
+    :return: the parent Complaint, or None
+    """
+    if not current_app.config.get('DUPLICATE_DETECTION'):
+        return None
+    match = get_duplicate_index().find(complaint.lab_id, complaint.description, exclude=complaint.id)
+    if match is None:
+        return None
+    # Duplicates chain to the first report while it is still open
+    parent = None
+    for candidate_id in filter(None, (match[1], match[0])):
+        parent = db.session.get(Complaint, candidate_id)
+        if parent is not None and parent.status in OPEN_STATUSES and not parent.archived:
+            break
+        parent = None
+    if parent is None:
+        return None
+
+    complaint.duplicate_of_id = parent.id
+    if parent.assigned_admin is not None:
+        complaint.assign(parent.assigned_admin)
+    return parent
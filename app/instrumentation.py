@@ -0,0 +1,199 @@
+import hmac
+import threading
+import time
+from flask import Response, abort, current_app, g, has_request_context, request
+from sqlalchemy import event
+from .extensions import db
+
+# Request latency histogram buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# --------------------------
+# Metrics Registry
+# --------------------------
+class EndpointStats:
+    """Accumulated timings for one Flask endpoint."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.sql_rows = 0
+
+    def observe(self, latency, status_code, sql_count, sql_time, sql_rows):
+        self.requests += 1
+        if status_code >= 500:
+            self.errors += 1
+        self.latency_sum += latency
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.latency_buckets[i] += 1
+        self.sql_count += sql_count
+        self.sql_time += sql_time
+        self.sql_rows += sql_rows
+
+
+class MetricsRegistry:
+    """
+    Thread-safe per-endpoint metrics for this process.
+    Each worker process keeps its own registry, as with any in-process
+    Prometheus client.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def observe(self, endpoint, latency, status_code, sql_count, sql_time, sql_rows):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats()
+            stats.observe(latency, status_code, sql_count, sql_time, sql_rows)
+
+    def snapshot(self):
+        """Return {endpoint: dict of totals} copied under the lock."""
+        with self._lock:
+            return {
+                endpoint: {
+                    'requests': s.requests,
+                    'errors': s.errors,
+                    'latency_sum': s.latency_sum,
+                    'latency_buckets': list(s.latency_buckets),
+                    'sql_count': s.sql_count,
+                    'sql_time': s.sql_time,
+                    'sql_rows': s.sql_rows
+                }
+                for endpoint, s in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def render_prometheus(self):
+        """Render the registry in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP techresolve_request_duration_seconds Request latency per endpoint.',
+            '# TYPE techresolve_request_duration_seconds histogram',
+        ]
+        for endpoint, s in sorted(snapshot.items()):
+            label = _escape_label(endpoint)
+            for bound, count in zip(LATENCY_BUCKETS, s['latency_buckets']):
+                lines.append(
+                    f'techresolve_request_duration_seconds_bucket{{endpoint="{label}",le="{bound}"}} {count}'
+                )
+            lines.append(f'techresolve_request_duration_seconds_bucket{{endpoint="{label}",le="+Inf"}} {s["requests"]}')
+            lines.append(f'techresolve_request_duration_seconds_sum{{endpoint="{label}"}} {s["latency_sum"]:.6f}')
+            lines.append(f'techresolve_request_duration_seconds_count{{endpoint="{label}"}} {s["requests"]}')
+
+        counters = (
+            ('techresolve_request_errors_total', 'Responses with a 5xx status.', 'errors', '{}'),
+            ('techresolve_sql_queries_total', 'SQL statements executed.', 'sql_count', '{}'),
+            ('techresolve_sql_duration_seconds_total', 'Time spent executing SQL.', 'sql_time', '{:.6f}'),
+            ('techresolve_sql_rows_total', 'Rows reported by the database cursor.', 'sql_rows', '{}'),
+        )
+        for name, help_text, key, fmt in counters:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for endpoint, s in sorted(snapshot.items()):
+                lines.append(f'{name}{{endpoint="{_escape_label(endpoint)}"}} {fmt.format(s[key])}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+metrics = MetricsRegistry()
+
+
+# --------------------------
+# SQLAlchemy Hooks
+# --------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('query_start_time')
+    elapsed = time.perf_counter() - start_times.pop() if start_times else 0.0
+
+    if not has_request_context() or 'sql_stats' not in g:
+        return
+
+    stats = g.sql_stats
+    stats['count'] += 1
+    stats['time'] += elapsed
+    # psycopg2 buffers results, so rowcount is the number of rows fetched
+    # for SELECTs; drivers that report -1 (e.g. sqlite3) contribute nothing
+    rowcount = getattr(cursor, 'rowcount', -1)
+    if rowcount and rowcount > 0:
+        stats['rows'] += rowcount
+
+def install_sql_hooks(engine):
+    """Attach the cursor timing listeners to an engine (idempotent)."""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+# --------------------------
+# Flask Hooks
+# --------------------------
+def _start_request_timer():
+    g.request_start_time = time.perf_counter()
+    g.sql_stats = {'count': 0, 'time': 0.0, 'rows': 0}
+
+def _record_request(response):
+    start = g.pop('request_start_time', None)
+    stats = g.get('sql_stats')
+    if start is None or stats is None:
+        return response
+
+    latency = time.perf_counter() - start
+    endpoint = request.endpoint or 'unmatched'
+    metrics.observe(endpoint, latency, response.status_code, stats['count'], stats['time'], stats['rows'])
+
+    server_timing = current_app.config.get('METRICS_SERVER_TIMING')
+    if server_timing is None:
+        server_timing = current_app.debug
+    if server_timing:
+        response.headers.add(
+            'Server-Timing',
+            f'app;dur={latency * 1000:.1f}, '
+            f'db;dur={stats["time"] * 1000:.1f};desc="{stats["count"]} queries"'
+        )
+    return response
+
+def metrics_view():
+    """
+    Prometheus scrape endpoint. Requires METRICS_TOKEN as a bearer token;
+    without one configured it is only served in debug mode.
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        if not current_app.debug:
+            abort(404)
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        abort(401)
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+def init_instrumentation(app):
+    """
+    Record per-endpoint latency, SQL count, SQL time and rows for every
+    request handled by the app (all blueprints) and expose them at /metrics.
+    Must be called inside an application context.
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    install_sql_hooks(db.engine)
+    app.before_request(_start_request_timer)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
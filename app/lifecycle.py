@@ -0,0 +1,73 @@
+from sqlalchemy import case, func
+from .extensions import db
+from .models import Complaint, ComplaintLog
+
+LIFECYCLE_COLUMNS = ('first_assigned_at', 'first_in_progress_at', 'resolved_at', 'terminated_at')
+
+
+# --------------------------
+# Backfill
+# --------------------------
+def _changed_to(status):
+    return db.and_(ComplaintLog.action == 'STATUS_CHANGED', ComplaintLog.new_value == status)
+
+def _log_times(complaint_ids):
+    """
+    Lifecycle times per complaint from its activity log, in one grouped
+    query: first assignment, first move to In Progress, latest Resolved and
+    latest Terminated.
+    """
+    rows = db.session.query(
+        ComplaintLog.complaint_id,
+        func.min(case((ComplaintLog.action == 'ADMIN_ASSIGNED', ComplaintLog.timestamp))).label('first_assigned_at'),
+        func.min(case((_changed_to('In Progress'), ComplaintLog.timestamp))).label('first_in_progress_at'),
+        func.max(case((_changed_to('Resolved'), ComplaintLog.timestamp))).label('resolved_at'),
+        func.max(case((_changed_to('Terminated'), ComplaintLog.timestamp))).label('terminated_at')
+    ).filter(ComplaintLog.complaint_id.in_(complaint_ids)).group_by(ComplaintLog.complaint_id)
+    return {row.complaint_id: row for row in rows}
+
+def backfill_lifecycle(batch_size: int = 500):
+    """
+    Fill missing lifecycle timestamps from complaint_logs. resolved_at and
+    terminated_at are only set when the complaint is currently in that
+    status; complaints resolved before status changes were logged fall
+    back to updated_at, which is what reports used to measure.
+    :return: number of complaints updated
+    """
+    updated = 0
+    last_id = 0
+    missing = db.or_(*(getattr(Complaint, column).is_(None) for column in LIFECYCLE_COLUMNS))
+
+    while True:
+        complaints = Complaint.query.filter(Complaint.id > last_id, missing)\
+            .order_by(Complaint.id.asc()).limit(batch_size).all()
+        if not complaints:
+            break
+        last_id = complaints[-1].id
+
+        times = _log_times([complaint.id for complaint in complaints])
+        try:
+            for complaint in complaints:
+                logged = times.get(complaint.id)
+                values = {}
+                if complaint.first_assigned_at is None and logged and logged.first_assigned_at:
+                    values['first_assigned_at'] = logged.first_assigned_at
+                if complaint.first_in_progress_at is None and logged and logged.first_in_progress_at:
+                    values['first_in_progress_at'] = logged.first_in_progress_at
+                if complaint.resolved_at is None and complaint.status == 'Resolved':
+                    values['resolved_at'] = (logged and logged.resolved_at) or complaint.updated_at
+                if complaint.terminated_at is None and complaint.status == 'Terminated':
+                    values['terminated_at'] = (logged and logged.terminated_at) or complaint.updated_at
+                if values:
+                    # Keep updated_at as is (it would otherwise be bumped by onupdate)
+                    values['updated_at'] = complaint.updated_at
+                    db.session.query(Complaint).filter_by(id=complaint.id)\
+                        .update(values, synchronize_session=False)
+                    updated += 1
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error backfilling lifecycle timestamps after complaint {last_id}: {e}")
+            break
+
+    return updated
@@ -57,17 +57,54 @@ class Complaint(db.Model):
     category = db.Column(db.String(50), nullable=False)  # Hardware / Software / Network / Other
     description = db.Column(db.Text, nullable=False)
     attachment_path = db.Column(db.String(255), nullable=True)
-    status = db.Column(db.String(50), nullable=False, default='Pending')  # Pending / In Progress / Resolved
+    status = db.Column(db.String(50), nullable=False, default='Pending', index=True)  # Pending / In Progress / Resolved
     priority = db.Column(db.String(20), nullable=True)  # Low / Medium / High
-    tags = db.Column(db.String(255), nullable=False, default='none')  # Comma-separated tags
+    tags = db.Column(db.String(255), nullable=False, default='none')  # Comma-separated tags, as entered (indexed copy: complaint_tags)
     resolution_notes = db.Column(db.Text, nullable=True)
     archived = db.Column(db.Boolean, nullable=False, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Lifecycle timestamps, set by set_status()/assign() (backfill: `flask --app run backfill-lifecycle`)
+    first_assigned_at = db.Column(db.DateTime, nullable=True, index=True)
+    first_in_progress_at = db.Column(db.DateTime, nullable=True, index=True)
+    resolved_at = db.Column(db.DateTime, nullable=True, index=True)  # latest resolution; cleared if reopened
+    terminated_at = db.Column(db.DateTime, nullable=True, index=True)
+    # Earlier open report this one duplicates (no FK: parents may move to the archive)
+    duplicate_of_id = db.Column(db.Integer, nullable=True, index=True)
 
     # Relationship to logs
     logs = db.relationship('ComplaintLog', backref='complaint', lazy=True, cascade='all, delete-orphan')
     assigned_admin = db.relationship('Admin', backref='assigned_complaints', foreign_keys=[assigned_admin_id])
+    attachments = db.relationship(
+        'ComplaintAttachment', backref='complaint', lazy=True,
+        order_by='ComplaintAttachment.id'
+    )
+    duplicate_of = db.relationship(
+        'Complaint', primaryjoin='foreign(Complaint.duplicate_of_id) == remote(Complaint.id)',
+        uselist=False, viewonly=True
+    )
+    duplicates = db.relationship(
+        'Complaint', primaryjoin='remote(foreign(Complaint.duplicate_of_id)) == Complaint.id',
+        viewonly=True, order_by='Complaint.id'
+    )
+    # Kept in step with `tags` on every flush (see app/tags.py)
+    tag_list = db.relationship('Tag', secondary='complaint_tags', viewonly=True, order_by='Tag.name')
+
+    def set_status(self, status, at=None):
+        """Change status and keep the lifecycle timestamps in step."""
+        at = at or datetime.utcnow()
+        self.status = status
+        if status == 'In Progress' and self.first_in_progress_at is None:
+            self.first_in_progress_at = at
+        # Only the current outcome is kept: reopening clears it
+        self.resolved_at = at if status == 'Resolved' else None
+        self.terminated_at = at if status == 'Terminated' else None
+
+    def assign(self, admin, at=None):
+        """Assign (or unassign with None) and stamp the first assignment."""
+        self.assigned_admin = admin
+        if admin is not None and self.first_assigned_at is None:
+            self.first_assigned_at = at or datetime.utcnow()
 
     def __repr__(self):
         return f"<Complaint {self.complaint_id}>"
@@ -78,6 +115,9 @@ class Complaint(db.Model):
 # ---------------------------
 class ComplaintLog(db.Model):
     __tablename__ = 'complaint_logs'
+    __table_args__ = (
+        db.Index('ix_complaint_logs_timestamp_id', 'timestamp', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     complaint_id = db.Column(db.Integer, db.ForeignKey('complaints.id'), nullable=False)
@@ -104,3 +144,176 @@ class ComplaintLog(db.Model):
 
     def __repr__(self):
         return f"<ComplaintLog {self.id} for Complaint {self.complaint_id}>"
+
+
+# ---------------------------
+# Archived Complaint Table (cold storage)
+# ---------------------------
+class ArchivedComplaint(db.Model):
+    __tablename__ = 'archived_complaints'
+
+    id = db.Column(db.Integer, primary_key=True)
+    original_id = db.Column(db.Integer, unique=True, nullable=False)  # complaints.id before archival
+    complaint_id = db.Column(db.String(20), unique=True, nullable=False)
+    email = db.Column(db.String(150), nullable=False, index=True)
+    lab_id = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String(50), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=True)  # last update in the hot table
+    moved_at = db.Column(db.DateTime, default=datetime.utcnow)
+    payload = db.Column(db.LargeBinary, nullable=False)  # zlib-compressed JSON of complaint + logs
+
+    def __repr__(self):
+        return f"<ArchivedComplaint {self.complaint_id}>"
+
+
+# ---------------------------
+# Complaint View Rollup Table
+# ---------------------------
+class ComplaintViewRollup(db.Model):
+    __tablename__ = 'complaint_view_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('complaint_id', 'admin_id', 'day', name='uq_view_rollup_complaint_admin_day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    complaint_id = db.Column(db.Integer, db.ForeignKey('complaints.id'), nullable=False, index=True)
+    admin_id = db.Column(db.Integer, db.ForeignKey('admins.id'), nullable=True)
+    day = db.Column(db.Date, nullable=False)
+    view_count = db.Column(db.Integer, nullable=False, default=0)
+    total_view_duration = db.Column(db.Integer, nullable=False, default=0)  # seconds
+
+    def __repr__(self):
+        return f"<ComplaintViewRollup complaint={self.complaint_id} admin={self.admin_id} day={self.day}>"
+
+
+# ---------------------------
+# Attachment Table (content-addressed store)
+# ---------------------------
+class Attachment(db.Model):
+    __tablename__ = 'attachments'
+
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), unique=True, nullable=False)  # file lives at uploads/ab/cd/<sha256>
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)  # hot links + cold-storage payloads
+    thumbnail_path = db.Column(db.String(120), nullable=True)  # ab/cd/<sha256>.t<size>.<fmt>, set by the thumbnail job
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Attachment {self.sha256[:12]} refs={self.ref_count}>"
+
+
+# ---------------------------
+# Complaint Attachment Table
+# ---------------------------
+class ComplaintAttachment(db.Model):
+    __tablename__ = 'complaint_attachments'
+
+    id = db.Column(db.Integer, primary_key=True)
+    complaint_id = db.Column(db.Integer, db.ForeignKey('complaints.id'), nullable=False, index=True)
+    attachment_id = db.Column(db.Integer, db.ForeignKey('attachments.id'), nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=False)  # name as uploaded (sanitized)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    attachment = db.relationship('Attachment', lazy='joined')
+
+    @property
+    def url_path(self):
+        """Path for main.uploaded_file: ab/cd/<sha256>/<filename>"""
+        from .attachments import attachment_url_path
+        return attachment_url_path(self.attachment.sha256, self.filename)
+
+    @property
+    def thumbnail_path(self):
+        return self.attachment.thumbnail_path
+
+    def __repr__(self):
+        return f"<ComplaintAttachment {self.filename} for Complaint {self.complaint_id}>"
+
+
+# ---------------------------
+# Tag Tables
+# ---------------------------
+class Tag(db.Model):
+    __tablename__ = 'tags'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)  # lower-case, as in parse_tags()
+
+    def __repr__(self):
+        return f"<Tag {self.name}>"
+
+
+class ComplaintTag(db.Model):
+    __tablename__ = 'complaint_tags'
+    __table_args__ = (
+        # Tag filters and counts go tag -> complaints; the primary key covers complaint -> tags
+        db.Index('ix_complaint_tags_tag_id_complaint_id', 'tag_id', 'complaint_id'),
+    )
+
+    complaint_id = db.Column(db.Integer, db.ForeignKey('complaints.id', ondelete='CASCADE'), primary_key=True)
+    tag_id = db.Column(db.Integer, db.ForeignKey('tags.id'), primary_key=True)
+
+    def __repr__(self):
+        return f"<ComplaintTag complaint={self.complaint_id} tag={self.tag_id}>"
+
+
+# ---------------------------
+# Notification Preference Table
+# ---------------------------
+class NotificationPreference(db.Model):
+    __tablename__ = 'notification_preferences'
+
+    admin_id = db.Column(db.Integer, db.ForeignKey('admins.id'), primary_key=True)
+    email_notifications = db.Column(db.Boolean, nullable=False, default=True)
+    assignment_notifications = db.Column(db.Boolean, nullable=False, default=True)
+    status_notifications = db.Column(db.Boolean, nullable=False, default=True)
+    daily_summary = db.Column(db.Boolean, nullable=False, default=False)  # batch my emails into one a day
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<NotificationPreference admin={self.admin_id}>"
+
+
+# ---------------------------
+# SLA Breach Table
+# ---------------------------
+class SlaBreach(db.Model):
+    __tablename__ = 'sla_breaches'
+    __table_args__ = (
+        db.UniqueConstraint('complaint_id', 'clock', 'due_at', name='uq_sla_breach'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    complaint_id = db.Column(db.Integer, nullable=False, index=True)  # no FK: complaints move to cold storage
+    clock = db.Column(db.String(20), nullable=False)  # 'assign' or 'resolve'
+    due_at = db.Column(db.DateTime, nullable=False)
+    breached_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SlaBreach {self.clock} complaint={self.complaint_id}>"
+
+
+# ---------------------------
+# Notification Queue Table (digest outbox)
+# ---------------------------
+class NotificationEvent(db.Model):
+    __tablename__ = 'notification_queue'
+    __table_args__ = (
+        db.Index('ix_notification_queue_pending', 'sent_at', 'channel', 'recipient_id', 'due_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(20), nullable=False)  # 'discord' (recipient = lab) / 'email' (recipient = admin)
+    recipient_id = db.Column(db.Integer, nullable=False)
+    event_type = db.Column(db.String(50), nullable=False)  # COMPLAINT_CREATED / STATUS_CHANGED / ADMIN_ASSIGNED
+    complaint_ref = db.Column(db.String(20), nullable=False)  # public complaint ID
+    summary = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    due_at = db.Column(db.DateTime, nullable=False)  # the recipient's digest goes out once its oldest event is due
+    claimed_at = db.Column(db.DateTime, nullable=True)  # lease taken by the worker sending the digest
+    sent_at = db.Column(db.DateTime, nullable=True)  # set only after delivery succeeded
+
+    def __repr__(self):
+        return f"<NotificationEvent {self.event_type} {self.complaint_ref} -> {self.channel}:{self.recipient_id}>"
@@ -1,13 +1,92 @@
 from flask_mail import Message
-from flask import current_app
+from collections import OrderedDict
+from types import SimpleNamespace
+from flask import current_app, has_app_context
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+from sqlalchemy import event
 from .extensions import mail
+from .digests import queue_admin_event, queue_lab_event, route_admin_event
+from .models import Lab
 import requests
 import os
+import threading
+import time
+
+TEMPLATE_FOLDER = os.path.join(os.path.dirname(__file__), 'templates')
+NOTIFICATION_TEMPLATES = (
+    'complaint_created', 'complaint_assigned', 'status_changed', 'sla_breach', 'digest',
+    'bulk_update', 'admin_bulk_update'
+)
+
+# Email styling per complaint status
+STATUS_STYLES = {
+    'Pending': {'bg': '#fef3c7', 'text': '#92400e', 'icon': '⏳'},
+    'In Progress': {'bg': '#dbeafe', 'text': '#1e40af', 'icon': '🔄'},
+    'Resolved': {'bg': '#d1fae5', 'text': '#065f46', 'icon': '✅',
+                 'header': '#10b981', 'note_bg': '#ecfdf5', 'note_text': '#065f46'},
+    'Terminated': {'bg': '#fee2e2', 'text': '#991b1b', 'icon': '❌',
+                   'header': '#ef4444', 'note_bg': '#fef2f2', 'note_text': '#991b1b'}
+}
+DEFAULT_STATUS_STYLE = {
+    'bg': '#f3f4f6', 'text': '#374151', 'icon': '📋',
+    'header': '#3b82f6', 'note_bg': '#eff6ff', 'note_text': '#1e40af'
+}
 
 # --------------------------
-# Get Discord Webhook URL for Lab
+# Notification Templates
 # --------------------------
-def get_discord_webhook_for_lab(lab_name):
+class NotificationTemplates:
+    """
+    Email templates (templates/email/*.html + *.txt) compiled once.
+    Uses its own Jinja environment: autoescaped HTML, a bytecode cache so
+    restarts skip compilation, no auto-reload, and fragment() which renders
+    context-free partials (footer) once and reuses the result.
+    """
+
+    def __init__(self, cache_dir=None):
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.env = Environment(
+            loader=FileSystemLoader(TEMPLATE_FOLDER),
+            autoescape=select_autoescape(['html']),
+            bytecode_cache=FileSystemBytecodeCache(cache_dir),
+            auto_reload=False,
+            cache_size=-1
+        )
+        self._fragments = {}
+        self.env.globals['fragment'] = self.fragment
+        self.templates = {}
+        for name in NOTIFICATION_TEMPLATES:
+            self.templates[name] = (
+                self.env.get_template(f'email/{name}.html'),
+                self.env.get_template(f'email/{name}.txt')
+            )
+
+    def fragment(self, name):
+        if name not in self._fragments:
+            rendered = self.env.get_template(name).render()
+            self._fragments[name] = Markup(rendered) if name.endswith('.html') else rendered
+        return self._fragments[name]
+
+    def render(self, name, **context):
+        """Return (html, text) bodies for a notification."""
+        html_template, text_template = self.templates[name]
+        return html_template.render(**context), text_template.render(**context)
+
+def init_notification_templates(app):
+    """Compile the notification templates at startup."""
+    app.extensions['notification_templates'] = NotificationTemplates(
+        app.config.get('NOTIFICATION_TEMPLATE_CACHE_DIR')
+    )
+
+def render_notification(name, **context):
+    return current_app.extensions['notification_templates'].render(name, **context)
+
+# --------------------------
+# Discord Webhook Registry
+# --------------------------
+def _webhook_from_env(lab_name):
     """
     Get Discord webhook URL from environment variables based on lab name.
     Format: DISCORD_{LAB_NAME}_WEBHOOK (uppercase, spaces replaced with underscores)
@@ -17,9 +96,6 @@ def get_discord_webhook_for_lab(lab_name):
     - "ISL" → DISCORD_ISL_WEBHOOK
     - "IBM Lab" → DISCORD_IBM_LAB_WEBHOOK
     """
-    if not lab_name:
-        return None
-    
     # Convert lab name to environment variable format
     # "CC Lab" -> "CC_LAB", "IBM Lab" -> "IBM_LAB"
     env_key = f"DISCORD_{lab_name.upper().replace(' ', '_')}_WEBHOOK"
@@ -31,17 +107,73 @@ def get_discord_webhook_for_lab(lab_name):
         env_key_alt = f"DISCORD_{lab_name.upper().replace(' ', '')}_WEBHOOK"
         webhook_url = os.getenv(env_key_alt)
     
-    return webhook_url if webhook_url and webhook_url.strip() else None
+    return webhook_url.strip() if webhook_url and webhook_url.strip() else None
+
+class WebhookRegistry:
+    """
+    Lab name → Discord webhook URL for every lab, loaded with one query.
+    Lab.discord_webhook wins; the DISCORD_*_WEBHOOK environment variables are
+    the fallback. Lab inserts/updates/deletes in this process invalidate the
+    map, and it is reloaded after `ttl` seconds to pick up changes made
+    elsewhere (e.g. configure_discord.py).
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._webhooks = {}
+        self._loaded_at = None
+
+    def _load(self):
+        webhooks = {}
+        for name, webhook in Lab.query.with_entities(Lab.name, Lab.discord_webhook):
+            webhooks[name] = webhook.strip() if webhook and webhook.strip() else _webhook_from_env(name)
+        return webhooks
+
+    def _stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def get(self, lab_name):
+        if not lab_name:
+            return None
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    self._webhooks = self._load()
+                    self._loaded_at = time.monotonic()
+        if lab_name in self._webhooks:
+            return self._webhooks[lab_name]
+        # Not a lab row (yet): env only
+        return _webhook_from_env(lab_name)
+
+    def invalidate(self):
+        self._loaded_at = None
+
+def init_webhook_registry(app):
+    app.extensions['webhook_registry'] = WebhookRegistry(app.config.get('DISCORD_WEBHOOK_CACHE_TTL', 300))
+
+@event.listens_for(Lab, 'after_insert')
+@event.listens_for(Lab, 'after_update')
+@event.listens_for(Lab, 'after_delete')
+def _invalidate_webhooks(mapper, connection, target):
+    if has_app_context() and 'webhook_registry' in current_app.extensions:
+        current_app.extensions['webhook_registry'].invalidate()
+
+def get_discord_webhook_for_lab(lab_name):
+    """Webhook URL for a lab (database first, then environment), or None."""
+    return current_app.extensions['webhook_registry'].get(lab_name)
 
 # --------------------------
 # Send Email
 # --------------------------
-def send_email(to, subject, body):
+def send_email(to, subject, body, text_body=None):
     """
     Send email via Flask-Mail
     :param to: recipient email or list
     :param subject: email subject
     :param body: email body (HTML or plain text)
+    :param text_body: optional plain-text alternative part
+    :return: True if the message was handed to the mail server
     """
     if not isinstance(to, list):
         to = [to]
@@ -51,19 +183,22 @@ def send_email(to, subject, body):
     
     if not sender:
         print("Error: No email sender configured. Set EMAIL_USER in .env file")
-        return
+        return False
 
     msg = Message(
         subject=subject,
         recipients=to,
         html=body,
+        body=text_body,
         sender=sender
     )
     try:
         mail.send(msg)
         print(f"✅ Email sent successfully to: {to}")
+        return True
     except Exception as e:
         print(f"❌ Error sending email: {e}")
+        return False
 
 # --------------------------
 # Send Discord Notification
@@ -73,10 +208,11 @@ def send_discord_notification(webhook_url, embed_data):
     Send rich embed notification to Discord webhook.
     :param webhook_url: Discord webhook URL
     :param embed_data: Dictionary with embed data (title, description, color, fields, etc.)
+    :return: True if Discord accepted the message
     """
     if not webhook_url or not webhook_url.strip():
         print("⚠️ No Discord webhook URL provided - skipping Discord notification")
-        return
+        return False
 
     # Create Discord embed
     embed = {
@@ -106,79 +242,35 @@ def send_discord_notification(webhook_url, embed_data):
         response = requests.post(webhook_url, json=payload, timeout=10)
         if response.status_code in (200, 204):
             print(f"✅ Discord notification sent successfully")
-        else:
-            print(f"❌ Failed to send Discord notification: {response.status_code} - {response.text}")
+            return True
+        print(f"❌ Failed to send Discord notification: {response.status_code} - {response.text}")
     except requests.exceptions.Timeout:
         print(f"⏱️ Discord notification timeout - webhook may be slow or invalid")
     except Exception as exc:
         print(f"❌ Error sending Discord notification: {exc}")
+    return False
 
 # --------------------------
 # Combined Notification Function
 # --------------------------
-def notify_complaint_creation(complaint):
-    """Notify user and lab channel about a new complaint."""
-    subject = f"✅ Complaint Received: {complaint.complaint_id}"
-    body = f"""
-    <html>
-    <body style="font-family: Arial, sans-serif; padding: 20px; background-color: #f9fafb;">
-        <div style="max-width: 600px; margin: 0 auto; background-color: white; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-            <div style="background-color: #4f46e5; padding: 20px; text-align: center;">
-                <h2 style="color: white; margin: 0;">TechResolve - Complaint Registered</h2>
-            </div>
-            <div style="padding: 30px;">
-                <p style="font-size: 16px; color: #374151;">Hello <strong>{complaint.name}</strong>,</p>
-                <p style="font-size: 14px; color: #6b7280;">Your complaint has been successfully registered in our system.</p>
-                
-                <div style="background-color: #f3f4f6; padding: 20px; border-radius: 6px; margin: 20px 0;">
-                    <h3 style="color: #1f2937; margin-top: 0; font-size: 16px;">Complaint Details:</h3>
-                    <table style="width: 100%; font-size: 14px;">
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280; width: 40%;"><strong>Complaint ID:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;"><strong style="color: #4f46e5;">{complaint.complaint_id}</strong></td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Lab:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;">{complaint.lab.name}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Category:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;">{complaint.category}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Status:</strong></td>
-                            <td style="padding: 8px 0;"><span style="background-color: #fef3c7; color: #92400e; padding: 4px 12px; border-radius: 12px; font-size: 12px;">{complaint.status}</span></td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Priority:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;">{complaint.priority or 'Low'}</td>
-                        </tr>
-                    </table>
-                </div>
-                
-                <p style="font-size: 14px; color: #6b7280;">We will keep you updated on the progress via email notifications.</p>
-                
-                <div style="background-color: #dbeafe; border-left: 4px solid #3b82f6; padding: 15px; margin: 20px 0;">
-                    <p style="margin: 0; font-size: 13px; color: #1e40af;">
-                        <strong>💡 Track Your Complaint:</strong><br>
-                        Use your Complaint ID <strong>{complaint.complaint_id}</strong> or email address to track the status anytime.
-                    </p>
-                </div>
-            </div>
-            <div style="background-color: #f9fafb; padding: 20px; text-align: center; border-top: 1px solid #e5e7eb;">
-                <p style="font-size: 12px; color: #6b7280; margin: 0;">
-                    TechResolve - Technical Complaint Management System<br>
-                    PSG College of Technology
-                </p>
-            </div>
-        </div>
-    </body>
-    </html>
+def notify_complaint_creation(complaint, lab_alert=True):
     """
-    send_email(complaint.email, subject, body)
+    Notify user and lab channel about a new complaint. Duplicates pass
+    lab_alert=False: the lab was already alerted about their parent.
+    """
+    subject = f"✅ Complaint Received: {complaint.complaint_id}"
+    body, text_body = render_notification('complaint_created', complaint=complaint)
+    send_email(complaint.email, subject, body, text_body)
+    if not lab_alert:
+        return
 
     # Send Discord notification to lab admins (not to user)
     webhook_url = get_discord_webhook_for_lab(complaint.lab.name)
+    if webhook_url and queue_lab_event(
+        complaint.lab, 'COMPLAINT_CREATED', complaint,
+        f"🆕 new {complaint.category} complaint from {complaint.name}"
+    ):
+        return
     if webhook_url:
         discord_data = {
             "content": "🆕 **New Complaint Received**",
@@ -206,78 +298,25 @@ def notify_assignment(complaint, assigned_admin, actor):
         return
 
     subject = f"🔔 Complaint Assigned: {complaint.complaint_id}"
-    body = f"""
-    <html>
-    <body style="font-family: Arial, sans-serif; padding: 20px; background-color: #f9fafb;">
-        <div style="max-width: 600px; margin: 0 auto; background-color: white; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-            <div style="background-color: #7c3aed; padding: 20px; text-align: center;">
-                <h2 style="color: white; margin: 0;">New Complaint Assignment</h2>
-            </div>
-            <div style="padding: 30px;">
-                <p style="font-size: 16px; color: #374151;">Hello <strong>{assigned_admin.name}</strong>,</p>
-                <p style="font-size: 14px; color: #6b7280;">You have been assigned to a new complaint. Please review and take action.</p>
-                
-                <div style="background-color: #f3f4f6; padding: 20px; border-radius: 6px; margin: 20px 0;">
-                    <h3 style="color: #1f2937; margin-top: 0; font-size: 16px;">Complaint Information:</h3>
-                    <table style="width: 100%; font-size: 14px;">
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280; width: 40%;"><strong>Complaint ID:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;"><strong style="color: #7c3aed;">{complaint.complaint_id}</strong></td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Reporter:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;">{complaint.name}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Email:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;">{complaint.email}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Lab:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;">{complaint.lab.name}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Category:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;">{complaint.category}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Status:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;">{complaint.status}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Priority:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;">{complaint.priority or 'Low'}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Assigned By:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;">{actor.name if actor else 'System'}</td>
-                        </tr>
-                    </table>
-                </div>
-                
-                <div style="background-color: #fff7ed; border-left: 4px solid #f97316; padding: 15px; margin: 20px 0;">
-                    <p style="margin: 0; font-size: 13px; color: #9a3412;">
-                        <strong>⚡ Action Required:</strong><br>
-                        Please login to the admin dashboard to review and update this complaint.
-                    </p>
-                </div>
-                
-                <p style="font-size: 13px; color: #6b7280;"><strong>Description:</strong><br>{complaint.description}</p>
-            </div>
-            <div style="background-color: #f9fafb; padding: 20px; text-align: center; border-top: 1px solid #e5e7eb;">
-                <p style="font-size: 12px; color: #6b7280; margin: 0;">
-                    TechResolve - Technical Complaint Management System<br>
-                    PSG College of Technology
-                </p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    send_email(assigned_admin.email, subject, body)
+    actor_name = actor.name if actor else 'System'
+    for admin, prefs in route_admin_event('ADMIN_ASSIGNED', [assigned_admin], actor):
+        if not queue_admin_event(
+            admin, 'ADMIN_ASSIGNED', complaint,
+            f"assigned to you by {actor_name} ({complaint.lab.name}, {complaint.priority or 'Low'} priority)",
+            prefs
+        ):
+            body, text_body = render_notification(
+                'complaint_assigned', complaint=complaint, assigned_admin=admin, actor=actor
+            )
+            send_email(admin.email, subject, body, text_body)
 
     # Send Discord notification to lab admins about the assignment
     webhook_url = get_discord_webhook_for_lab(complaint.lab.name)
+    if webhook_url and queue_lab_event(
+        complaint.lab, 'ADMIN_ASSIGNED', complaint,
+        f"👤 assigned to {assigned_admin.name} by {actor_name}"
+    ):
+        return
     if webhook_url:
         discord_data = {
             "content": f"👤 **Admin Assignment Update**",
@@ -299,19 +338,13 @@ def notify_assignment(complaint, assigned_admin, actor):
         send_discord_notification(webhook_url, discord_data)
 
 
-def notify_status_change(complaint, actor):
-    """Notify reporter when status changes."""
-    # Determine status color and icon
-    status_colors = {
-        'Pending': {'bg': '#fef3c7', 'text': '#92400e', 'icon': '⏳'},
-        'In Progress': {'bg': '#dbeafe', 'text': '#1e40af', 'icon': '🔄'},
-        'Resolved': {'bg': '#d1fae5', 'text': '#065f46', 'icon': '✅'},
-        'Terminated': {'bg': '#fee2e2', 'text': '#991b1b', 'icon': '❌'}
-    }
-    
-    status_info = status_colors.get(complaint.status, {'bg': '#f3f4f6', 'text': '#374151', 'icon': '📋'})
+def status_style(status):
+    return {**DEFAULT_STATUS_STYLE, **STATUS_STYLES.get(status, {})}
+
+def _email_status_to_reporter(complaint, actor):
+    status_info = status_style(complaint.status)
     status_icon = status_info['icon']
-    
+
     # Special messages for Resolved and Terminated
     if complaint.status == 'Resolved':
         subject = f"✅ Complaint Resolved: {complaint.complaint_id}"
@@ -330,73 +363,27 @@ def notify_status_change(complaint, actor):
         status_message = f"Your complaint status has been updated to {complaint.status}."
         action_note = "You will receive further notifications as the status changes."
     
-    body = f"""
-    <html>
-    <body style="font-family: Arial, sans-serif; padding: 20px; background-color: #f9fafb;">
-        <div style="max-width: 600px; margin: 0 auto; background-color: white; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-            <div style="background-color: {'#10b981' if complaint.status == 'Resolved' else '#ef4444' if complaint.status == 'Terminated' else '#3b82f6'}; padding: 20px; text-align: center;">
-                <h2 style="color: white; margin: 0;">{status_icon} Complaint Status Update</h2>
-            </div>
-            <div style="padding: 30px;">
-                <p style="font-size: 16px; color: #374151;">Hello <strong>{complaint.name}</strong>,</p>
-                <p style="font-size: 14px; color: #6b7280;">{status_message}</p>
-                
-                <div style="background-color: #f3f4f6; padding: 20px; border-radius: 6px; margin: 20px 0;">
-                    <h3 style="color: #1f2937; margin-top: 0; font-size: 16px;">Complaint Details:</h3>
-                    <table style="width: 100%; font-size: 14px;">
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280; width: 40%;"><strong>Complaint ID:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;"><strong style="color: #4f46e5;">{complaint.complaint_id}</strong></td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Lab:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;">{complaint.lab.name}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Category:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;">{complaint.category}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>New Status:</strong></td>
-                            <td style="padding: 8px 0;">
-                                <span style="background-color: {status_info['bg']}; color: {status_info['text']}; padding: 6px 16px; border-radius: 12px; font-size: 13px; font-weight: bold;">
-                                    {status_icon} {complaint.status}
-                                </span>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 8px 0; color: #6b7280;"><strong>Updated By:</strong></td>
-                            <td style="padding: 8px 0; color: #1f2937;">{actor.name if actor else 'System'}</td>
-                        </tr>
-                    </table>
-                </div>
-                
-                {f'''<div style="background-color: #f0fdf4; border: 2px solid #10b981; border-radius: 6px; padding: 20px; margin: 20px 0;">
-                    <h4 style="color: #065f46; margin-top: 0; font-size: 15px;">📝 Resolution Notes:</h4>
-                    <p style="color: #166534; font-size: 14px; margin: 0; white-space: pre-wrap;">{complaint.resolution_notes}</p>
-                </div>''' if complaint.resolution_notes else f'<div style="background-color: #fef3c7; border-left: 4px solid #f59e0b; padding: 15px; margin: 20px 0;"><p style="margin: 0; font-size: 13px; color: #78350f;"><strong>ℹ️ Note:</strong> No additional notes provided.</p></div>'}
-                
-                <div style="background-color: {'#ecfdf5' if complaint.status == 'Resolved' else '#fef2f2' if complaint.status == 'Terminated' else '#eff6ff'}; border-left: 4px solid {'#10b981' if complaint.status == 'Resolved' else '#ef4444' if complaint.status == 'Terminated' else '#3b82f6'}; padding: 15px; margin: 20px 0;">
-                    <p style="margin: 0; font-size: 13px; color: {'#065f46' if complaint.status == 'Resolved' else '#991b1b' if complaint.status == 'Terminated' else '#1e40af'};">
-                        <strong>💡 What's Next?</strong><br>
-                        {action_note}
-                    </p>
-                </div>
-            </div>
-            <div style="background-color: #f9fafb; padding: 20px; text-align: center; border-top: 1px solid #e5e7eb;">
-                <p style="font-size: 12px; color: #6b7280; margin: 0;">
-                    TechResolve - Technical Complaint Management System<br>
-                    PSG College of Technology
-                </p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    send_email(complaint.email, subject, body)
+    body, text_body = render_notification(
+        'status_changed', complaint=complaint, actor=actor, style=status_info,
+        status_message=status_message, action_note=action_note
+    )
+    send_email(complaint.email, subject, body, text_body)
+
+
+def notify_status_change(complaint, actor):
+    """Notify reporter when status changes."""
+    # Determine status color and icon
+    status_info = status_style(complaint.status)
+    status_icon = status_info['icon']
+    _email_status_to_reporter(complaint, actor)
 
     # Send Discord notification to lab admins about status change
     webhook_url = get_discord_webhook_for_lab(complaint.lab.name)
+    if webhook_url and queue_lab_event(
+        complaint.lab, 'STATUS_CHANGED', complaint,
+        f"{status_icon} status → {complaint.status} by {actor.name if actor else 'System'}"
+    ):
+        return
     if webhook_url:
         # Determine Discord color based on status
         discord_colors = {
@@ -431,3 +418,98 @@ def notify_status_change(complaint, actor):
             "timestamp": complaint.updated_at.isoformat() if complaint.updated_at else complaint.created_at.isoformat()
         }
         send_discord_notification(webhook_url, discord_data)
+
+
+def notify_sla_breach(complaint, clock, hours):
+    """Alert the lab channel and the assigned admin that a complaint missed its SLA."""
+    problem = f"unassigned for over {hours}h" if clock == 'assign' else f"unresolved for over {hours}h"
+
+    for admin, prefs in route_admin_event('SLA_BREACHED', [complaint.assigned_admin]):
+        if not queue_admin_event(admin, 'SLA_BREACHED', complaint, f"⏰ SLA breached: {problem}", prefs):
+            body, text_body = render_notification('sla_breach', complaint=complaint, admin=admin, problem=problem)
+            send_email(admin.email, f"⏰ SLA Breached: {complaint.complaint_id}", body, text_body)
+
+    webhook_url = get_discord_webhook_for_lab(complaint.lab.name)
+    if webhook_url and queue_lab_event(complaint.lab, 'SLA_BREACHED', complaint, f"⏰ SLA breached: {problem}"):
+        return
+    if webhook_url:
+        discord_data = {
+            "content": "⏰ **SLA Breached**",
+            "title": f"Complaint {complaint.complaint_id} is {problem}",
+            "description": "This complaint has missed its service level target and needs attention.",
+            "color": 15105570,  # Orange color
+            "fields": [
+                {"name": "📋 Complaint ID", "value": complaint.complaint_id, "inline": True},
+                {"name": "⚠️ Priority", "value": complaint.priority or 'Low', "inline": True},
+                {"name": "📊 Status", "value": complaint.status, "inline": True},
+                {"name": "👤 Assigned To", "value": complaint.assigned_admin.name if complaint.assigned_admin else 'Unassigned', "inline": True},
+                {"name": "🔬 Lab", "value": complaint.lab.name, "inline": True},
+                {"name": "📁 Category", "value": complaint.category, "inline": True}
+            ],
+            "timestamp": complaint.created_at.isoformat()
+        }
+        send_discord_notification(webhook_url, discord_data)
+
+
+def notify_bulk_update(status_changed, assigned, actor):
+    """
+    Notify everyone affected by a bulk update with one message each instead
+    of one per complaint: an email per reporter, an email per newly assigned admin (or
+    digest entries, per their preferences) and a Discord post per lab.
+    :param status_changed: complaints whose status changed
+    :param assigned: complaints assigned to someone (complaint.assigned_admin)
+    """
+    actor_name = actor.name if actor else 'System'
+
+    # Reporters: the usual email for one complaint, a summary for several
+    by_reporter = OrderedDict()
+    for complaint in status_changed:
+        by_reporter.setdefault(complaint.email, []).append(complaint)
+    styles = {status: status_style(status) for status in {c.status for c in status_changed}}
+    for email, complaints in by_reporter.items():
+        if len(complaints) == 1:
+            _email_status_to_reporter(complaints[0], actor)
+            continue
+        body, text_body = render_notification(
+            'bulk_update', reporter_name=complaints[0].name, complaints=complaints, actor=actor, styles=styles
+        )
+        send_email(email, f"📋 {len(complaints)} of your complaints were updated", body, text_body)
+
+    # Admins and lab channels: (complaint, event type, admin summary, lab summary)
+    # per change. Assignees hear about assignments only, as with single updates
+    admin_items, lab_items = OrderedDict(), OrderedDict()
+    webhooks = {}
+    events = [
+        (complaint, 'ADMIN_ASSIGNED', f"assigned to you by {actor_name} ({complaint.lab.name}, {complaint.priority or 'Low'} priority)",
+         f"👤 assigned to {complaint.assigned_admin.name} by {actor_name}")
+        for complaint in assigned
+    ] + [
+        (complaint, 'STATUS_CHANGED', None,
+         f"{styles[complaint.status]['icon']} status → {complaint.status} by {actor_name}")
+        for complaint in status_changed
+    ]
+    for complaint, event_type, admin_summary, lab_summary in events:
+        routes = route_admin_event(event_type, [complaint.assigned_admin], actor) if admin_summary else []
+        for admin, prefs in routes:
+            if not queue_admin_event(admin, event_type, complaint, admin_summary, prefs):
+                admin_items.setdefault(admin, []).append(
+                    SimpleNamespace(complaint_ref=complaint.complaint_id, summary=admin_summary)
+                )
+        # Labs without a webhook get neither a post nor queued digest events
+        lab = complaint.lab
+        if lab not in webhooks:
+            webhooks[lab] = get_discord_webhook_for_lab(lab.name)
+        if webhooks[lab] and not queue_lab_event(lab, event_type, complaint, lab_summary):
+            lab_items.setdefault(lab, []).append(f"• **{complaint.complaint_id}** {lab_summary}")
+
+    for admin, items in admin_items.items():
+        body, text_body = render_notification('admin_bulk_update', admin=admin, actor=actor, items=items)
+        send_email(admin.email, f"🗂️ {len(items)} of your complaints were updated by {actor_name}", body, text_body)
+
+    for lab, lines in lab_items.items():
+        send_discord_notification(webhooks[lab], {
+            "content": f"🗂️ **Bulk update: {len(lines)} change(s) in {lab.name}**",
+            "title": f"{lab.name} complaints updated by {actor_name}",
+            "description": '\n'.join(lines)[:4000],
+            "color": 3447003
+        })
@@ -0,0 +1,116 @@
+import re
+import warnings
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from .extensions import db
+
+_WHITESPACE = re.compile(r'\s+')
+_PARAM = r'(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)'
+_PARAM_LIST = re.compile(r'\(\s*' + _PARAM + r'(?:\s*,\s*' + _PARAM + r')*\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+
+
+class NPlusOneError(Exception):
+    """Raised when one request repeats the same statement shape too often."""
+
+
+# --------------------------
+# Statement Shapes
+# --------------------------
+def normalize_statement(statement: str) -> str:
+    """
+    Reduce a SQL statement to its shape: collapse whitespace, IN lists and
+    literal numbers so lazy loads of different rows compare equal.
+    """
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _PARAM_LIST.sub('(?)', shape)
+    return _NUMBER.sub('N', shape)
+
+
+class QueryRecorder:
+    """
+    Context manager recording every statement executed on an engine.
+
+        with QueryRecorder(db.engine) as recorder:
+            client.get('/admin/api/complaints')
+        recorder.count, recorder.repeated(threshold=2)
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.engine = self.engine or db.engine
+        event.listen(self.engine, 'after_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'after_cursor_execute', self._record)
+        return False
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def shapes(self):
+        return Counter(normalize_statement(s) for s in self.statements)
+
+    def repeated(self, threshold=2):
+        """Statement shapes executed at least threshold times."""
+        return {shape: n for shape, n in self.shapes().items() if n >= threshold}
+
+    def report(self):
+        lines = [f"{self.count} statement(s) executed:"]
+        for shape, n in self.shapes().most_common():
+            lines.append(f"  {n}x {shape[:200]}")
+        return '\n'.join(lines)
+
+
+# --------------------------
+# Per-request Detector
+# --------------------------
+def _record_shape(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'sql_shapes' in g:
+        g.sql_shapes[normalize_statement(statement)] += 1
+
+def _start_shape_tracking():
+    g.sql_shapes = Counter()
+
+def _check_shapes(response):
+    shapes = g.pop('sql_shapes', None)
+    if not shapes:
+        return response
+
+    threshold = current_app.config['NPLUSONE_THRESHOLD']
+    offenders = {shape: n for shape, n in shapes.items() if n > threshold}
+    if not offenders:
+        return response
+
+    shape, n = max(offenders.items(), key=lambda item: item[1])
+    message = (
+        f"Possible N+1 in {request.endpoint}: statement repeated {n} times "
+        f"(threshold {threshold}): {shape[:200]}"
+    )
+    if current_app.config['NPLUSONE_MODE'] == 'raise':
+        raise NPlusOneError(message)
+    warnings.warn(message, stacklevel=2)
+    return response
+
+def init_nplusone(app):
+    """
+    Flag requests that execute the same statement shape more than
+    NPLUSONE_THRESHOLD times. NPLUSONE_MODE is 'off', 'warn' or 'raise'.
+    Must be called inside an application context.
+    """
+    if app.config.get('NPLUSONE_MODE', 'off') == 'off':
+        return
+
+    if not event.contains(db.engine, 'after_cursor_execute', _record_shape):
+        event.listen(db.engine, 'after_cursor_execute', _record_shape)
+    app.before_request(_start_shape_tracking)
+    app.after_request(_check_shapes)
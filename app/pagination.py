@@ -0,0 +1,151 @@
+import base64
+from datetime import datetime
+from sqlalchemy import and_, or_
+from .extensions import db
+
+# --------------------------
+# Cursor Encoding
+# --------------------------
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """
+    Encode a (timestamp, id) position as an opaque URL-safe cursor string.
+    """
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str):
+    """
+    Decode a cursor produced by encode_cursor.
+    :return: (timestamp, id) tuple or None if the cursor is missing or malformed
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        ts_part, id_part = raw.rsplit('|', 1)
+        return datetime.fromisoformat(ts_part), int(id_part)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+# --------------------------
+# Keyset Page
+# --------------------------
+class KeysetPage:
+    """
+    Result of a keyset (seek) pagination query.
+    Mirrors the attributes templates already use from Flask-SQLAlchemy's
+    Pagination object where they make sense without OFFSET.
+    """
+
+    def __init__(self, items, per_page, cursor, next_cursor, total=None, count_mode='none'):
+        self.items = items
+        self.per_page = per_page
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.total = total
+        self.count_mode = count_mode
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return bool(self.cursor)
+
+    def to_dict(self):
+        return {
+            'per_page': self.per_page,
+            'cursor': self.cursor,
+            'next_cursor': self.next_cursor,
+            'has_next': self.has_next,
+            'has_prev': self.has_prev,
+            'total': self.total,
+            'count_mode': self.count_mode
+        }
+
+
+def keyset_paginate(query, ts_column, id_column, cursor=None, per_page=20, count_mode='none'):
+    """
+    Paginate a query newest-first on (ts_column, id_column) without OFFSET.
+
+    Each page seeks past the last row of the previous page, so the cost of a
+    page is independent of how deep into the history it is.
+    :param query: SQLAlchemy ORM query (filters applied, no ordering)
+    :param cursor: cursor string from a previous page's next_cursor
+    :param count_mode: 'exact', 'approximate' or 'none'
+    :raises ValueError: if a cursor is given but cannot be decoded
+    """
+    position = decode_cursor(cursor)
+    if cursor and position is None:
+        raise ValueError('Invalid cursor')
+
+    total = count_rows(query, count_mode)
+
+    if position:
+        last_ts, last_id = position
+        query = query.filter(or_(
+            ts_column < last_ts,
+            and_(ts_column == last_ts, id_column < last_id)
+        ))
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(ts_column.desc(), id_column.desc()).limit(per_page + 1).all()
+    items = rows[:per_page]
+
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor(
+            getattr(last, ts_column.key),
+            getattr(last, id_column.key)
+        )
+
+    return KeysetPage(
+        items=items,
+        per_page=per_page,
+        cursor=cursor if position else None,
+        next_cursor=next_cursor,
+        total=total,
+        count_mode=count_mode
+    )
+
+
+# --------------------------
+# Row Counting
+# --------------------------
+def count_rows(query, mode='exact'):
+    """
+    Count rows matched by a query.
+    'exact' runs COUNT(*), 'approximate' uses the planner's estimate on
+    PostgreSQL (falling back to an exact count elsewhere), 'none' skips it.
+    """
+    if mode == 'none':
+        return None
+    if mode == 'approximate' and db.engine.dialect.name == 'postgresql':
+        estimate = estimate_query_rows(query)
+        if estimate is not None:
+            return estimate
+    return query.order_by(None).count()
+
+def estimate_query_rows(query):
+    """
+    Return the PostgreSQL planner's row estimate for a query, or None.
+    Cheap regardless of table size because nothing is executed.
+    """
+    statement = query.order_by(None).statement
+    compiled = statement.compile(dialect=db.engine.dialect)
+    try:
+        plan = db.session.connection().exec_driver_sql(
+            'EXPLAIN (FORMAT JSON) ' + str(compiled), compiled.params
+        ).scalar()
+    except Exception:
+        db.session.rollback()
+        return None
+
+    try:
+        return int(plan[0]['Plan']['Plan Rows'])
+    except (TypeError, KeyError, IndexError, ValueError):
+        return None
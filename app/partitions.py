@@ -0,0 +1,148 @@
+from datetime import datetime
+from sqlalchemy import text
+from .extensions import db
+
+LOG_TABLE = 'complaint_logs'
+LEGACY_LOG_TABLE = 'complaint_logs_legacy'
+DEFAULT_LOG_PARTITION = 'complaint_logs_default'
+
+
+# --------------------------
+# Month Helpers
+# --------------------------
+def month_start(value: datetime) -> datetime:
+    """Return midnight on the first day of value's month."""
+    return datetime(value.year, value.month, 1)
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Shift a month-start datetime by a number of months."""
+    index = value.year * 12 + (value.month - 1) + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def partition_name(start: datetime) -> str:
+    """complaint_logs_2025_01 style partition name for a month."""
+    return f"{LOG_TABLE}_{start.year:04d}_{start.month:02d}"
+
+
+# --------------------------
+# Partition Management
+# --------------------------
+def is_log_table_partitioned() -> bool:
+    """Check whether complaint_logs is already a partitioned parent table."""
+    return bool(db.session.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :name"
+    ), {'name': LOG_TABLE}).scalar())
+
+def convert_log_table_to_partitioned(now: datetime = None):
+    """
+    Turn complaint_logs into a table partitioned by month on timestamp.
+
+    The existing table is renamed and attached as the partition holding all
+    history up to the end of the current month, so no rows are copied. The
+    parent gets the primary key (id, timestamp), the keyset pagination
+    index and the foreign keys, and a DEFAULT partition catches rows past
+    the last monthly partition so inserts never fail.
+    """
+    now = now or datetime.utcnow()
+    boundary = add_months(month_start(now), 1)
+
+    statements = [
+        f'ALTER TABLE {LOG_TABLE} RENAME TO {LEGACY_LOG_TABLE}',
+        f'ALTER TABLE {LEGACY_LOG_TABLE} ALTER COLUMN "timestamp" SET NOT NULL',
+        # Free the names the parent's key and index will use
+        f'ALTER TABLE {LEGACY_LOG_TABLE} RENAME CONSTRAINT {LOG_TABLE}_pkey TO {LEGACY_LOG_TABLE}_pkey',
+        f'ALTER INDEX IF EXISTS ix_complaint_logs_timestamp_id RENAME TO ix_{LEGACY_LOG_TABLE}_timestamp_id',
+        f'CREATE TABLE {LOG_TABLE} (LIKE {LEGACY_LOG_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY RANGE ("timestamp")',
+        # A partitioned table's unique keys must include the partition column
+        f'ALTER TABLE {LOG_TABLE} ADD CONSTRAINT {LOG_TABLE}_pkey PRIMARY KEY (id, "timestamp")',
+        f'CREATE INDEX ix_complaint_logs_timestamp_id ON {LOG_TABLE} ("timestamp", id)',
+        f'ALTER TABLE {LOG_TABLE} ADD CONSTRAINT {LOG_TABLE}_complaint_id_fkey '
+        f'FOREIGN KEY (complaint_id) REFERENCES complaints(id)',
+        f'ALTER TABLE {LOG_TABLE} ADD CONSTRAINT {LOG_TABLE}_admin_id_fkey '
+        f'FOREIGN KEY (admin_id) REFERENCES admins(id)',
+        f'ALTER TABLE {LOG_TABLE} ADD CONSTRAINT fk_logs_target_admin '
+        f'FOREIGN KEY (target_admin_id) REFERENCES admins(id)',
+        # Indexes missing on the legacy table are built while attaching
+        f"ALTER TABLE {LOG_TABLE} ATTACH PARTITION {LEGACY_LOG_TABLE} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary:%Y-%m-%d}')",
+        f'CREATE TABLE {DEFAULT_LOG_PARTITION} PARTITION OF {LOG_TABLE} DEFAULT',
+    ]
+    for stmt in statements:
+        db.session.execute(text(stmt))
+    db.session.commit()
+
+def _create_month_partition(name: str, lower: datetime, upper: datetime):
+    """
+    Add a monthly partition, first moving any rows the DEFAULT partition
+    holds for that month (PostgreSQL refuses the attach otherwise).
+    """
+    bounds = {'lower': lower, 'upper': upper}
+    in_month = '"timestamp" >= :lower AND "timestamp" < :upper'
+    db.session.execute(text(
+        f'CREATE TABLE {name} (LIKE {LOG_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    ))
+    db.session.execute(text(f'INSERT INTO {name} SELECT * FROM {DEFAULT_LOG_PARTITION} WHERE {in_month}'), bounds)
+    db.session.execute(text(f'DELETE FROM {DEFAULT_LOG_PARTITION} WHERE {in_month}'), bounds)
+    db.session.execute(text(
+        f"ALTER TABLE {LOG_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{lower:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+    ))
+    db.session.commit()
+
+def ensure_log_partitions(months_ahead: int = 3, now: datetime = None):
+    """
+    Make sure monthly partitions exist from the current month up to
+    months_ahead months in the future, plus the DEFAULT partition. Runs at
+    startup and from `flask ensure-log-partitions` (schedule it, e.g.
+    daily, so the horizon keeps moving). PostgreSQL only; a no-op elsewhere.
+    :return: list of partition names created
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return []
+
+    now = now or datetime.utcnow()
+    try:
+        if not is_log_table_partitioned():
+            convert_log_table_to_partitioned(now)
+    except Exception as e:
+        db.session.rollback()
+        print(f"❌ Could not partition {LOG_TABLE}: {e}")
+        return []
+
+    existing = {
+        row[0] for row in db.session.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :name"
+        ), {'name': LOG_TABLE})
+    }
+
+    created = []
+    if DEFAULT_LOG_PARTITION not in existing:
+        try:
+            db.session.execute(text(f'CREATE TABLE {DEFAULT_LOG_PARTITION} PARTITION OF {LOG_TABLE} DEFAULT'))
+            db.session.commit()
+            created.append(DEFAULT_LOG_PARTITION)
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Could not create {DEFAULT_LOG_PARTITION}: {e}")
+
+    start = month_start(now)
+    for offset in range(months_ahead + 1):
+        lower = add_months(start, offset)
+        upper = add_months(lower, 1)
+        name = partition_name(lower)
+        if name in existing:
+            continue
+        try:
+            _create_month_partition(name, lower, upper)
+            created.append(name)
+        except Exception:
+            # Range already covered (e.g. by the legacy partition)
+            db.session.rollback()
+
+    return created
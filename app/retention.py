@@ -0,0 +1,144 @@
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import tuple_
+from .extensions import db
+from .models import ComplaintLog, ComplaintViewRollup
+
+
+# --------------------------
+# Retention Engine
+# --------------------------
+def apply_retention(policies: dict = None, batch_size: int = None, max_batches: int = None, pause: float = 0):
+    """
+    Apply per-action retention policies to complaint_logs.
+
+    Each batch touches at most batch_size rows and commits on its own, so the
+    job never holds locks for long and can be interrupted at any point.
+    :param policies: {action: {'mode': 'rollup'|'delete', 'after_days': int}}
+    :param pause: seconds to sleep between batches
+    :return: {action: rows removed from complaint_logs}
+    """
+    if policies is None:
+        policies = current_app.config['LOG_RETENTION_POLICIES']
+    if batch_size is None:
+        batch_size = current_app.config['LOG_RETENTION_BATCH_SIZE']
+
+    results = {}
+    for action, policy in policies.items():
+        mode = policy.get('mode', 'keep')
+        if mode == 'keep':
+            continue
+
+        threshold = datetime.utcnow() - timedelta(days=policy.get('after_days', 30))
+        removed = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            if mode == 'rollup':
+                count = _rollup_view_batch(action, threshold, batch_size)
+            elif mode == 'delete':
+                count = _delete_batch(action, threshold, batch_size)
+            else:
+                raise ValueError(f"Unknown retention mode '{mode}' for {action}")
+
+            if not count:
+                break
+            removed += count
+            batches += 1
+            if pause:
+                time.sleep(pause)
+
+        results[action] = removed
+    return results
+
+
+def _expired_logs(action, threshold, batch_size):
+    return ComplaintLog.query.filter(
+        ComplaintLog.action == action,
+        ComplaintLog.timestamp < threshold
+    ).order_by(ComplaintLog.id.asc()).limit(batch_size)
+
+
+def _delete_batch(action, threshold, batch_size):
+    """Delete one batch of expired logs."""
+    ids = [row.id for row in _expired_logs(action, threshold, batch_size).with_entities(ComplaintLog.id)]
+    if not ids:
+        return 0
+    try:
+        ComplaintLog.query.filter(ComplaintLog.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(ids)
+
+
+def _rollup_view_batch(action, threshold, batch_size):
+    """
+    Fold one batch of expired view logs into daily per-admin per-complaint
+    totals in complaint_view_rollups, then delete the raw rows.
+    """
+    rows = _expired_logs(action, threshold, batch_size).with_entities(
+        ComplaintLog.id,
+        ComplaintLog.complaint_id,
+        ComplaintLog.admin_id,
+        ComplaintLog.timestamp,
+        ComplaintLog.view_duration
+    ).all()
+    if not rows:
+        return 0
+
+    totals = {}
+    for row in rows:
+        key = (row.complaint_id, row.admin_id, row.timestamp.date())
+        count, duration = totals.get(key, (0, 0))
+        totals[key] = (count + 1, duration + (row.view_duration or 0))
+
+    try:
+        # NULL admin_ids can't be matched with a tuple IN (and aren't covered
+        # by the unique constraint), so system views get their own query
+        keyed = [key for key in totals if key[1] is not None]
+        system = [(complaint_id, day) for complaint_id, admin_id, day in totals if admin_id is None]
+        existing = []
+        if keyed:
+            existing += ComplaintViewRollup.query.filter(
+                tuple_(ComplaintViewRollup.complaint_id, ComplaintViewRollup.admin_id, ComplaintViewRollup.day).in_(keyed)
+            ).all()
+        if system:
+            existing += ComplaintViewRollup.query.filter(
+                ComplaintViewRollup.admin_id.is_(None),
+                tuple_(ComplaintViewRollup.complaint_id, ComplaintViewRollup.day).in_(system)
+            ).all()
+
+        merged = {}
+        for rollup in sorted(existing, key=lambda r: r.id):
+            key = (rollup.complaint_id, rollup.admin_id, rollup.day)
+            if key in merged:
+                # Duplicate system rollup from an earlier run: fold it into the first
+                merged[key].view_count += rollup.view_count
+                merged[key].total_view_duration += rollup.total_view_duration
+                db.session.delete(rollup)
+                continue
+            merged[key] = rollup
+            count, duration = totals.pop(key)
+            rollup.view_count += count
+            rollup.total_view_duration += duration
+
+        db.session.add_all([
+            ComplaintViewRollup(
+                complaint_id=complaint_id,
+                admin_id=admin_id,
+                day=day,
+                view_count=count,
+                total_view_duration=duration
+            )
+            for (complaint_id, admin_id, day), (count, duration) in totals.items()
+        ])
+
+        ComplaintLog.query.filter(ComplaintLog.id.in_([row.id for row in rows]))\
+            .delete(synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows)
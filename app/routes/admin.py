@@ -1,9 +1,21 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, abort, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, abort, jsonify, current_app
 from datetime import datetime, timedelta
 from werkzeug.security import check_password_hash, generate_password_hash
+from sqlalchemy.orm import joinedload
 from ..models import Complaint, ComplaintLog, db, Admin, Lab
 from ..utils import verify_password
-from ..notifications import notify_assignment, notify_status_change
+from ..pagination import keyset_paginate
+from ..analytics import (
+    admin_workload_stats, average_resolution_seconds, cached_report, complaint_filters,
+    complaint_trend, counts_by_bucket, floor_bucket, format_long_duration,
+    format_short_duration, next_bucket, resolution_stats, tag_counts
+)
+from ..archive import find_archived_complaint
+from ..sla import ensure_sla_monitor
+from ..notifications import notify_assignment, notify_bulk_update, notify_status_change
+from ..bulk import apply_bulk_update, parse_bulk_update
+from ..tags import tagged_with
+from ..digests import DEFAULT_PREFERENCES, get_notification_prefs, save_notification_prefs
 
 admin_bp = Blueprint('admin', __name__, template_folder='../templates/admin')
 
@@ -86,22 +98,29 @@ def dashboard():
 # ----------------------
 # List All Complaints
 # ----------------------
-@admin_bp.route('/complaints')
-@admin_required
-def complaint_list():
+def archive_stale_resolved():
+    """Flag resolved/terminated complaints untouched for 30 days as archived."""
     threshold = datetime.utcnow() - timedelta(days=30)
-    stale_complaints = Complaint.query.filter(
+    updated = Complaint.query.filter(
         Complaint.status.in_(['Resolved', 'Terminated']),
         Complaint.updated_at < threshold,
         Complaint.archived.is_(False)
-    ).all()
+    ).update({'archived': True}, synchronize_session=False)
 
-    if stale_complaints:
-        for item in stale_complaints:
-            item.archived = True
+    if updated:
         db.session.commit()
 
-    complaints = Complaint.query.order_by(Complaint.created_at.desc()).all()
+
+@admin_bp.route('/complaints')
+@admin_required
+def complaint_list():
+    archive_stale_resolved()
+
+    # ?tag=a,b lists complaints carrying all of the tags
+    complaints = Complaint.query.options(
+        joinedload(Complaint.lab),
+        joinedload(Complaint.assigned_admin)
+    ).filter(*tagged_with(request.args.get('tag'))).order_by(Complaint.created_at.desc()).all()
     
     # Check if this is an SPA request
     is_spa = request.args.get('spa') == 'true'
@@ -121,7 +140,24 @@ def complaint_list():
 @admin_bp.route('/complaint/<int:id>', methods=['GET', 'POST'])
 @admin_required
 def complaint_detail(id):
-    complaint = Complaint.query.get_or_404(id)
+    complaint = Complaint.query.get(id)
+    if not complaint:
+        # Long-archived complaints live in cold storage and are read-only
+        complaint = find_archived_complaint(original_id=id)
+        if not complaint:
+            abort(404)
+        if request.method == 'POST':
+            flash('This complaint is in the archive and can no longer be edited.', 'warning')
+            return redirect(url_for('admin.complaint_detail', id=id))
+        return render_template(
+            'admin/complaint_detail.html',
+            complaint=complaint,
+            complaint_logs=sorted(complaint.logs, key=lambda log: log.timestamp, reverse=True),
+            admins=[],
+            view_log_id=None,
+            current_year=datetime.utcnow().year
+        )
+
     admins = Admin.query.order_by(Admin.name.asc()).all()
     view_log_id = None
 
@@ -160,7 +196,7 @@ def complaint_detail(id):
                 description=remarks
             )
             db.session.add(status_log)
-            complaint.status = new_status
+            complaint.set_status(new_status)
             notify_status_change(complaint, acting_admin)
 
         # Log tag changes if tags were updated
@@ -205,7 +241,7 @@ def complaint_detail(id):
                 target_admin_id=assigned_admin.id if assigned_admin else None
             )
             db.session.add(assignment_log)
-            complaint.assigned_admin = assigned_admin
+            complaint.assign(assigned_admin)
             if assigned_admin:
                 notify_assignment(complaint, assigned_admin, acting_admin)
 
@@ -369,6 +405,7 @@ def api_dashboard():
 
     # Get recent activity logs
     recent_logs = ComplaintLog.query\
+        .options(joinedload(ComplaintLog.complaint), joinedload(ComplaintLog.admin))\
         .order_by(ComplaintLog.timestamp.desc())\
         .limit(10)\
         .all()
@@ -420,21 +457,14 @@ def api_dashboard():
 @admin_bp.route('/api/complaints')
 @admin_required
 def api_complaints():
-    # Archive old resolved complaints
-    threshold = datetime.utcnow() - timedelta(days=30)
-    stale_complaints = Complaint.query.filter(
-        Complaint.status.in_(['Resolved', 'Terminated']),
-        Complaint.updated_at < threshold,
-        Complaint.archived.is_(False)
-    ).all()
-
-    if stale_complaints:
-        for item in stale_complaints:
-            item.archived = True
-        db.session.commit()
-
-    # Get all complaints
-    complaints = Complaint.query.order_by(Complaint.created_at.desc()).all()
+    # Archive old resolved complaints in a single UPDATE
+    archive_stale_resolved()
+
+    # Get all complaints (or those with every tag in ?tag=a,b), loading lab and assignee in the same query
+    complaints = Complaint.query.options(
+        joinedload(Complaint.lab),
+        joinedload(Complaint.assigned_admin)
+    ).filter(*tagged_with(request.args.get('tag'))).order_by(Complaint.created_at.desc()).all()
     
     # Convert to JSON serializable format
     complaints_data = []
@@ -509,6 +539,8 @@ def api_complaint(id):
             'id': complaint.lab.id,
             'name': complaint.lab.name
         },
+        'duplicate_of_id': complaint.duplicate_of_id,
+        'duplicate_ids': [duplicate.id for duplicate in complaint.duplicates],
         'view_log_id': view_log.id
     }
     
@@ -589,7 +621,7 @@ def api_update_complaint(id):
             description=remarks
         )
         db.session.add(status_log)
-        complaint.status = new_status
+        complaint.set_status(new_status)
         notify_status_change(complaint, acting_admin)
         changes_made = True
 
@@ -625,7 +657,7 @@ def api_update_complaint(id):
             target_admin_id=assigned_admin.id if assigned_admin else None
         )
         db.session.add(assignment_log)
-        complaint.assigned_admin = assigned_admin
+        complaint.assign(assigned_admin)
         if assigned_admin:
             notify_assignment(complaint, assigned_admin, acting_admin)
         changes_made = True
@@ -722,6 +754,42 @@ def api_update_complaint(id):
         'admins': admins_data
     })
 
+@admin_bp.route('/api/complaints/bulk', methods=['POST'])
+@admin_required
+def api_bulk_update():
+    """
+    Apply status/priority/assignee/tags/archive changes to many complaints
+    in one transaction. JSON body: ids plus the fields to change (see
+    parse_bulk_update). Notifications are aggregated per recipient.
+    """
+    try:
+        ids, changes, remarks = parse_bulk_update(request.get_json(silent=True), current_app.config['BULK_MAX_ITEMS'])
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    acting_admin = db.session.get(Admin, session.get('admin_id'))
+    try:
+        results, status_changed, assigned = apply_bulk_update(ids, changes, acting_admin, remarks)
+        notify_bulk_update(status_changed, assigned, acting_admin)
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        print(f"❌ Bulk update failed: {e}")
+        return jsonify({'success': False, 'message': 'Bulk update failed; no complaints were changed'}), 500
+
+    updated = sum(result['result'] == 'updated' for result in results)
+    return jsonify({
+        'success': True,
+        'message': f'{updated} complaint(s) updated',
+        'updated': updated,
+        'results': results
+    })
+
+REPORT_TOP_TAGS = 20
+
 @admin_bp.route('/reports')
 @admin_required
 def reports():
@@ -745,6 +813,9 @@ def reports():
     lab_data = [item.count for item in complaints_by_lab]
     lab_details = [(item.name, item.count) for item in complaints_by_lab]
     
+    # Most used tags
+    tag_details = tag_counts(limit=REPORT_TOP_TAGS)
+
     # Status counts
     status_counts = {
         'Pending': Complaint.query.filter_by(status='Pending').count(),
@@ -766,59 +837,36 @@ def reports():
     resolution_rate = round((resolved_complaints / total_complaints * 100) if total_complaints > 0 else 0, 1)
     
     # Average resolution time
-    resolved_with_time = Complaint.query.filter_by(status='Resolved').filter(
-        Complaint.updated_at.isnot(None)
-    ).all()
-    
-    if resolved_with_time:
-        total_hours = sum([
-            (c.updated_at - c.created_at).total_seconds() / 3600 
-            for c in resolved_with_time
-        ])
-        avg_resolution_time = f"{round(total_hours / len(resolved_with_time), 1)}h"
-    else:
-        avg_resolution_time = "N/A"
+    avg_seconds = average_resolution_seconds()
+    avg_resolution_time = f"{round(avg_seconds / 3600, 1)}h" if avg_seconds is not None else "N/A"
     
     # High priority count
     high_priority_count = priority_counts['High']
     
     # Admin performance
     admins = Admin.query.filter_by(is_active=True).all()
+    workload = admin_workload_stats([admin.id for admin in admins])
     admin_performance = []
     
+    # Create a simple object to hold lab info (admins don't have direct lab association)
+    class LabPlaceholder:
+        def __init__(self):
+            self.name = "All Labs"
+    
     for admin in admins:
-        assigned_complaints = Complaint.query.filter_by(assigned_admin_id=admin.id).all()
-        total_assigned = len(assigned_complaints)
-        resolved_count = len([c for c in assigned_complaints if c.status == 'Resolved'])
-        in_progress_count = len([c for c in assigned_complaints if c.status == 'In Progress'])
+        stats = workload.get(admin.id)
+        total_assigned = stats.total_assigned if stats else 0
+        resolved_count = int(stats.resolved_count or 0) if stats else 0
+        in_progress_count = int(stats.in_progress_count or 0) if stats else 0
         
         resolution_rate_admin = round((resolved_count / total_assigned * 100) if total_assigned > 0 else 0, 1)
         
-        # Average response time
-        if assigned_complaints:
-            response_times = []
-            for complaint in assigned_complaints:
-                logs = ComplaintLog.query.filter_by(
-                    complaint_id=complaint.id,
-                    admin_id=admin.id,
-                    action='ADMIN_ASSIGNED'
-                ).first()
-                if logs:
-                    response_time = (logs.timestamp - complaint.created_at).total_seconds() / 3600
-                    response_times.append(response_time)
-            
-            if response_times:
-                avg_response_time = f"{round(sum(response_times) / len(response_times), 1)}h"
-            else:
-                avg_response_time = "N/A"
+        # Average response time (submission to first assignment)
+        if stats and stats.response_seconds is not None:
+            avg_response_time = f"{round(float(stats.response_seconds) / 3600, 1)}h"
         else:
             avg_response_time = "N/A"
         
-        # Create a simple object to hold lab info (admins don't have direct lab association)
-        class LabPlaceholder:
-            def __init__(self):
-                self.name = "All Labs"
-        
         admin_performance.append({
             'name': admin.name,
             'email': admin.email,
@@ -830,16 +878,12 @@ def reports():
             'avg_response_time': avg_response_time
         })
     
-    # Monthly trend data
-    from sqlalchemy import func, extract
-    monthly_data = db.session.query(
-        extract('year', Complaint.created_at).label('year'),
-        extract('month', Complaint.created_at).label('month'),
-        func.count(Complaint.id).label('count')
-    ).group_by('year', 'month').order_by('year', 'month').limit(12).all()
+    # Monthly trend data: the last 12 months, including empty ones
+    trend_end = next_bucket('month', floor_bucket('month', datetime.utcnow()))
+    monthly_trend = cached_trend('month', trend_end.replace(year=trend_end.year - 1), trend_end)
     
-    trend_labels = [f"{int(row.year)}-{int(row.month):02d}" for row in monthly_data]
-    trend_data = [row.count for row in monthly_data]
+    trend_labels = [label[:7] for label in monthly_trend['labels']]
+    trend_data = monthly_trend['total']
     
     # Check if this is an SPA request
     is_spa = request.args.get('spa') == 'true'
@@ -853,6 +897,7 @@ def reports():
         lab_labels=lab_labels,
         lab_data=lab_data,
         lab_details=lab_details,
+        tag_details=tag_details,
         status_counts=status_counts,
         priority_counts=priority_counts,
         total_complaints=total_complaints,
@@ -868,89 +913,48 @@ def reports():
 @admin_bp.route('/api/reports')
 @admin_required
 def api_reports():
+    """
+    Report data as JSON. Optional filters: lab_id, category,
+    date_from / date_to (YYYY-MM-DD, inclusive, on created_at).
+    """
+    date_to = parse_date_arg(request.args.get('date_to'))
+    criteria = complaint_filters(
+        lab_id=request.args.get('lab_id', type=int),
+        category=request.args.get('category'),
+        date_from=parse_date_arg(request.args.get('date_from')),
+        date_to=date_to + timedelta(days=1) if date_to else None
+    )
+
     # Get data for reports
-    complaints_by_month = db.session.query(
-        db.func.strftime('%Y-%m', Complaint.created_at).label('month'),
-        db.func.count(Complaint.id).label('count')
-    ).group_by('month').order_by('month').all()
+    complaints_by_month = counts_by_bucket('month', criteria)
     
     complaints_by_category = db.session.query(
         Complaint.category, 
         db.func.count(Complaint.id).label('count')
-    ).group_by(Complaint.category).all()
+    ).filter(*criteria).group_by(Complaint.category).all()
     
     complaints_by_lab = db.session.query(
         Lab.name, 
         db.func.count(Complaint.id).label('count')
-    ).join(Complaint).group_by(Lab.name).all()
-    
-    resolution_time_avg = db.session.query(
-        db.func.avg(db.func.extract('epoch', Complaint.updated_at - Complaint.created_at) / 3600).label('hours')
-    ).filter(Complaint.status == 'Resolved').scalar()
-    
-    # Count of resolved complaints
-    resolved_count = Complaint.query.filter_by(status='Resolved').count()
-    
-    # Get resolution time distribution
-    resolved_complaints = Complaint.query.filter_by(status='Resolved').all()
-    resolution_buckets = {
-        '0-1h': 0, '1-3h': 0, '3-8h': 0, '8-24h': 0,
-        '1-3d': 0, '3-7d': 0, '7d+': 0
-    }
+    ).join(Complaint).filter(*criteria).group_by(Lab.name).all()
     
-    if resolved_complaints:
-        for complaint in resolved_complaints:
-            hours = (complaint.updated_at - complaint.created_at).total_seconds() / 3600
-            if hours < 1:
-                resolution_buckets['0-1h'] += 1
-            elif hours < 3:
-                resolution_buckets['1-3h'] += 1
-            elif hours < 8:
-                resolution_buckets['3-8h'] += 1
-            elif hours < 24:
-                resolution_buckets['8-24h'] += 1
-            elif hours < 72:  # 3 days
-                resolution_buckets['1-3d'] += 1
-            elif hours < 168:  # 7 days
-                resolution_buckets['3-7d'] += 1
-            else:
-                resolution_buckets['7d+'] += 1
-
-    # Get min and max resolution times
-    min_resolution = None
-    max_resolution = None
-    if resolved_complaints:
-        min_resolution_complaint = min(resolved_complaints, key=lambda x: (x.updated_at - x.created_at).total_seconds())
-        max_resolution_complaint = max(resolved_complaints, key=lambda x: (x.updated_at - x.created_at).total_seconds())
-        
-        min_resolution_seconds = (min_resolution_complaint.updated_at - min_resolution_complaint.created_at).total_seconds()
-        max_resolution_seconds = (max_resolution_complaint.updated_at - max_resolution_complaint.created_at).total_seconds()
-        
-        # Format the times
-        min_minutes = int(min_resolution_seconds / 60)
-        if min_minutes < 60:
-            min_resolution = f"{min_minutes}m"
-        else:
-            min_hours = min_minutes // 60
-            min_remaining_minutes = min_minutes % 60
-            min_resolution = f"{min_hours}h {min_remaining_minutes}m"
-        
-        # Max resolution time formatting
-        max_hours = int(max_resolution_seconds / 3600)
-        if max_hours < 24:
-            max_resolution = f"{max_hours}h"
-        else:
-            max_days = max_hours // 24
-            max_remaining_hours = max_hours % 24
-            max_resolution = f"{max_days}d {max_remaining_hours}h"
-    
-    # Count unresolved complaints
-    unresolved_count = Complaint.query.filter(Complaint.status != 'Resolved').count()
+    complaints_by_tag = tag_counts(criteria, limit=REPORT_TOP_TAGS)
+
+    # Histogram, extremes and percentiles in one aggregate query
+    stats = resolution_stats(criteria)
+
+    # Count of resolved / unresolved complaints
+    status_counts = db.session.query(
+        db.func.sum(db.case((Complaint.status == 'Resolved', 1), else_=0)).label('resolved'),
+        db.func.count(Complaint.id).label('total')
+    ).filter(*criteria).one()
+    resolved_count = int(status_counts.resolved or 0)
+    unresolved_count = status_counts.total - resolved_count
 
     return jsonify({
         'complaints_by_month': [
-            {'month': item.month, 'count': item.count}
-            for item in complaints_by_month
+            {'month': month.strftime('%Y-%m'), 'count': count}
+            for month, count in complaints_by_month
         ],
         'complaints_by_category': [
             {'category': item.category, 'count': item.count}
@@ -960,24 +964,176 @@ def api_reports():
             {'lab': item.name, 'count': item.count}
             for item in complaints_by_lab
         ],
-        'resolution_time_avg': resolution_time_avg or 0,
+        'complaints_by_tag': [
+            {'tag': tag, 'count': count}
+            for tag, count in complaints_by_tag
+        ],
+        'resolution_time_avg': stats['avg_seconds'] / 3600 if stats['avg_seconds'] is not None else 0,
         'resolved_count': resolved_count,
         'unresolved_count': unresolved_count,
-        'resolution_buckets': resolution_buckets,
-        'min_resolution_time': min_resolution or '0m',
-        'max_resolution_time': max_resolution or '0h'
+        'resolution_buckets': stats['buckets'],
+        'resolution_percentiles': {
+            key: round(value / 3600, 2) if value is not None else None
+            for key, value in stats['percentiles'].items()
+        },
+        'min_resolution_time': format_short_duration(stats['min_seconds']) if stats['count'] else '0m',
+        'max_resolution_time': format_long_duration(stats['max_seconds']) if stats['count'] else '0h'
+    })
+
+def cached_trend(granularity, start, end, breakdown=None, lab_id=None, category=None, status=None):
+    """complaint_trend() for [start, end), cached per range and filter set."""
+    def compute():
+        criteria = complaint_filters(lab_id=lab_id, category=category)
+        if status:
+            criteria.append(Complaint.status == status)
+        return complaint_trend(granularity, start, end, breakdown, criteria)
+
+    return cached_report(('trend', granularity, start, end, breakdown, lab_id, category, status), compute)
+
+TREND_DEFAULT_SPANS = {'day': timedelta(days=30), 'week': timedelta(weeks=12), 'month': timedelta(days=365), 'year': timedelta(days=5 * 365)}
+
+@admin_bp.route('/api/reports/trend')
+@admin_required
+def api_report_trend():
+    """
+    Complaint counts over time, one zero-filled series per breakdown value.
+    Query args: granularity (day|week|month|year, default month),
+    start / end (YYYY-MM-DD, inclusive; default a span ending today),
+    breakdown (lab|category|status), lab_id, category, status.
+    """
+    granularity = request.args.get('granularity', 'month')
+    if granularity not in TREND_DEFAULT_SPANS:
+        return jsonify({'success': False, 'message': f'Unknown granularity: {granularity}'}), 400
+
+    end = parse_date_arg(request.args.get('end')) or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    end = end + timedelta(days=1)
+    start = parse_date_arg(request.args.get('start')) or end - TREND_DEFAULT_SPANS[granularity]
+    breakdown = request.args.get('breakdown') or None
+    lab_id = request.args.get('lab_id', type=int)
+    category = request.args.get('category') or None
+    status = request.args.get('status') or None
+
+    try:
+        trend = cached_trend(granularity, start, end, breakdown, lab_id, category, status)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    return jsonify({
+        'success': True,
+        'granularity': granularity,
+        'start': start.date().isoformat(),
+        'end': (end - timedelta(days=1)).date().isoformat(),
+        'breakdown': breakdown,
+        **trend
     })
 
+@admin_bp.route('/api/sla/at-risk')
+@admin_required
+def api_sla_at_risk():
+    """
+    Open complaints past or near an SLA deadline, soonest first, from the
+    in-memory deadline index. Query args: within (hours, default
+    SLA_AT_RISK_HOURS), limit (default 50, max 200).
+    """
+    monitor = ensure_sla_monitor()
+    if monitor is None:
+        return jsonify({'success': False, 'message': 'SLA monitoring is disabled'}), 404
+
+    within = request.args.get('within', current_app.config['SLA_AT_RISK_HOURS'], type=float)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    now = datetime.utcnow()
+    entries = monitor.at_risk(now + timedelta(hours=within))[:limit]
+
+    complaints = {
+        complaint.id: complaint for complaint in
+        Complaint.query.options(joinedload(Complaint.lab), joinedload(Complaint.assigned_admin))
+        .filter(Complaint.id.in_({complaint_id for _, complaint_id, _ in entries}))
+    } if entries else {}
+
+    items = []
+    for due_at, complaint_id, clock in entries:
+        complaint = complaints.get(complaint_id)
+        if complaint is None:
+            continue
+        items.append({
+            'id': complaint.id,
+            'complaint_id': complaint.complaint_id,
+            'lab': complaint.lab.name,
+            'priority': complaint.priority or 'Low',
+            'status': complaint.status,
+            'assigned_admin': complaint.assigned_admin.name if complaint.assigned_admin else None,
+            'clock': clock,
+            'due_at': due_at.isoformat(),
+            'breached': due_at <= now,
+            'minutes_left': int((due_at - now).total_seconds() // 60)
+        })
+
+    return jsonify({'success': True, 'within_hours': within, 'complaints': items})
+
+def build_logs_query(args):
+    """
+    Build the activity log query from request filters.
+    Supported: admin_id, action, date_from / date_to (YYYY-MM-DD, inclusive).
+    """
+    logs_query = ComplaintLog.query.options(
+        joinedload(ComplaintLog.complaint),
+        joinedload(ComplaintLog.admin),
+        joinedload(ComplaintLog.target_admin)
+    )
+
+    admin_id = args.get('admin_id', type=int)
+    if admin_id:
+        logs_query = logs_query.filter(ComplaintLog.admin_id == admin_id)
+
+    action = args.get('action')
+    if action:
+        logs_query = logs_query.filter(ComplaintLog.action == action)
+
+    date_from = parse_date_arg(args.get('date_from'))
+    if date_from:
+        logs_query = logs_query.filter(ComplaintLog.timestamp >= date_from)
+
+    date_to = parse_date_arg(args.get('date_to'))
+    if date_to:
+        logs_query = logs_query.filter(ComplaintLog.timestamp < date_to + timedelta(days=1))
+
+    return logs_query
+
+
+def parse_date_arg(value):
+    """Parse a YYYY-MM-DD query argument, ignoring bad input."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def paginate_logs(args):
+    """Keyset-paginate activity logs using the request's cursor and filters."""
+    per_page = min(max(args.get('per_page', 20, type=int), 1), 100)
+    count_mode = args.get('count', current_app.config['LOG_COUNT_MODE'])
+    if count_mode not in ('exact', 'approximate', 'none'):
+        count_mode = 'approximate'
+
+    return keyset_paginate(
+        build_logs_query(args),
+        ComplaintLog.timestamp,
+        ComplaintLog.id,
+        cursor=args.get('cursor'),
+        per_page=per_page,
+        count_mode=count_mode
+    )
+
+
 @admin_bp.route('/logs')
 @admin_required
 def logs():
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
-    logs_query = ComplaintLog.query\
-        .order_by(ComplaintLog.timestamp.desc())
-    
-    logs_paginated = logs_query.paginate(page=page, per_page=per_page, error_out=False)
+    try:
+        logs_paginated = paginate_logs(request.args)
+    except ValueError:
+        abort(400)
     
     # Get all admins for the filter
     admins = Admin.query.order_by(Admin.name.asc()).all()
@@ -990,6 +1146,11 @@ def logs():
         template, 
         logs=logs_paginated.items,
         pagination=logs_paginated,
+        filters={
+            key: request.args[key]
+            for key in ('admin_id', 'action', 'date_from', 'date_to')
+            if request.args.get(key)
+        },
         admins=admins,
         current_year=datetime.utcnow().year
     )
@@ -997,13 +1158,10 @@ def logs():
 @admin_bp.route('/api/logs')
 @admin_required
 def api_logs():
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
-    logs_query = ComplaintLog.query\
-        .order_by(ComplaintLog.timestamp.desc())
-    
-    logs_paginated = logs_query.paginate(page=page, per_page=per_page, error_out=False)
+    try:
+        logs_paginated = paginate_logs(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
     logs_data = []
     for log in logs_paginated.items:
@@ -1037,14 +1195,7 @@ def api_logs():
     
     return jsonify({
         'logs': logs_data,
-        'pagination': {
-            'page': page,
-            'per_page': per_page,
-            'total': logs_paginated.total,
-            'pages': logs_paginated.pages,
-            'has_next': logs_paginated.has_next,
-            'has_prev': logs_paginated.has_prev
-        }
+        'pagination': logs_paginated.to_dict()
     })
 
 # ----------------------
@@ -1055,8 +1206,7 @@ def api_logs():
 def settings():
     if request.method == 'POST':
         form_type = request.form.get('form_type')
-        admin_email = session.get('admin_email')
-        admin = Admin.query.filter_by(email=admin_email).first()
+        admin = Admin.query.get(session.get('admin_id'))
         
         if not admin:
             flash('Admin not found', 'error')
@@ -1102,15 +1252,12 @@ def settings():
         # Handle notification preferences
         elif form_type == 'notifications':
             try:
-                # Note: Since notification preferences are not in the Admin model,
-                # we'll store them in session for now. In production, you'd add
-                # columns to the Admin model or create a separate preferences table.
-                session['email_notifications'] = 'email_notifications' in request.form
-                session['assignment_notifications'] = 'assignment_notifications' in request.form
-                session['status_notifications'] = 'status_notifications' in request.form
-                session['daily_summary'] = 'daily_summary' in request.form
+                # Stored per admin so notifications and digests can honour them
+                save_notification_prefs(admin.id, {key: key in request.form for key in DEFAULT_PREFERENCES})
+                db.session.commit()
                 flash('Notification preferences saved', 'success')
             except Exception as e:
+                db.session.rollback()
                 flash(f'Error saving preferences: {str(e)}', 'error')
         
         return redirect(url_for('admin.settings'))
@@ -1122,16 +1269,9 @@ def settings():
     template = 'admin/settings.html'
     
     # Get current admin details
-    admin_email = session.get('admin_email')
-    admin = Admin.query.filter_by(email=admin_email).first()
+    admin = Admin.query.get(session.get('admin_id'))
     
-    # Get notification preferences from session (default to True)
-    notification_prefs = {
-        'email_notifications': session.get('email_notifications', True),
-        'assignment_notifications': session.get('assignment_notifications', True),
-        'status_notifications': session.get('status_notifications', True),
-        'daily_summary': session.get('daily_summary', False)
-    }
+    notification_prefs = get_notification_prefs(admin.id if admin else None)
     
     return render_template(
         template,
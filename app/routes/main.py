@@ -1,5 +1,6 @@
-from flask import Blueprint, render_template, redirect, url_for, send_from_directory, current_app
+from flask import Blueprint, render_template, redirect, url_for
 import os
+from ..attachments import THUMBNAIL_MIMETYPES, parse_attachment_path, parse_thumbnail_path, send_upload, store_key
 
 main_bp = Blueprint('main', __name__, template_folder='../templates')
 
@@ -15,6 +16,20 @@ def home():
 def uploaded_file(filename):
     """
     Serve uploaded files from the uploads directory.
+    Content-addressed paths (ab/cd/<sha256>/<filename>) are read from the
+    store; anything else is a legacy flat upload.
     """
-    upload_folder = current_app.config['UPLOAD_FOLDER']
-    return send_from_directory(upload_folder, filename)
+    stored = parse_attachment_path(filename)
+    if stored:
+        # Content never changes for a hash: strong ETag, cache forever
+        sha256, download_name = stored
+        return send_upload(store_key(sha256), download_name or sha256, etag=sha256, immutable=True)
+
+    thumbnail_format = parse_thumbnail_path(filename)
+    if thumbnail_format:
+        return send_upload(
+            filename, os.path.basename(filename), immutable=True,
+            mimetype=THUMBNAIL_MIMETYPES[thumbnail_format]
+        )
+
+    return send_upload(filename, os.path.basename(filename))
@@ -1,7 +1,14 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask import Blueprint, render_template, request, flash, redirect, url_for, current_app
+from sqlalchemy.orm import selectinload
 from ..models import Complaint, Lab, ComplaintLog, db
 from ..utils import generate_complaint_id, save_attachment
-from ..notifications import notify_complaint_creation
+from ..notifications import notify_assignment, notify_complaint_creation
+from ..archive import find_archived_complaint, find_archived_complaints
+from ..attachments import link_attachment
+from ..thumbnails import enqueue_thumbnails
+from ..assignment import auto_assign
+from ..duplicates import link_duplicate
+from ..triage import triage_complaint
 
 user_bp = Blueprint('user', __name__, template_folder='../templates/user')
 
@@ -16,13 +23,22 @@ def submit_complaint():
         lab_id = request.form.get('lab')
         category = request.form.get('category')
         description = request.form.get('description')
-        attachment = request.files.get('attachment')
+        files = [f for f in request.files.getlist('attachment') if f]
 
         # Generate sequential complaint ID
         complaint_id = generate_complaint_id()
 
-        # Save attachment locally
-        attachment_path = save_attachment(attachment, complaint_id)
+        if len(files) > current_app.config['MAX_ATTACHMENTS']:
+            flash(f"You can attach at most {current_app.config['MAX_ATTACHMENTS']} files.", 'danger')
+            return redirect(url_for('user.submit_complaint'))
+
+        # Save attachments in the content-addressed store
+        try:
+            attachments = [save_attachment(f) for f in files]
+        except ValueError as e:
+            db.session.rollback()
+            flash(f'Attachment rejected: {e}', 'danger')
+            return redirect(url_for('user.submit_complaint'))
 
         # Save complaint to DB
         complaint = Complaint(
@@ -32,13 +48,17 @@ def submit_complaint():
             lab_id=lab_id,
             category=category,
             description=description,
-            attachment_path=attachment_path,
             status='Pending',
             priority='Low'
         )
         db.session.add(complaint)
         db.session.flush()
 
+        for attachment, filename in attachments:
+            link = link_attachment(complaint, attachment, filename)
+            # First file doubles as the single-attachment link used by list views
+            complaint.attachment_path = complaint.attachment_path or link.url_path
+
         # Log initial tag state
         initial_log = ComplaintLog(
             complaint_id=complaint.id,
@@ -49,10 +69,34 @@ def submit_complaint():
             description='Initial tag set to none'
         )
         db.session.add(initial_log)
+
+        # Suggest category/priority/tags when a triage model has been trained
+        triage_complaint(complaint)
+
+        # Repeat reports join the open complaint they duplicate (and its
+        # assignee); others are routed when AUTO_ASSIGN_POLICY is on
+        parent = link_duplicate(complaint)
+        if parent:
+            db.session.add(ComplaintLog(
+                complaint_id=complaint.id,
+                admin_id=None,
+                action='DUPLICATE_LINKED',
+                new_value=parent.complaint_id,
+                description=f'Linked as a duplicate of {parent.complaint_id}'
+            ))
+            assigned_admin = None
+        else:
+            assigned_admin = auto_assign(complaint)
         db.session.commit()
 
-        # Send notifications
-        notify_complaint_creation(complaint)
+        # Thumbnails are rendered off the request thread
+        enqueue_thumbnails([attachment.sha256 for attachment, _ in attachments])
+
+        # Send notifications (the lab and assignee already know about a duplicate's parent)
+        notify_complaint_creation(complaint, lab_alert=parent is None)
+        if assigned_admin:
+            notify_assignment(complaint, assigned_admin, None)
+        db.session.commit()  # persists digest events queued by the notification
         flash(f'Complaint submitted successfully! Your ID: {complaint_id}', 'success')
 
         # Instead of redirecting to submit page, show track page with this complaint
@@ -73,13 +117,14 @@ def track_complaint():
         email = request.form.get('email')
         complaint_id = request.form.get('complaint_id')
 
-        query = Complaint.query
+        query = Complaint.query.options(selectinload(Complaint.attachments))
         if email:
             query = query.filter_by(email=email)
         if complaint_id:
             query = query.filter_by(complaint_id=complaint_id)
 
         complaints = query.all()
+        complaints += find_archived_complaints(email=email, complaint_id=complaint_id)
 
         if not complaints:
             flash('No complaints found.', 'warning')
@@ -93,6 +138,9 @@ def complaint_detail(complaint_id):
     Show full details of a single complaint, including logs
     """
     complaint = Complaint.query.filter_by(complaint_id=complaint_id).first()
+    if not complaint:
+        # Fall back to cold storage for long-archived complaints
+        complaint = find_archived_complaint(complaint_id=complaint_id)
     if not complaint:
         flash('Complaint not found.', 'warning')
         return redirect(url_for('user.track_complaint'))
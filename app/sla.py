@@ -0,0 +1,280 @@
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+from .extensions import db
+from .models import Complaint, ComplaintLog, Lab, SlaBreach
+
+OPEN_STATUSES = ('Pending', 'In Progress')
+# assign: time allowed unassigned; resolve: time allowed until resolution
+SLA_CLOCKS = ('assign', 'resolve')
+SNAPSHOT_FIELDS = ('id', 'status', 'priority', 'lab_id', 'assigned_admin_id', 'archived', 'created_at')
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+# --------------------------
+# Deadline Index
+# --------------------------
+class SlaMonitor:
+    """
+    Deadlines of every open complaint in a min-heap, keyed by
+    (due_at, complaint id, clock). Changed complaints push fresh entries and
+    superseded ones are skipped lazily, so updates are O(log n). Passed
+    deadlines move to `breached` until the complaint is closed or changed.
+    """
+
+    def __init__(self, targets, lab_targets):
+        self.targets = targets
+        self.lab_targets = lab_targets
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._heap = []
+        self._deadlines = {}  # complaint id -> {clock: due_at} still ahead
+        self._breached = {}   # complaint id -> {clock: due_at} already passed
+        self._lab_names = {}
+
+    def target_hours(self, priority, lab_id):
+        priority = priority or 'Low'
+        hours = dict(self.targets.get(priority, self.targets['Low']))
+        # Labs created after load() use the defaults until the next load
+        lab = self.lab_targets.get(self._lab_names.get(lab_id), {})
+        hours.update(lab.get(priority, {}))
+        return hours
+
+    def deadlines_for(self, complaint):
+        """{clock: due_at} for a complaint (or snapshot), empty once it is closed."""
+        if complaint.status not in OPEN_STATUSES or complaint.archived or complaint.created_at is None:
+            return {}
+        hours = self.target_hours(complaint.priority, complaint.lab_id)
+        deadlines = {'resolve': complaint.created_at + timedelta(hours=hours['resolve'])}
+        if complaint.assigned_admin_id is None:
+            deadlines['assign'] = complaint.created_at + timedelta(hours=hours['assign'])
+        return deadlines
+
+    def load(self):
+        """Index all open complaints (uses the status index, not a table scan)."""
+        labs = {lab.id: lab.name for lab in Lab.query.with_entities(Lab.id, Lab.name)}
+        rows = db.session.query(*(getattr(Complaint, field) for field in SNAPSHOT_FIELDS))\
+            .filter(Complaint.status.in_(OPEN_STATUSES)).all()
+        with self._lock:
+            self._lab_names = labs
+            self._heap, self._deadlines, self._breached = [], {}, {}
+            for row in rows:
+                self._track(row)
+            self.loaded = True
+
+    def _track(self, complaint):
+        # Overdue deadlines go in too: the next pop_due() raises them, and
+        # the unique breach row stops a deadline from firing twice
+        self._deadlines.pop(complaint.id, None)
+        self._breached.pop(complaint.id, None)
+        for clock, due_at in self.deadlines_for(complaint).items():
+            self._deadlines.setdefault(complaint.id, {})[clock] = due_at
+            heapq.heappush(self._heap, (due_at, complaint.id, clock))
+
+    def track(self, complaint):
+        """Re-evaluate one complaint after it was created or changed."""
+        with self._lock:
+            self._track(complaint)
+
+    def _current(self, entry):
+        due_at, complaint_id, clock = entry
+        return self._deadlines.get(complaint_id, {}).get(clock) == due_at
+
+    def pop_due(self, now=None):
+        """
+        Deadlines that have passed since the last call, oldest first.
+        :return: list of (due_at, complaint id, clock)
+        """
+        now = now or datetime.utcnow()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                if not self._current(entry):
+                    continue
+                due_at, complaint_id, clock = entry
+                del self._deadlines[complaint_id][clock]
+                self._breached.setdefault(complaint_id, {})[clock] = due_at
+                due.append(entry)
+        return due
+
+    def requeue(self, entries):
+        """
+        Put popped deadlines whose breach was not recorded (e.g. the commit
+        failed) back on the heap, so the next pop_due() raises them again.
+        Entries for complaints that changed since are dropped.
+        """
+        with self._lock:
+            for entry in entries:
+                due_at, complaint_id, clock = entry
+                if self._breached.get(complaint_id, {}).get(clock) != due_at:
+                    continue
+                del self._breached[complaint_id][clock]
+                self._deadlines.setdefault(complaint_id, {})[clock] = due_at
+                heapq.heappush(self._heap, entry)
+
+    def at_risk(self, horizon):
+        """
+        Breached deadlines plus those due before horizon, soonest first.
+        Only the heap nodes below horizon are visited.
+        :return: list of (due_at, complaint id, clock)
+        """
+        with self._lock:
+            entries = [
+                (due_at, complaint_id, clock)
+                for complaint_id, clocks in self._breached.items()
+                for clock, due_at in clocks.items()
+            ]
+            stack = [0]
+            while stack:
+                index = stack.pop()
+                if index >= len(self._heap) or self._heap[index][0] > horizon:
+                    continue
+                if self._current(self._heap[index]):
+                    entries.append(self._heap[index])
+                stack.extend((2 * index + 1, 2 * index + 2))
+        return sorted(entries)
+
+
+def init_sla(app):
+    app.extensions['sla_monitor'] = SlaMonitor(app.config['SLA_TARGETS'], app.config.get('SLA_LAB_TARGETS', {}))
+    app.before_request(_start_poller)
+
+def load_sla_monitor(app):
+    """Index open complaints at startup; a failure leaves it to the first use."""
+    try:
+        app.extensions['sla_monitor'].load()
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ SLA monitor not loaded: {e}")
+
+def get_sla_monitor():
+    return current_app.extensions['sla_monitor']
+
+def ensure_sla_monitor():
+    """The loaded deadline index, or None when SLA monitoring is off."""
+    if not current_app.config.get('SLA_ENABLED', True):
+        return None
+    monitor = get_sla_monitor()
+    if not monitor.loaded:
+        with _poller_lock:
+            if not monitor.loaded:
+                monitor.load()
+    return monitor
+
+def _start_poller():
+    if ensure_sla_monitor() is not None:
+        _ensure_poller()
+
+
+# --------------------------
+# Change Tracking
+# --------------------------
+@event.listens_for(Complaint, 'after_insert')
+@event.listens_for(Complaint, 'after_update')
+def _remember_complaint(mapper, connection, target):
+    # Plain values: the objects are expired by the time the commit finishes
+    snapshot = SimpleNamespace(**{field: getattr(target, field) for field in SNAPSHOT_FIELDS})
+    Session.object_session(target).info.setdefault('sla_changed', []).append(snapshot)
+
+@event.listens_for(Session, 'after_commit')
+def _apply_complaint_changes(session):
+    changed = session.info.pop('sla_changed', None)
+    if not changed or not has_app_context():
+        return
+    monitor = current_app.extensions.get('sla_monitor')
+    if monitor is None or not monitor.loaded:
+        return
+    for snapshot in changed:
+        monitor.track(snapshot)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_complaint_changes(session):
+    session.info.pop('sla_changed', None)
+
+
+# --------------------------
+# Breaches
+# --------------------------
+def check_sla_breaches(now=None):
+    """
+    Raise a breach for every deadline that has passed: record it (the
+    unique row makes each breach fire once across workers), log it on the
+    complaint and notify the lab channel and assigned admin.
+    :return: number of breaches raised
+    """
+    from .notifications import notify_sla_breach
+
+    monitor = get_sla_monitor()
+    due = monitor.pop_due(now)
+    if not due:
+        return 0
+
+    try:
+        complaints = {
+            complaint.id: complaint for complaint in
+            Complaint.query.options(joinedload(Complaint.lab), joinedload(Complaint.assigned_admin))
+            .filter(Complaint.id.in_({complaint_id for _, complaint_id, _ in due}))
+        }
+    except Exception:
+        monitor.requeue(due)
+        raise
+    raised = 0
+    for due_at, complaint_id, clock in due:
+        complaint = complaints.get(complaint_id)
+        if complaint is None or monitor.deadlines_for(complaint).get(clock) != due_at:
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.add(SlaBreach(complaint_id=complaint_id, clock=clock, due_at=due_at))
+        except IntegrityError:
+            continue  # another worker raised it
+
+        hours = monitor.target_hours(complaint.priority, complaint.lab_id)[clock]
+        db.session.add(ComplaintLog(
+            complaint_id=complaint.id,
+            admin_id=None,
+            action='SLA_BREACHED',
+            new_value=clock,
+            description=f"{'Unassigned' if clock == 'assign' else 'Unresolved'} for more than {hours}h"
+        ))
+        try:
+            notify_sla_breach(complaint, clock, hours)
+            db.session.commit()
+            raised += 1
+        except Exception as e:
+            db.session.rollback()
+            monitor.requeue([(due_at, complaint_id, clock)])
+            print(f"❌ Error raising SLA breach for {complaint.complaint_id}: {e}")
+    return raised
+
+def _run_poller(app):
+    interval = app.config.get('SLA_POLL_INTERVAL', 60)
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                check_sla_breaches()
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ SLA poller error: {e}")
+
+def _ensure_poller():
+    global _poller
+    if current_app.config.get('TESTING') or _poller is not None:
+        return
+    with _poller_lock:
+        if _poller is None:
+            _poller = threading.Thread(
+                target=_run_poller, args=(current_app._get_current_object(),),
+                name='sla-poller', daemon=True
+            )
+            _poller.start()
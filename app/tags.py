@@ -0,0 +1,117 @@
+from sqlalchemy import delete, event, insert, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from .extensions import db
+from .models import Complaint, ComplaintTag, Tag
+
+TAG_NAME_LENGTH = 50
+
+
+# --------------------------
+# Parsing
+# --------------------------
+def parse_tags(value):
+    """Tag names in a comma-separated tags string: trimmed, lower-case, no 'none', no repeats."""
+    names = []
+    for part in (value or '').split(','):
+        name = part.strip().lower()[:TAG_NAME_LENGTH]
+        if name and name != 'none' and name not in names:
+            names.append(name)
+    return names
+
+
+# --------------------------
+# Storage
+# --------------------------
+def _insert_ignoring_duplicates(connection, names):
+    """Create missing tags; concurrent writers creating the same tag are fine."""
+    rows = [{'name': name} for name in names]
+    if connection.dialect.name == 'postgresql':
+        connection.execute(postgresql.insert(Tag.__table__).on_conflict_do_nothing(index_elements=['name']), rows)
+    elif connection.dialect.name == 'sqlite':
+        connection.execute(sqlite.insert(Tag.__table__).on_conflict_do_nothing(index_elements=['name']), rows)
+    else:
+        existing = set(connection.scalars(select(Tag.name).where(Tag.name.in_(names))))
+        missing = [row for row in rows if row['name'] not in existing]
+        if missing:
+            connection.execute(insert(Tag.__table__), missing)
+
+def store_tags(connection, tags_by_complaint):
+    """
+    Replace the complaint_tags rows of the given complaints, in a fixed
+    number of statements however many complaints there are.
+    :param tags_by_complaint: {complaint id: [tag name, ...]}
+    """
+    if not tags_by_complaint:
+        return
+    names = sorted({name for names in tags_by_complaint.values() for name in names})
+    tag_ids = {}
+    if names:
+        _insert_ignoring_duplicates(connection, names)
+        tag_ids = dict(connection.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names))).all())
+    connection.execute(delete(ComplaintTag.__table__).where(
+        ComplaintTag.complaint_id.in_(list(tags_by_complaint))
+    ))
+    rows = [
+        {'complaint_id': complaint_id, 'tag_id': tag_ids[name]}
+        for complaint_id, names in tags_by_complaint.items() for name in names
+    ]
+    if rows:
+        connection.execute(insert(ComplaintTag.__table__), rows)
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_complaint_tags(session, flush_context):
+    """
+    Mirror Complaint.tags into complaint_tags in the same transaction, so
+    every write path (forms, APIs, bulk updates, triage) keeps them in step.
+    """
+    changed = {}
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Complaint) or obj.id is None:
+            continue
+        if obj in session.new or inspect(obj).attrs.tags.history.has_changes():
+            names = parse_tags(obj.tags)
+            # New complaints without tags have no rows to replace
+            if names or obj not in session.new:
+                changed[obj.id] = names
+    store_tags(session.connection(), changed)
+
+
+def backfill_tags(batch_size=500):
+    """
+    Fill complaint_tags from the tags strings of existing complaints, one
+    transaction per batch.
+    :return: number of complaints processed
+    """
+    processed, last_id = 0, 0
+    while True:
+        rows = db.session.query(Complaint.id, Complaint.tags).filter(Complaint.id > last_id)\
+            .order_by(Complaint.id).limit(batch_size).all()
+        if not rows:
+            return processed
+        try:
+            store_tags(db.session.connection(), {row.id: parse_tags(row.tags) for row in rows})
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error migrating tags after complaint {last_id}: {e}")
+            raise
+        processed += len(rows)
+        last_id = rows[-1].id
+
+
+# --------------------------
+# Queries
+# --------------------------
+def tagged_with(value):
+    """
+    Criteria matching complaints that carry every tag in a comma-separated
+    string, each answered from the (tag_id, complaint_id) index.
+    """
+    return [
+        Complaint.id.in_(
+            select(ComplaintTag.complaint_id).join(Tag, Tag.id == ComplaintTag.tag_id).where(Tag.name == name)
+        )
+        for name in parse_tags(value)
+    ]
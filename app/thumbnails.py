@@ -0,0 +1,182 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from PIL import Image, ImageOps
+from .extensions import db
+from .models import Attachment
+from .attachments import store_key, store_path
+
+IMAGE_SIGNATURES = (b'\x89PNG\r\n\x1a\n', b'\xff\xd8\xff', b'GIF87a', b'GIF89a')
+PDF_SIGNATURE = b'%PDF-'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+# --------------------------
+# Rendering
+# --------------------------
+def sniff_kind(path):
+    """'image', 'pdf' or None, from the blob's leading bytes."""
+    with open(path, 'rb') as f:
+        head = f.read(8)
+    if head.startswith(IMAGE_SIGNATURES):
+        return 'image'
+    if head.startswith(PDF_SIGNATURE):
+        return 'pdf'
+    return None
+
+def _render_pdf_page(path, size, workdir):
+    """
+    Rasterize the first PDF page with poppler's pdftoppm when it is installed
+    (Pillow cannot read PDFs). Returns the PNG path or None.
+    """
+    pdftoppm = shutil.which('pdftoppm')
+    if not pdftoppm:
+        return None
+    prefix = os.path.join(workdir, 'page')
+    try:
+        subprocess.run(
+            [pdftoppm, '-f', '1', '-l', '1', '-singlefile', '-png', '-scale-to', str(size), path, prefix],
+            check=True, timeout=30, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+    except (subprocess.SubprocessError, OSError):
+        return None
+    return prefix + '.png'
+
+def render_thumbnail(source, destination, size, image_format):
+    """
+    Write a thumbnail bounded to size x size. JPEGs are decoded at a reduced
+    scale (draft mode), so large photos never decode at full resolution.
+    """
+    with Image.open(source) as image:
+        image.draft('RGB', (size, size))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size), Image.LANCZOS)
+
+        if image_format == 'jpg':
+            if image.mode != 'RGB':
+                background = Image.new('RGB', image.size, 'white')
+                rgba = image.convert('RGBA')
+                background.paste(rgba, mask=rgba.split()[-1])
+                image = background
+            image.save(destination, 'JPEG', quality=80, optimize=True, progressive=True)
+        else:
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA')
+            image.save(destination, 'WEBP', quality=80, method=4)
+
+def generate_thumbnail(sha256: str, force: bool = False):
+    """
+    Create the thumbnail for one stored blob and record it on the Attachment
+    row. Non-image blobs (and PDFs without pdftoppm) are skipped.
+    :return: thumbnail path relative to UPLOAD_FOLDER, or None
+    """
+    attachment = Attachment.query.filter_by(sha256=sha256).first()
+    if attachment is None:
+        return None
+    if attachment.thumbnail_path and not force:
+        return attachment.thumbnail_path
+
+    source = store_path(sha256)
+    if not os.path.isfile(source):
+        return None
+    kind = sniff_kind(source)
+    if kind is None:
+        return None
+
+    size = current_app.config['THUMBNAIL_SIZE']
+    image_format = current_app.config['THUMBNAIL_FORMAT']
+    relative = f"{store_key(sha256)}.t{size}.{image_format}"
+    destination = os.path.join(current_app.config['UPLOAD_FOLDER'], *relative.split('/'))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if kind == 'pdf':
+            source = _render_pdf_page(source, size, workdir)
+            if source is None:
+                return None
+        # Write next to the destination and rename, so readers never see a partial file
+        partial = destination + '.part'
+        try:
+            render_thumbnail(source, partial, size, image_format)
+            os.replace(partial, destination)
+        except Exception as e:
+            if os.path.exists(partial):
+                os.remove(partial)
+            print(f"❌ Error generating thumbnail for {sha256}: {e}")
+            return None
+
+    previous = attachment.thumbnail_path
+    try:
+        attachment.thumbnail_path = relative
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"❌ Error saving thumbnail for {sha256}: {e}")
+        return None
+
+    # Size or format changed: drop the old rendition
+    if previous and previous != relative:
+        stale = os.path.join(current_app.config['UPLOAD_FOLDER'], *previous.split('/'))
+        if os.path.exists(stale):
+            os.remove(stale)
+    return relative
+
+
+# --------------------------
+# Background Jobs
+# --------------------------
+def _run_jobs(app, hashes):
+    with app.app_context():
+        for sha256 in hashes:
+            try:
+                generate_thumbnail(sha256)
+            except Exception as e:
+                print(f"❌ Thumbnail job failed for {sha256}: {e}")
+
+def _get_executor(workers):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='thumbnails')
+        return _executor
+
+def enqueue_thumbnails(hashes):
+    """
+    Generate thumbnails off the request thread. Call after the attachment
+    rows are committed. THUMBNAILS_ENABLED=false turns this into a no-op
+    (use `flask --app run generate-thumbnails` to backfill instead).
+    :return: Future or None
+    """
+    hashes = [h for h in hashes if h]
+    if not hashes or not current_app.config.get('THUMBNAILS_ENABLED', True):
+        return None
+    executor = _get_executor(current_app.config.get('THUMBNAIL_WORKERS', 1))
+    return executor.submit(_run_jobs, current_app._get_current_object(), hashes)
+
+def backfill_thumbnails(batch_size: int = 200, force: bool = False):
+    """
+    Generate missing thumbnails for existing attachments.
+    :return: (generated, skipped)
+    """
+    generated = skipped = 0
+    last_id = 0
+    while True:
+        query = Attachment.query.filter(Attachment.id > last_id)
+        if not force:
+            query = query.filter(Attachment.thumbnail_path.is_(None))
+        rows = query.with_entities(Attachment.id, Attachment.sha256)\
+            .order_by(Attachment.id.asc()).limit(batch_size).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        for row in rows:
+            if generate_thumbnail(row.sha256, force=force):
+                generated += 1
+            else:
+                skipped += 1
+    return generated, skipped
@@ -0,0 +1,363 @@
+import json
+import math
+import os
+import random
+import re
+import threading
+import zlib
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import and_, exists, func
+from .extensions import db
+from .models import Complaint, ComplaintLog
+from .tags import parse_tags
+
+FEATURE_BITS = 18           # hashed feature space of 2**18 buckets
+CLOSED_STATUSES = ('Resolved', 'Terminated')
+MIN_TAG_EXAMPLES = 5        # tags seen fewer times are not learned
+_WORD = re.compile(r'[a-z0-9]+')
+
+_model_lock = threading.Lock()
+
+
+# --------------------------
+# Features
+# --------------------------
+def features(text, category=None):
+    """
+    Hashed bag of words and word bigrams, L2-normalised, plus the reporter's
+    category as one more token.
+    :return: {bucket: weight}
+    """
+    words = _WORD.findall((text or '').lower())
+    tokens = words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+    if category:
+        tokens.append(f'category:{category.lower()}')
+    mask = (1 << FEATURE_BITS) - 1
+    buckets = {}
+    for token in tokens:
+        bucket = zlib.crc32(token.encode()) & mask
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+    norm = math.sqrt(sum(count * count for count in buckets.values())) or 1.0
+    return {bucket: count / norm for bucket, count in buckets.items()}
+
+
+# --------------------------
+# Linear Heads
+# --------------------------
+class LinearHead:
+    """
+    One linear layer over hashed features. Weights are stored per feature
+    ({bucket: [weight per label]}), so scoring touches only the buckets
+    present in the text.
+      multiclass - softmax over labels (category, priority)
+      multilabel - independent sigmoid per label (tags)
+    """
+
+    def __init__(self, labels, multilabel=False, bias=None, weights=None):
+        self.labels = list(labels)
+        self.multilabel = multilabel
+        self.bias = bias or [0.0] * len(self.labels)
+        self.weights = weights or {}
+
+    def scores(self, x):
+        scores = list(self.bias)
+        for bucket, value in x.items():
+            row = self.weights.get(bucket)
+            if row is not None:
+                for i, weight in enumerate(row):
+                    scores[i] += weight * value
+        return scores
+
+    def probabilities(self, x):
+        scores = self.scores(x)
+        if self.multilabel:
+            return [1 / (1 + math.exp(-max(min(score, 30), -30))) for score in scores]
+        top = max(scores)
+        exps = [math.exp(score - top) for score in scores]
+        total = sum(exps)
+        return [value / total for value in exps]
+
+    def fit(self, samples, epochs=8, learning_rate=0.5, l2=1e-5, seed=0):
+        """
+        Logistic regression by SGD. samples: list of (features, target),
+        target a label (multiclass) or a set of labels (multilabel).
+        """
+        index = {label: i for i, label in enumerate(self.labels)}
+        rng = random.Random(seed)
+        order = list(range(len(samples)))
+        for epoch in range(epochs):
+            rng.shuffle(order)
+            rate = learning_rate / (1 + epoch)
+            for n in order:
+                x, target = samples[n]
+                probabilities = self.probabilities(x)
+                if self.multilabel:
+                    gradient = [p - (label in target) for p, label in zip(probabilities, self.labels)]
+                else:
+                    gradient = list(probabilities)
+                    gradient[index[target]] -= 1
+                for i, g in enumerate(gradient):
+                    self.bias[i] -= rate * g
+                for bucket, value in x.items():
+                    row = self.weights.setdefault(bucket, [0.0] * len(self.labels))
+                    for i, g in enumerate(gradient):
+                        row[i] -= rate * (g * value + l2 * row[i])
+        # Drop near-zero rows to keep the model file small
+        self.weights = {
+            bucket: [round(w, 5) for w in row]
+            for bucket, row in self.weights.items() if max(abs(w) for w in row) >= 1e-4
+        }
+        return self
+
+    def to_dict(self):
+        return {
+            'labels': self.labels, 'multilabel': self.multilabel, 'bias': self.bias,
+            'weights': {str(bucket): row for bucket, row in self.weights.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['labels'], data['multilabel'], data['bias'],
+            {int(bucket): row for bucket, row in data['weights'].items()}
+        )
+
+
+class TriageModel:
+    """Category, priority and tag heads plus when they were trained."""
+
+    def __init__(self, heads, trained_at=None, examples=None):
+        self.heads = heads
+        self.trained_at = trained_at
+        self.examples = examples or {}
+
+    def suggest(self, description, category=None):
+        """
+        :return: {'category': (label, confidence), 'priority': (label, confidence),
+                  'tags': [(tag, confidence), ...]} for the heads that were trained
+        """
+        suggestion = {}
+        text_only = features(description)
+        with_category = features(description, category)
+        for name, head in self.heads.items():
+            probabilities = head.probabilities(text_only if name == 'category' else with_category)
+            if head.multilabel:
+                suggestion[name] = sorted(
+                    ((label, p) for label, p in zip(head.labels, probabilities) if p >= 0.5),
+                    key=lambda item: -item[1]
+                )
+            else:
+                best = max(range(len(probabilities)), key=probabilities.__getitem__)
+                suggestion[name] = (head.labels[best], probabilities[best])
+        return suggestion
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = {
+            'feature_bits': FEATURE_BITS,
+            'trained_at': self.trained_at,
+            'examples': self.examples,
+            'heads': {name: head.to_dict() for name, head in self.heads.items()}
+        }
+        # Write then rename so running workers never read a partial file
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(f'{path}.tmp', path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('feature_bits') != FEATURE_BITS:
+            raise ValueError('model was trained with a different feature size; retrain it')
+        heads = {name: LinearHead.from_dict(head) for name, head in data['heads'].items()}
+        return cls(heads, data.get('trained_at'), data.get('examples'))
+
+
+# --------------------------
+# Model Loading
+# --------------------------
+def get_triage_model():
+    """
+    The trained model, or None when TRIAGE_MODEL_PATH does not exist.
+    Reloaded when `triage-train` replaces the file.
+    """
+    path = current_app.config['TRIAGE_MODEL_PATH']
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = current_app.extensions.get('triage_model')
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with _model_lock:
+        try:
+            model = TriageModel.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Triage model not loaded: {e}")
+            model = None
+        current_app.extensions['triage_model'] = (mtime, model)
+    return model
+
+
+# --------------------------
+# Training
+# --------------------------
+def _reviewed(action):
+    """An admin (not System) changed this field on the complaint."""
+    return exists().where(and_(
+        ComplaintLog.complaint_id == Complaint.id,
+        ComplaintLog.action == action,
+        ComplaintLog.admin_id.isnot(None)
+    ))
+
+def train_triage(epochs=8, batch_size=1000):
+    """
+    Fit the heads on historical complaints:
+      category - every complaint's category
+      priority - complaints an admin re-prioritised or closed
+      tags     - complaints an admin tagged or closed
+    :return: TriageModel (not yet saved)
+    """
+    samples = {'category': [], 'priority': [], 'tags': []}
+    rows = db.session.query(
+        Complaint.description, Complaint.category, Complaint.priority, Complaint.tags,
+        Complaint.status.in_(CLOSED_STATUSES).label('closed'),
+        _reviewed('PRIORITY_CHANGED').label('prioritised'),
+        _reviewed('TAG_CHANGED').label('tagged')
+    ).yield_per(batch_size)
+    for row in rows:
+        samples['category'].append((features(row.description), row.category))
+        with_category = features(row.description, row.category)
+        if row.closed or row.prioritised:
+            samples['priority'].append((with_category, row.priority or 'Low'))
+        if row.closed or row.tagged:
+            samples['tags'].append((with_category, set(parse_tags(row.tags))))
+
+    heads = {}
+    for name in ('category', 'priority'):
+        labels = sorted({target for _, target in samples[name]})
+        if len(labels) >= 2:
+            heads[name] = LinearHead(labels).fit(samples[name], epochs)
+    tag_counts = {}
+    for _, tags in samples['tags']:
+        for tag in tags:
+            tag_counts[tag] = tag_counts.get(tag, 0) + 1
+    tag_labels = sorted(tag for tag, count in tag_counts.items() if count >= MIN_TAG_EXAMPLES)
+    if tag_labels:
+        heads['tags'] = LinearHead(tag_labels, multilabel=True).fit(samples['tags'], epochs)
+
+    return TriageModel(
+        heads, datetime.utcnow().isoformat(timespec='seconds'),
+        {name: len(rows) for name, rows in samples.items()}
+    )
+
+
+# --------------------------
+# Suggestions
+# --------------------------
+def describe_suggestion(suggestion):
+    """(short value, confidences) for the TRIAGE_SUGGESTED log entry."""
+    parts, confidences = [], []
+    for name in ('category', 'priority'):
+        if name in suggestion:
+            label, confidence = suggestion[name]
+            parts.append(label)
+            confidences.append(f'{name} {label} {confidence:.0%}')
+    tags = suggestion.get('tags', [])
+    parts.append(','.join(tag for tag, _ in tags) or 'no tags')
+    confidences.extend(f'tag {tag} {confidence:.0%}' for tag, confidence in tags)
+    return ' · '.join(parts)[:255], ', '.join(confidences)
+
+def triage_complaint(complaint, apply=None, model=None, previous=None):
+    """
+    Suggest category, priority and tags for a complaint and log them as
+    TRIAGE_SUGGESTED (unless the suggestion equals `previous`, the last one
+    logged). With TRIAGE_AUTO_APPLY (or apply=True), priority and tags
+    above TRIAGE_MIN_CONFIDENCE replace the defaults unless an admin
+    already set them. The reporter's category is never changed. The caller
+    commits.
+    :return: the suggestion, or None without a trained model
+    """
+    model = model or get_triage_model()
+    if model is None:
+        return None
+    suggestion = model.suggest(complaint.description, complaint.category)
+    value, confidences = describe_suggestion(suggestion)
+    if value != previous:
+        db.session.add(ComplaintLog(
+            complaint_id=complaint.id,
+            admin_id=None,
+            action='TRIAGE_SUGGESTED',
+            new_value=value,
+            description=f'Suggested ({confidences})' if confidences else 'Suggested'
+        ))
+
+    if apply is None:
+        apply = current_app.config.get('TRIAGE_AUTO_APPLY', False)
+    if not apply:
+        return suggestion
+    threshold = current_app.config.get('TRIAGE_MIN_CONFIDENCE', 0.7)
+    admin_set = {
+        action for (action,) in db.session.query(ComplaintLog.action).filter(
+            ComplaintLog.complaint_id == complaint.id,
+            ComplaintLog.action.in_(('PRIORITY_CHANGED', 'TAG_CHANGED')),
+            ComplaintLog.admin_id.isnot(None)
+        ).distinct()
+    }
+
+    priority, confidence = suggestion.get('priority', (None, 0))
+    if priority and confidence >= threshold and priority != complaint.priority \
+            and 'PRIORITY_CHANGED' not in admin_set:
+        db.session.add(ComplaintLog(
+            complaint_id=complaint.id, admin_id=None, action='PRIORITY_CHANGED',
+            old_value=complaint.priority, new_value=priority,
+            description=f'Auto-triage ({confidence:.0%} confident)'
+        ))
+        complaint.priority = priority
+    tags = ','.join(tag for tag, p in suggestion.get('tags', []) if p >= threshold)
+    if tags and tags != complaint.tags and 'TAG_CHANGED' not in admin_set:
+        db.session.add(ComplaintLog(
+            complaint_id=complaint.id, admin_id=None, action='TAG_CHANGED',
+            old_value=complaint.tags, new_value=tags, description='Auto-triage'
+        ))
+        complaint.tags = tags
+    return suggestion
+
+def _last_suggestions(complaint_ids):
+    """{complaint id: value of its latest TRIAGE_SUGGESTED log}, in one query."""
+    latest = db.session.query(func.max(ComplaintLog.id)).filter(
+        ComplaintLog.complaint_id.in_(complaint_ids), ComplaintLog.action == 'TRIAGE_SUGGESTED'
+    ).group_by(ComplaintLog.complaint_id)
+    rows = db.session.query(ComplaintLog.complaint_id, ComplaintLog.new_value)\
+        .filter(ComplaintLog.id.in_(latest.scalar_subquery()))
+    return dict(rows.all())
+
+def rescore_open_complaints(apply=False, batch_size=200):
+    """
+    Re-run triage over open complaints with the current model, one
+    transaction per batch. Unchanged suggestions are not logged again.
+    :return: number of complaints scored, or None without a trained model
+    """
+    model = get_triage_model()
+    if model is None:
+        return None
+    scored, last_id = 0, 0
+    while True:
+        batch = Complaint.query.filter(
+            Complaint.status.in_(('Pending', 'In Progress')), Complaint.id > last_id
+        ).order_by(Complaint.id).limit(batch_size).all()
+        if not batch:
+            return scored
+        previous = _last_suggestions([complaint.id for complaint in batch])
+        try:
+            for complaint in batch:
+                triage_complaint(complaint, apply=apply, model=model, previous=previous.get(complaint.id))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error re-scoring complaints after id {last_id}: {e}")
+            raise
+        scored += len(batch)
+        last_id = batch[-1].id
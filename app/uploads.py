@@ -0,0 +1,168 @@
+import hashlib
+import os
+import tempfile
+from flask import Request, current_app, has_app_context
+
+CHUNK_SIZE = 64 * 1024
+
+# Leading bytes expected for each allowed extension
+MAGIC_BYTES = {
+    'png': (b'\x89PNG\r\n\x1a\n',),
+    'jpg': (b'\xff\xd8\xff',),
+    'jpeg': (b'\xff\xd8\xff',),
+    'gif': (b'GIF87a', b'GIF89a'),
+    'pdf': (b'%PDF-',),
+    'doc': (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',),
+    'docx': (b'PK\x03\x04',),
+}
+MAGIC_LENGTH = 8
+
+
+def file_extension(filename):
+    return filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+
+
+# --------------------------
+# Streaming Upload File
+# --------------------------
+class HashingUploadFile:
+    """
+    Writable temp file used as the upload container for multipart parsing.
+
+    Bytes go straight to a temp file in the upload folder while a SHA-256 is
+    computed and the size, extension and leading magic bytes are checked as
+    they arrive. On the first failed check the remaining bytes are discarded
+    and the reason is kept in `error`, so memory stays constant and nothing
+    oversized reaches disk. commit() atomically renames the file into place;
+    an uncommitted file is removed when closed.
+    """
+
+    def __init__(self, filename=None, directory=None, max_size=None, allowed_extensions=None):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(prefix='.upload-', suffix='.part', dir=directory)
+        self._file = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self._head = b''
+        self.filename = filename
+        self.extension = file_extension(filename)
+        self.max_size = max_size
+        self.size = 0
+        self.error = None
+        self.committed = False
+
+        if allowed_extensions is not None and self.extension not in allowed_extensions:
+            self.error = f"File type .{self.extension} not allowed."
+
+    # Writer side (called by the multipart parser)
+    def write(self, data):
+        if self.error:
+            return len(data)
+
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            self._fail(f"File is larger than {self.max_size // (1024 * 1024)} MB.")
+            return len(data)
+
+        if len(self._head) < MAGIC_LENGTH:
+            self._head += data[:MAGIC_LENGTH - len(self._head)]
+            self._check_magic(final=False)
+            if self.error:
+                return len(data)
+
+        self._hash.update(data)
+        self._file.write(data)
+        return len(data)
+
+    def _check_magic(self, final):
+        signatures = MAGIC_BYTES.get(self.extension)
+        if signatures:
+            # Wait for enough bytes unless the upload has ended
+            if not final and len(self._head) < max(len(s) for s in signatures):
+                return
+            if not any(self._head.startswith(s) for s in signatures):
+                self._fail(f"File content does not match its .{self.extension} extension.")
+        elif self.extension == 'txt' and b'\x00' in self._head:
+            self._fail("Text attachment contains binary data.")
+
+    def _fail(self, message):
+        self.error = message
+        self._file.truncate(0)
+
+    # Reader side (FileStorage / Werkzeug expect a file-like object)
+    def seek(self, offset, whence=0):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def readline(self, size=-1):
+        return self._file.readline(size)
+
+    def flush(self):
+        self._file.flush()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    def finish(self):
+        """Run end-of-upload checks; raise ValueError if the upload is rejected."""
+        if not self.error and self.size:
+            self._check_magic(final=True)
+        if self.error:
+            raise ValueError(self.error)
+
+    def commit(self, destination):
+        """Atomically move the finished upload to destination."""
+        self.finish()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp_path, destination)
+        self.committed = True
+        return destination
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        if not self.committed and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    @classmethod
+    def from_stream(cls, stream, **kwargs):
+        """Copy an already-parsed stream through the same checks."""
+        upload = cls(**kwargs)
+        stream.seek(0)
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            upload.write(chunk)
+        return upload
+
+
+# --------------------------
+# Request Class
+# --------------------------
+class StreamingUploadRequest(Request):
+    """Request whose file uploads are parsed straight into HashingUploadFile."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if not filename or not has_app_context():
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+        config = current_app.config
+        return HashingUploadFile(
+            filename=filename,
+            directory=config['UPLOAD_FOLDER'],
+            max_size=config['MAX_ATTACHMENT_SIZE'],
+            allowed_extensions=config['ALLOWED_EXTENSIONS']
+        )
@@ -3,7 +3,9 @@ from werkzeug.utils import secure_filename
 from flask import current_app
 from werkzeug.security import generate_password_hash, check_password_hash
 from .extensions import db
-from .models import Complaint
+from .models import ArchivedComplaint, Complaint
+from .attachments import store_upload
+from .uploads import HashingUploadFile
 
 # --------------------------
 # Password Hashing
@@ -33,13 +35,15 @@ def verify_superadmin(email: str, password: str) -> bool:
 def generate_complaint_id() -> str:
     """
     Generates a sequential complaint ID: CMP2025-0001, CMP2025-0002, etc.
+    The latest ID may live in either the hot table or cold storage (the
+    newest complaints can be archived before older ones), so both count.
     """
-    last_complaint = Complaint.query.order_by(Complaint.id.desc()).first()
-    if last_complaint:
-        last_number = int(last_complaint.complaint_id.split('-')[-1])
-        new_number = last_number + 1
-    else:
-        new_number = 1
+    latest = [
+        Complaint.query.with_entities(Complaint.complaint_id).order_by(Complaint.id.desc()).first(),
+        ArchivedComplaint.query.with_entities(ArchivedComplaint.complaint_id)
+        .order_by(ArchivedComplaint.original_id.desc()).first()
+    ]
+    new_number = max([int(row.complaint_id.split('-')[-1]) for row in latest if row] + [0]) + 1
 
     complaint_id = f"CMP2025-{new_number:04d}"
     return complaint_id
@@ -47,12 +51,15 @@ def generate_complaint_id() -> str:
 # --------------------------
 # Save Attachment
 # --------------------------
-def save_attachment(file, complaint_id: str):
+def save_attachment(file):
     """
-    Saves the uploaded attachment locally under /uploads
+    Saves the uploaded attachment in the content-addressed store under /uploads
+    The upload is streamed to a temp file in the upload folder (hashed and
+    checked for size, extension and magic bytes as it arrives) and then
+    moved to uploads/ab/cd/<sha256>, or dropped if that content is already stored.
     :param file: FileStorage object
-    :param complaint_id: string
-    :return: relative file path or None
+    :return: (Attachment, filename) or None
+    :raises ValueError: if the file is rejected
     """
     if not file:
         return None
@@ -67,9 +74,15 @@ def save_attachment(file, complaint_id: str):
     if not os.path.exists(upload_folder):
         os.makedirs(upload_folder)
 
-    # Save file with complaint ID prefix
-    saved_filename = f"{complaint_id}_{filename}"
-    file_path = os.path.join(upload_folder, saved_filename)
-    file.save(file_path)
+    upload = file.stream
+    if not isinstance(upload, HashingUploadFile):
+        # Parsed outside StreamingUploadRequest (e.g. tests): copy through the same checks
+        upload = HashingUploadFile.from_stream(
+            file.stream,
+            filename=filename,
+            directory=upload_folder,
+            max_size=current_app.config['MAX_ATTACHMENT_SIZE'],
+            allowed_extensions=current_app.config['ALLOWED_EXTENSIONS']
+        )
 
-    return saved_filename
+    return store_upload(upload), filename
@@ -0,0 +1,10 @@
+"""
+Reproducible benchmarks for TechResolve.
+
+    python -m benchmarks.run --scale 1k
+    python -m benchmarks.run --scale 100k --database-url postgresql://... --save baseline.json
+    python -m benchmarks.run --scale 100k --compare baseline.json
+
+See benchmarks/datagen.py for the synthetic data model and
+benchmarks/scenarios.py for the measured requests.
+"""
@@ -0,0 +1,161 @@
+"""
+Seeded synthetic data generator.
+
+Produces labs, admins, complaints and activity logs with roughly the shape
+seen in production: most complaints end Resolved, resolution times are
+long-tailed, weekdays are busier than weekends and every complaint carries a
+handful of log rows (views dominate).
+"""
+import math
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.models import Admin, Complaint, ComplaintLog, Lab
+
+SCALES = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+LAB_NAMES = ['CC Lab', 'ISL', 'Technosphere', 'IBM Lab', 'Networks Lab', 'IoT Lab', 'AI Lab', 'Project Lab']
+CATEGORIES = [('Hardware', 0.45), ('Software', 0.30), ('Network', 0.18), ('Other', 0.07)]
+STATUSES = [('Resolved', 0.55), ('Pending', 0.20), ('In Progress', 0.15), ('Terminated', 0.10)]
+PRIORITIES = [('Low', 0.50), ('Medium', 0.35), ('High', 0.15)]
+TAGS = ['none', 'none', 'none', 'monitor', 'keyboard', 'network,urgent', 'printer', 'software,license']
+DESCRIPTIONS = [
+    'System {n} in row {r} does not boot after power cut.',
+    'Monitor on system {n} flickers and goes blank intermittently.',
+    'Unable to connect to the internet from system {n}.',
+    'Licensed software fails to open on system {n} with activation error.',
+    'Keyboard keys not responding on system {n}, row {r}.',
+    'Projector in the lab is not detecting the HDMI input.',
+]
+
+CHUNK_SIZE = 5_000
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights, k=1)[0]
+
+
+def _created_at(rng, now, span_days):
+    """Random timestamp within span_days before now, biased to weekday working hours."""
+    while True:
+        moment = now - timedelta(seconds=rng.random() * span_days * 86400)
+        if moment.weekday() >= 5 and rng.random() < 0.7:
+            continue
+        hour = min(max(int(rng.gauss(13, 3)), 8), 19)
+        return moment.replace(hour=hour, minute=rng.randrange(60), second=rng.randrange(60), microsecond=0)
+
+
+def _resolution_hours(rng):
+    """Log-normal resolution time: median ~6h with a long tail of multi-day tickets."""
+    return math.exp(rng.gauss(math.log(6), 1.4))
+
+
+def generate(complaints: int, seed: int = 42, labs: int = None, admins: int = None,
+             span_days: int = 730, now: datetime = None):
+    """
+    Populate the current database with synthetic data. Must be called inside
+    an application context with empty tables.
+    :return: dict of row counts inserted
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2025, 11, 1)
+    labs = labs or min(len(LAB_NAMES), max(4, complaints // 25_000 + 4))
+    admins = admins or max(5, min(50, complaints // 2_000 + 5))
+
+    lab_rows = [Lab(name=LAB_NAMES[i] if i < len(LAB_NAMES) else f'Lab {i + 1}') for i in range(labs)]
+    admin_rows = [
+        Admin(name=f'Bench Admin {i + 1}', email=f'bench.admin{i + 1}@example.com', password_hash='x')
+        for i in range(admins)
+    ]
+    db.session.add_all(lab_rows + admin_rows)
+    db.session.commit()
+
+    lab_ids = [lab.id for lab in lab_rows]
+    lab_weights = [1.0 / (i + 1) for i in range(labs)]  # a few busy labs, a long tail
+    admin_ids = [admin.id for admin in admin_rows]
+
+    complaint_batch = []
+    log_batch = []
+    log_count = 0
+    next_id = (db.session.query(db.func.max(Complaint.id)).scalar() or 0) + 1
+
+    for n in range(complaints):
+        created = _created_at(rng, now, span_days)
+        status = _weighted(rng, STATUSES)
+        assigned = rng.choice(admin_ids) if status != 'Pending' or rng.random() < 0.2 else None
+
+        if status in ('Resolved', 'Terminated'):
+            updated = min(created + timedelta(hours=_resolution_hours(rng)), now)
+        else:
+            updated = created + timedelta(hours=rng.random() * 12)
+
+        complaint_pk = next_id + n
+        complaint_batch.append({
+            'id': complaint_pk,
+            'complaint_id': f'CMP2025-{complaint_pk:04d}',
+            'email': f'student{rng.randrange(complaints // 3 + 1)}@example.com',
+            'name': f'Student {rng.randrange(10_000)}',
+            'lab_id': rng.choices(lab_ids, weights=lab_weights, k=1)[0],
+            'assigned_admin_id': assigned,
+            'category': _weighted(rng, CATEGORIES),
+            'description': rng.choice(DESCRIPTIONS).format(n=rng.randrange(1, 61), r=rng.randrange(1, 9)),
+            'status': status,
+            'priority': _weighted(rng, PRIORITIES),
+            'tags': rng.choice(TAGS),
+            'archived': status in ('Resolved', 'Terminated') and (now - updated).days > 30,
+            'created_at': created,
+            'updated_at': updated
+        })
+
+        # Initial tag log, assignment, status change and a tail of views
+        logs = [('TAG_CHANGED', None, None, created)]
+        if assigned:
+            assign_at = created + (updated - created) * rng.random() * 0.3
+            logs.append(('ADMIN_ASSIGNED', rng.choice(admin_ids), assigned, assign_at))
+        if status != 'Pending':
+            logs.append(('STATUS_CHANGED', assigned or rng.choice(admin_ids), None, updated))
+        for _ in range(int(rng.expovariate(1 / 3))):
+            view_at = created + (updated - created) * rng.random()
+            logs.append(('ISSUE_VIEWED', rng.choice(admin_ids), None, view_at))
+
+        for action, admin_id, target_id, ts in logs:
+            log_batch.append({
+                'complaint_id': complaint_pk,
+                'admin_id': admin_id,
+                'target_admin_id': target_id,
+                'action': action,
+                'old_value': 'Pending' if action == 'STATUS_CHANGED' else None,
+                'new_value': status if action == 'STATUS_CHANGED' else None,
+                'view_duration': rng.randrange(5, 600) if action == 'ISSUE_VIEWED' else None,
+                'timestamp': ts
+            })
+
+        if len(complaint_batch) >= CHUNK_SIZE:
+            log_count += _flush(complaint_batch, log_batch)
+
+    log_count += _flush(complaint_batch, log_batch)
+
+    if db.engine.dialect.name == 'postgresql':
+        # Explicit ids were inserted; move the sequence past them
+        db.session.execute(db.text(
+            "SELECT setval(pg_get_serial_sequence('complaints', 'id'), (SELECT MAX(id) FROM complaints))"
+        ))
+        db.session.commit()
+
+    return {'labs': labs, 'admins': admins, 'complaints': complaints, 'logs': log_count}
+
+
+def _flush(complaint_batch, log_batch):
+    if not complaint_batch:
+        return 0
+    db.session.execute(insert(Complaint), complaint_batch)
+    db.session.execute(insert(ComplaintLog), log_batch)
+    db.session.commit()
+    count = len(log_batch)
+    complaint_batch.clear()
+    log_batch.clear()
+    return count
@@ -0,0 +1,180 @@
+"""
+Local stand-ins for the outbound services the app talks to, so load tests
+never hit smtp.gmail.com or real Discord webhooks.
+
+FakeSMTPServer speaks just enough SMTP for Flask-Mail (no STARTTLS/AUTH).
+FakeDiscordServer accepts webhook POSTs and can add latency and answer 429
+like Discord's rate limiter.
+"""
+import json
+import random
+import socketserver
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Counters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.values = {}
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.values)
+
+
+# --------------------------
+# Fake SMTP
+# --------------------------
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write((line + '\r\n').encode())
+
+    def handle(self):
+        server = self.server
+        self._reply('220 fake-smtp ready')
+        in_data = False
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode(errors='replace').rstrip('\r\n')
+
+            if in_data:
+                if line == '.':
+                    in_data = False
+                    if server.latency:
+                        time.sleep(server.latency)
+                    server.counters.incr('messages')
+                    self._reply('250 OK queued')
+                continue
+
+            command = line[:4].upper()
+            if command in ('EHLO', 'HELO'):
+                self._reply('250-fake-smtp' if command == 'EHLO' else '250 fake-smtp')
+                if command == 'EHLO':
+                    self._reply('250 SIZE 10485760')
+            elif command in ('MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self._reply('250 OK')
+            elif command == 'DATA':
+                in_data = True
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Command not implemented')
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0):
+        super().__init__((host, port), _SMTPHandler)
+        self.latency = latency
+        self.counters = _Counters()
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+# --------------------------
+# Fake Discord webhook
+# --------------------------
+class _DiscordHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        if server.latency:
+            time.sleep(server.latency)
+
+        retry_after = server.check_rate_limit()
+        if retry_after is not None:
+            server.counters.incr('rate_limited')
+            body = json.dumps({'message': 'You are being rate limited.', 'retry_after': retry_after, 'global': False})
+            self.send_response(429)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Retry-After', f'{retry_after:.3f}')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body.encode())
+            return
+
+        server.counters.incr('accepted')
+        self.send_response(204)
+        self.end_headers()
+
+
+class FakeDiscordServer(ThreadingHTTPServer):
+    """
+    :param latency: seconds to wait before answering each request
+    :param rate_limit: max accepted requests per rate_window seconds (None = unlimited)
+    :param error_rate: fraction of requests answered 429 at random
+    """
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, rate_limit=None, rate_window=2.0,
+                 error_rate=0.0, seed=0):
+        super().__init__((host, port), _DiscordHandler)
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.error_rate = error_rate
+        self.counters = _Counters()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._accepted = deque()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f'http://{self.server_address[0]}:{self.server_address[1]}'
+
+    def webhook_url(self, name):
+        return f'{self.url}/api/webhooks/{name}'
+
+    def check_rate_limit(self):
+        """Return seconds to wait if this request should get a 429, else None."""
+        with self._lock:
+            now = time.monotonic()
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return self.rate_window
+            if self.rate_limit is None:
+                return None
+            while self._accepted and now - self._accepted[0] > self.rate_window:
+                self._accepted.popleft()
+            if len(self._accepted) >= self.rate_limit:
+                return self.rate_window - (now - self._accepted[0])
+            self._accepted.append(now)
+            return None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,202 @@
+"""
+Load generator for sizing the waitress deployment.
+
+Starts the app under waitress (threads = --server-threads) with SMTP and
+Discord pointed at local fakes, then drives a weighted mix of submit, track
+and admin-update traffic from --concurrency client threads for --duration
+seconds and reports throughput, p50/p99 latency and error rate per route.
+
+    python -m benchmarks.load --concurrency 16 --duration 30
+    python -m benchmarks.load --database-url postgresql://... --discord-latency 0.3 --discord-rate-limit 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models import Admin, Complaint, Lab
+from app.utils import hash_password
+from benchmarks.datagen import SCALES, generate
+from benchmarks.fakes import FakeDiscordServer, FakeSMTPServer
+from benchmarks.run import percentile
+
+LOAD_ADMIN_EMAIL = 'load.admin@example.com'
+LOAD_ADMIN_PASSWORD = 'load-test-password'
+MIX = {'submit': 0.2, 'track': 0.6, 'admin_update': 0.2}
+STATUSES = ['Pending', 'In Progress', 'Resolved']
+
+
+def make_config(database_url, smtp_port):
+    class LoadConfig(Config):
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = database_url
+        MAIL_SERVER = '127.0.0.1'
+        MAIL_PORT = smtp_port
+        MAIL_USE_TLS = False
+        MAIL_USE_SSL = False
+        MAIL_USERNAME = None
+        MAIL_PASSWORD = None
+        MAIL_DEFAULT_SENDER = 'techresolve@example.com'
+        METRICS_SERVER_TIMING = False
+    return LoadConfig
+
+
+def prepare(app, complaints, seed, discord):
+    """Seed data if needed, create the load admin and point lab webhooks at the fake."""
+    with app.app_context():
+        if not Complaint.query.first():
+            generate(complaints, seed=seed)
+        if not Admin.query.filter_by(email=LOAD_ADMIN_EMAIL).first():
+            db.session.add(Admin(
+                name='Load Admin', email=LOAD_ADMIN_EMAIL,
+                password_hash=hash_password(LOAD_ADMIN_PASSWORD)
+            ))
+            db.session.commit()
+
+        for lab in Lab.query.all():
+            os.environ[f"DISCORD_{lab.name.upper().replace(' ', '_')}_WEBHOOK"] = discord.webhook_url(lab.id)
+
+        sample = Complaint.query.with_entities(Complaint.id, Complaint.complaint_id, Complaint.email)\
+            .order_by(Complaint.id.desc()).limit(1000).all()
+        return {
+            'lab_ids': [lab.id for lab in Lab.query.all()],
+            'ids': [row.id for row in sample],
+            'complaint_ids': [row.complaint_id for row in sample],
+            'emails': [row.email for row in sample],
+        }
+
+
+def start_server(app, port, threads):
+    """Serve the app with waitress in a background thread."""
+    from waitress import create_server
+
+    server = create_server(app, host='127.0.0.1', port=port, threads=threads)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    return server, f'http://127.0.0.1:{server.effective_port}'
+
+
+class Results:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {route: [] for route in MIX}
+        self.errors = {route: 0 for route in MIX}
+
+    def record(self, route, latency, ok):
+        with self._lock:
+            self.latencies[route].append(latency)
+            if not ok:
+                self.errors[route] += 1
+
+
+def worker(base_url, ctx, deadline, results, seed):
+    rng = random.Random(seed)
+    user = requests.Session()
+    admin = requests.Session()
+    admin.post(f'{base_url}/admin/login', data={'email': LOAD_ADMIN_EMAIL, 'password': LOAD_ADMIN_PASSWORD})
+    routes, weights = zip(*MIX.items())
+
+    while time.monotonic() < deadline:
+        route = rng.choices(routes, weights=weights, k=1)[0]
+        start = time.perf_counter()
+        try:
+            if route == 'submit':
+                response = user.post(f'{base_url}/user/submit', data={
+                    'email': f'load{rng.randrange(100_000)}@example.com',
+                    'name': 'Load User',
+                    'lab': rng.choice(ctx['lab_ids']),
+                    'category': 'Hardware',
+                    'description': 'Load test complaint: system does not boot.'
+                })
+            elif route == 'track':
+                if rng.random() < 0.5:
+                    data = {'complaint_id': rng.choice(ctx['complaint_ids'])}
+                else:
+                    data = {'email': rng.choice(ctx['emails'])}
+                response = user.post(f'{base_url}/user/track', data=data)
+            else:
+                response = admin.post(f"{base_url}/admin/api/complaint/{rng.choice(ctx['ids'])}", data={
+                    'status': rng.choice(STATUSES),
+                    'priority': rng.choice(['Low', 'Medium', 'High']),
+                    'tags': 'none',
+                    'remarks': 'load test'
+                })
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        results.record(route, (time.perf_counter() - start) * 1000, ok)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='TechResolve load generator')
+    parser.add_argument('--database-url', help='Database to use (default: fresh SQLite file; use PostgreSQL for realistic numbers)')
+    parser.add_argument('--scale', default='1k', help='Complaints to seed if the database is empty')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--concurrency', type=int, default=8, help='Client threads')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds of load')
+    parser.add_argument('--server-threads', type=int, default=4, help='waitress worker threads')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--smtp-latency', type=float, default=0.05, help='Seconds per accepted email')
+    parser.add_argument('--discord-latency', type=float, default=0.1, help='Seconds per webhook call')
+    parser.add_argument('--discord-rate-limit', type=int, default=None, help='Webhook calls allowed per 2s window before 429')
+    parser.add_argument('--discord-error-rate', type=float, default=0.0, help='Fraction of webhook calls answered 429')
+    args = parser.parse_args(argv)
+
+    smtp = FakeSMTPServer(latency=args.smtp_latency).start()
+    discord = FakeDiscordServer(
+        latency=args.discord_latency, rate_limit=args.discord_rate_limit,
+        error_rate=args.discord_error_rate, seed=args.seed
+    ).start()
+
+    database_url = args.database_url or 'sqlite:///' + os.path.join(
+        tempfile.mkdtemp(prefix='techresolve-load-'), 'load.db'
+    )
+    app = create_app(make_config(database_url, smtp.port))
+    ctx = prepare(app, SCALES.get(args.scale.lower()) or int(args.scale), args.seed, discord)
+    _server, base_url = start_server(app, args.port, args.server_threads)
+
+    print(f"🚀 {args.concurrency} clients -> {base_url} (waitress threads={args.server_threads}) for {args.duration:.0f}s")
+    results = Results()
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(base_url, ctx, deadline, results, args.seed + i), daemon=True)
+        for i in range(args.concurrency)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    # The waitress thread is a daemon and exits with the process; closing it
+    # here would race with responses still being flushed
+
+    print(f"\n{'route':<14}{'requests':>10}{'req/s':>9}{'p50 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    total = 0
+    for route, latencies in results.latencies.items():
+        count = len(latencies)
+        total += count
+        error_rate = results.errors[route] / count * 100 if count else 0
+        print(f"{route:<14}{count:>10}{count / elapsed:>9.1f}"
+              f"{percentile(latencies, 50):>10.1f}{percentile(latencies, 99):>10.1f}{error_rate:>8.1f}%")
+    print(f"{'total':<14}{total:>10}{total / elapsed:>9.1f}")
+
+    print(f"\n📧 SMTP: {smtp.counters.snapshot()}")
+    print(f"💬 Discord: {discord.counters.snapshot()}")
+    smtp.stop()
+    discord.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
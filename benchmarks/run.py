@@ -0,0 +1,161 @@
+"""
+Benchmark runner.
+
+Seeds a database (unless it already holds data), replays each scenario
+through the Flask test client and reports latency percentiles and SQL
+statement counts. --save writes the results as a JSON baseline and
+--compare fails (exit code 1) when a later run regresses against one.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models import Admin, Complaint
+from app.nplusone import QueryRecorder
+from benchmarks.datagen import SCALES, generate
+from benchmarks.scenarios import SCENARIOS, build_context
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def make_config(database_url):
+    class BenchConfig(Config):
+        TESTING = True
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = database_url
+        MAIL_SUPPRESS_SEND = True
+        METRICS_SERVER_TIMING = False
+        NPLUSONE_MODE = 'off'
+    return BenchConfig
+
+
+def run_scenario(app, name, iterations, warmup, ctx, seed):
+    func, role = SCENARIOS[name]
+    rng = random.Random(seed)
+    client = app.test_client()
+    if role == 'admin':
+        admin = Admin.query.first()
+        with client.session_transaction() as sess:
+            sess['admin_logged_in'] = True
+            sess['admin_id'] = admin.id
+            sess['admin_email'] = admin.email
+
+    for _ in range(warmup):
+        func(client, rng, ctx)
+
+    latencies = []
+    queries = []
+    errors = 0
+    for _ in range(iterations):
+        with QueryRecorder(db.engine) as recorder:
+            start = time.perf_counter()
+            response = func(client, rng, ctx)
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(recorder.count)
+        if response.status_code >= 400:
+            errors += 1
+
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p90_ms': round(percentile(latencies, 90), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(max(latencies), 2),
+        'queries': max(queries)
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of human-readable regressions against a baseline."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+        if current['p50_ms'] > previous['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {previous['p50_ms']}ms -> {current['p50_ms']}ms")
+        if current['p99_ms'] > previous['p99_ms'] * (1 + tolerance * 2):
+            regressions.append(f"{name}: p99 {previous['p99_ms']}ms -> {current['p99_ms']}ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='TechResolve benchmark suite')
+    parser.add_argument('--scale', default='1k', help=f"Complaint count: {', '.join(SCALES)} or an integer")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', help='Database to seed/benchmark (default: fresh SQLite file)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated scenario names')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--save', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed p50 slowdown (fraction)')
+    args = parser.parse_args(argv)
+
+    complaints = SCALES.get(args.scale.lower()) or int(args.scale)
+    database_url = args.database_url or 'sqlite:///' + os.path.join(
+        tempfile.mkdtemp(prefix='techresolve-bench-'), 'bench.db'
+    )
+
+    app = create_app(make_config(database_url))
+    with app.app_context():
+        if not Complaint.query.first():
+            start = time.perf_counter()
+            counts = generate(complaints, seed=args.seed)
+            print(f"🌱 Seeded {counts} in {time.perf_counter() - start:.1f}s")
+
+        ctx = build_context(random.Random(args.seed))
+        results = {}
+        print(f"\n{'scenario':<18}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'queries':>9}{'errors':>8}")
+        for name in [s.strip() for s in args.scenarios.split(',') if s.strip()]:
+            if name not in SCENARIOS:
+                parser.error(f"Unknown scenario '{name}'")
+            r = results[name] = run_scenario(app, name, args.iterations, args.warmup, ctx, args.seed)
+            print(f"{name:<18}{r['p50_ms']:>10}{r['p90_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>10}{r['queries']:>9}{r['errors']:>8}")
+
+    report = {
+        'scale': complaints,
+        'seed': args.seed,
+        'dialect': database_url.split(':', 1)[0],
+        'results': results
+    }
+    if args.save:
+        with open(args.save, 'w') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\n💾 Saved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(results, json.load(fh), args.tolerance)
+        if regressions:
+            print("\n❌ Regressions:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print("\n✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Benchmark scenarios: one function per measured request.
+
+Each scenario receives a logged-in admin test client (or an anonymous
+client for user pages) plus a seeded random generator, and returns the
+response so the runner can check the status code.
+"""
+from app.models import Complaint, Lab
+
+
+def api_dashboard(client, rng, ctx):
+    return client.get('/admin/api/dashboard')
+
+
+def api_complaints(client, rng, ctx):
+    return client.get('/admin/api/complaints')
+
+
+def reports(client, rng, ctx):
+    return client.get('/admin/reports')
+
+
+def api_logs(client, rng, ctx):
+    # First page, then one page deeper using the returned cursor
+    response = client.get('/admin/api/logs?per_page=50')
+    cursor = response.get_json()['pagination'].get('next_cursor')
+    if cursor:
+        response = client.get(f'/admin/api/logs?per_page=50&cursor={cursor}')
+    return response
+
+
+def submit_complaint(client, rng, ctx):
+    return client.post('/user/submit', data={
+        'email': f'bench{rng.randrange(1_000_000)}@example.com',
+        'name': 'Benchmark User',
+        'lab': rng.choice(ctx['lab_ids']),
+        'category': 'Hardware',
+        'description': 'Benchmark complaint: system does not boot.'
+    })
+
+
+def track_complaint(client, rng, ctx):
+    if rng.random() < 0.5:
+        return client.post('/user/track', data={'complaint_id': rng.choice(ctx['complaint_ids'])})
+    return client.post('/user/track', data={'email': rng.choice(ctx['emails'])})
+
+
+SCENARIOS = {
+    'api_dashboard': (api_dashboard, 'admin'),
+    'api_complaints': (api_complaints, 'admin'),
+    'reports': (reports, 'admin'),
+    'api_logs': (api_logs, 'admin'),
+    'submit_complaint': (submit_complaint, 'user'),
+    'track_complaint': (track_complaint, 'user'),
+}
+
+
+def build_context(rng, sample=500):
+    """Collect ids the user scenarios pick from (a bounded random sample)."""
+    total = Complaint.query.count()
+    sample_rows = Complaint.query.with_entities(Complaint.complaint_id, Complaint.email)\
+        .offset(rng.randrange(max(total - sample, 1))).limit(sample).all()
+    return {
+        'lab_ids': [lab.id for lab in Lab.query.all()],
+        'complaint_ids': [row.complaint_id for row in sample_rows],
+        'emails': [row.email for row in sample_rows],
+    }
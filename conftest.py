@@ -0,0 +1,75 @@
+"""
+Shared pytest fixtures.
+The `app` fixture runs against an in-memory SQLite database, so tests using
+it never touch the configured PostgreSQL database, SMTP or Discord.
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models import Admin
+from app.nplusone import QueryRecorder
+
+
+class TestConfig(Config):
+    TESTING = True
+    DEBUG = False
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    MAIL_SUPPRESS_SEND = True
+    NPLUSONE_MODE = 'raise'
+    THUMBNAILS_ENABLED = False  # worker threads cannot see the in-memory database
+    TRIAGE_MODEL_PATH = ''  # no suggestions unless a test trains a model
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def admin_client(app):
+    """Test client logged in as an admin."""
+    admin = Admin(name='Test Admin', email='admin@test.local', password_hash='x')
+    db.session.add(admin)
+    db.session.commit()
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['admin_logged_in'] = True
+        sess['admin_id'] = admin.id
+        sess['admin_name'] = admin.name
+        sess['admin_email'] = admin.email
+    return client
+
+
+@pytest.fixture
+def upload_dir(app, tmp_path):
+    """A temporary UPLOAD_FOLDER for the attachment store."""
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def query_budget(app):
+    """
+    Assert that a block executes at most max_queries SQL statements:
+
+        with query_budget(3):
+            admin_client.get('/admin/api/complaints')
+    """
+    @contextmanager
+    def budget(max_queries):
+        with QueryRecorder(db.engine) as recorder:
+            yield recorder
+        assert recorder.count <= max_queries, (
+            f"Query budget exceeded ({recorder.count} > {max_queries})\n{recorder.report()}"
+        )
+
+    return budget
@@ -0,0 +1,65 @@
+"""
+Cold storage: long-archived complaints leave the hot tables with their
+logs, and stay readable from the user and admin pages.
+"""
+from datetime import datetime, timedelta
+from app.archive import archive_stale_complaints, find_archived_complaint
+from app.extensions import db
+from app.models import Admin, ArchivedComplaint, Complaint, ComplaintLog, ComplaintTag, Lab
+from app.utils import generate_complaint_id
+
+
+def add_complaint(lab, number, archived, days_ago=0):
+    stamp = datetime.utcnow() - timedelta(days=days_ago)
+    complaint = Complaint(
+        complaint_id=f'CMP2025-{number:04d}', email='u@test.local', name='User', lab_id=lab.id,
+        category='Network', description=f'Wi-Fi down #{number}', status='Resolved', priority='High',
+        tags='network', archived=archived, created_at=stamp, updated_at=stamp
+    )
+    db.session.add(complaint)
+    db.session.flush()
+    return complaint
+
+
+def test_archive_round_trip(app, admin_client):
+    lab = Lab(name='Lab A')
+    db.session.add(lab)
+    db.session.flush()
+    admin = Admin.query.one()
+    fresh = add_complaint(lab, 1, archived=True)
+    stale = add_complaint(lab, 2, archived=True, days_ago=400)
+    db.session.add(ComplaintLog(
+        complaint_id=stale.id, admin_id=admin.id, action='STATUS_CHANGED', old_value='Pending',
+        new_value='Resolved', description='Router replaced', timestamp=stale.updated_at
+    ))
+    db.session.commit()
+    stale_id = stale.id
+
+    assert archive_stale_complaints(horizon_days=180) == 1
+    assert [c.complaint_id for c in Complaint.query] == [fresh.complaint_id]
+    assert ComplaintLog.query.filter_by(complaint_id=stale_id).count() == 0
+    assert ComplaintTag.query.filter_by(complaint_id=stale_id).count() == 0
+    assert ArchivedComplaint.query.one().original_id == stale_id
+
+    cold = find_archived_complaint(complaint_id='CMP2025-0002')
+    assert cold.cold_storage and cold.id == stale_id
+    assert (cold.lab.name, cold.status, cold.tags) == ('Lab A', 'Resolved', 'network')
+    assert [(log.action, log.admin.name) for log in cold.logs] == [('STATUS_CHANGED', 'Test Admin')]
+    assert find_archived_complaint(original_id=stale_id).complaint_id == 'CMP2025-0002'
+    assert find_archived_complaint(complaint_id='CMP2025-0001') is None
+
+    # The newest ID is in cold storage: numbering continues after it
+    assert generate_complaint_id() == 'CMP2025-0003'
+
+    client = app.test_client()
+    page = client.post('/user/track', data={'email': 'u@test.local'}).get_data(as_text=True)
+    assert 'CMP2025-0001' in page and 'CMP2025-0002' in page
+    response = client.get('/user/complaint/CMP2025-0002')
+    assert response.status_code == 200 and 'Wi-Fi down #2' in response.get_data(as_text=True)
+
+    response = admin_client.get(f'/admin/complaint/{stale_id}')
+    page = response.get_data(as_text=True)
+    assert response.status_code == 200 and 'CMP2025-0002' in page and 'Router replaced' in page
+    response = admin_client.post(f'/admin/complaint/{stale_id}', data={'status': 'Pending'})
+    assert response.status_code == 302
+    assert find_archived_complaint(original_id=stale_id).status == 'Resolved'
@@ -0,0 +1,96 @@
+"""
+Auto-assignment: picks follow the workload index, which tracks assignment
+and status changes as they are committed.
+"""
+from app.assignment import WorkloadIndex, auto_assign
+from app.extensions import db
+from app.models import Admin, Complaint, ComplaintLog, Lab
+
+
+def use_policy(app, policy):
+    app.config['AUTO_ASSIGN_POLICY'] = policy
+    index = WorkloadIndex(policy, app.config['AUTO_ASSIGN_WEIGHTS'])
+    app.extensions['workload_index'] = index
+    return index
+
+
+def setup():
+    lab = Lab(name='Lab A')
+    admins = [Admin(name=f'Admin {i}', email=f'admin{i}@test.local', password_hash='x') for i in range(3)]
+    db.session.add_all([lab, *admins])
+    db.session.commit()
+    return lab, admins
+
+
+def submit(lab, number, priority='Low'):
+    complaint = Complaint(
+        complaint_id=f'CMP2025-{number:04d}', email='u@test.local', name='User', lab_id=lab.id,
+        category='Hardware', description='x', status='Pending', priority=priority
+    )
+    db.session.add(complaint)
+    db.session.flush()
+    admin = auto_assign(complaint)
+    db.session.commit()
+    return complaint, admin
+
+
+def test_least_loaded_weighs_priority(app):
+    lab, admins = setup()
+    index = use_policy(app, 'least_loaded')
+    index.load()
+
+    _, first = submit(lab, 1, 'High')
+    picks = [submit(lab, n)[1].id for n in range(2, 6)]
+    # The admin holding the High complaint (weight 3) gets nothing until the others catch up
+    assert picks.count(first.id) == 0
+    assert sorted(picks) == sorted([a.id for a in admins if a.id != first.id] * 2)
+
+    log = ComplaintLog.query.filter_by(action='ADMIN_ASSIGNED').first()
+    assert log.admin_id is None and log.target_admin_id is not None
+
+    # Resolving frees the load
+    complaint = Complaint.query.filter_by(complaint_id='CMP2025-0001').one()
+    complaint.set_status('Resolved')
+    db.session.commit()
+    assert index.workload()[first.id] == {'High': 0}
+
+
+def test_round_robin_and_rollback(app):
+    lab, admins = setup()
+    index = use_policy(app, 'round_robin')
+    index.load()
+
+    picks = [submit(lab, n)[1].id for n in range(1, 7)]
+    assert picks == [a.id for a in admins] * 2
+
+    complaint = Complaint(
+        complaint_id='CMP2025-0099', email='u@test.local', name='User', lab_id=lab.id,
+        category='Hardware', description='x', status='Pending', priority='Low'
+    )
+    db.session.add(complaint)
+    db.session.flush()
+    admin = auto_assign(complaint)
+    db.session.rollback()
+    assert index.workload()[admin.id] == {'Low': 2}
+
+
+def test_restored_admin_keeps_their_load(app):
+    lab, admins = setup()
+    index = use_policy(app, 'least_loaded')
+    index.load()
+    busy = admins[0]
+    for n in (1, 2):
+        complaint, _ = submit(lab, n, 'High')
+        complaint.assign(busy)
+    db.session.commit()
+
+    busy.is_active = False
+    db.session.commit()
+    assert busy.id not in index.workload()
+
+    # Back with their two High complaints: not treated as idle
+    busy.is_active = True
+    db.session.commit()
+    picks = [submit(lab, n)[1].id for n in range(3, 7)]
+    assert index.workload()[busy.id] == {'High': 2}
+    assert busy.id not in picks
@@ -0,0 +1,79 @@
+"""
+Serving content-addressed attachments: conditional and Range requests,
+and the headers handed to nginx / Apache when they stream the bytes.
+"""
+import hashlib
+import os
+from urllib.parse import quote
+import pytest
+from app.attachments import store_key
+
+CONTENT = b'%PDF-1.4 ' + bytes(range(256)) * 4
+
+
+@pytest.fixture
+def stored(upload_dir):
+    """A blob in a temporary store; returns its sha256."""
+    sha256 = hashlib.sha256(CONTENT).hexdigest()
+    path = os.path.join(str(upload_dir), *store_key(sha256).split('/'))
+    os.makedirs(os.path.dirname(path))
+    with open(path, 'wb') as f:
+        f.write(CONTENT)
+    return sha256
+
+
+def url(sha256, name):
+    return f'/uploads/{store_key(sha256)}/{quote(name)}'
+
+
+def test_range_and_revalidation(app, stored):
+    client = app.test_client()
+    response = client.get(url(stored, 'report.pdf'))
+    assert response.status_code == 200 and response.data == CONTENT
+    assert response.mimetype == 'application/pdf'
+    assert response.headers['ETag'] == f'"{stored}"'
+    assert 'immutable' in response.headers['Cache-Control']
+
+    response = client.get(url(stored, 'report.pdf'), headers={'Range': 'bytes=10-19'})
+    assert response.status_code == 206 and response.data == CONTENT[10:20]
+    assert response.headers['Content-Range'] == f'bytes 10-19/{len(CONTENT)}'
+
+    response = client.get(url(stored, 'report.pdf'), headers={'If-None-Match': f'"{stored}"'})
+    assert response.status_code == 304 and response.data == b''
+
+    assert client.get(url('0' * 64, 'report.pdf')).status_code == 404
+
+
+def test_x_accel_offload(app, stored):
+    app.config['ATTACHMENT_OFFLOAD'] = 'x-accel'
+    client = app.test_client()
+
+    response = client.get(url(stored, 'report.pdf'))
+    assert response.status_code == 200 and response.data == b''
+    assert response.headers['X-Accel-Redirect'] == f'/protected-uploads/{store_key(stored)}'
+    assert response.headers['Content-Disposition'] == 'inline; filename=report.pdf'
+
+    response = client.get(url(stored, 'report.pdf'), headers={'If-None-Match': f'"{stored}"'})
+    assert response.status_code == 304 and 'X-Accel-Redirect' not in response.headers
+
+
+def test_x_accel_download_names_are_escaped(app, stored):
+    app.config['ATTACHMENT_OFFLOAD'] = 'x-accel'
+    client = app.test_client()
+
+    # Not an allowed type: a download, and the quote cannot end the parameter
+    response = client.get(url(stored, 'a"; filename=evil.html'))
+    assert response.mimetype == 'application/octet-stream'
+    assert response.headers['Content-Disposition'] == 'attachment; filename="a\\"; filename=evil.html"'
+
+    response = client.get(url(stored, 'résumé.pdf'))
+    assert response.headers['Content-Disposition'] == (
+        "inline; filename=resume.pdf; filename*=UTF-8''r%C3%A9sum%C3%A9.pdf"
+    )
+
+
+def test_x_sendfile_offload(app, stored):
+    app.config['ATTACHMENT_OFFLOAD'] = 'x-sendfile'
+    response = app.test_client().get(url(stored, 'report.pdf'))
+    assert response.headers['X-Sendfile'].endswith(store_key(stored).replace('/', os.sep))
+    assert response.data == b''
@@ -0,0 +1,132 @@
+"""
+Content-addressed attachment store: identical uploads share one blob,
+references are counted, and garbage collection only removes what nothing
+points at.
+"""
+import hashlib
+import os
+import time
+from app import attachments
+from app.attachments import (
+    collect_garbage, link_attachment, migrate_legacy_attachments, release_attachments, store_path, store_upload
+)
+from app.extensions import db
+from app.models import Attachment, Complaint, ComplaintAttachment, Lab
+from app.uploads import HashingUploadFile
+
+PDF = b'%PDF-1.4 the same report'
+OTHER_PDF = b'%PDF-1.4 a different report'
+
+
+def add_complaints(count, **fields):
+    lab = Lab(name='Lab A')
+    db.session.add(lab)
+    db.session.flush()
+    complaints = [
+        Complaint(complaint_id=f'CMP2025-{n:04d}', email='u@test.local', name='User', lab_id=lab.id,
+                  category='Hardware', description='x', status='Pending', priority='Low', **fields)
+        for n in range(1, count + 1)
+    ]
+    db.session.add_all(complaints)
+    db.session.commit()
+    return complaints
+
+
+def attach(app, complaint, content, filename='report.pdf'):
+    upload = HashingUploadFile(filename, directory=app.config['UPLOAD_FOLDER'], allowed_extensions={'pdf'})
+    upload.write(content)
+    attachment = store_upload(upload)
+    link_attachment(complaint, attachment, filename)
+    db.session.commit()
+    return attachment
+
+
+def refs(content):
+    db.session.expire_all()
+    attachment = Attachment.query.filter_by(sha256=hashlib.sha256(content).hexdigest()).first()
+    return attachment.ref_count if attachment else None
+
+
+def test_duplicate_upload_shares_one_blob(app, upload_dir):
+    first, second = add_complaints(2)
+    attach(app, first, PDF)
+    attach(app, second, PDF, 'copy.pdf')
+
+    assert Attachment.query.count() == 1 and refs(PDF) == 2
+    assert os.path.isfile(store_path(hashlib.sha256(PDF).hexdigest()))
+    # No temp file left behind by the discarded second copy
+    assert not [name for _root, _dirs, names in os.walk(upload_dir) for name in names if name.endswith('.part')]
+
+    # Releasing one reference keeps the blob for the other complaint
+    release_attachments([first.id])
+    db.session.commit()
+    assert refs(PDF) == 1
+    assert collect_garbage() == 0
+    assert os.path.isfile(store_path(hashlib.sha256(PDF).hexdigest()))
+    assert ComplaintAttachment.query.one().complaint_id == second.id
+
+
+def test_garbage_collection(app, upload_dir):
+    first, second = add_complaints(2)
+    attach(app, first, PDF)
+    attach(app, second, OTHER_PDF)
+    kept_path = store_path(hashlib.sha256(OTHER_PDF).hexdigest())
+    released_path = store_path(hashlib.sha256(PDF).hexdigest())
+
+    # A file with no row: a recent one may belong to an upload in flight
+    orphan = '1' * 64
+    orphan_path = store_path(orphan)
+    os.makedirs(os.path.dirname(orphan_path))
+    with open(orphan_path, 'wb') as f:
+        f.write(b'orphan')
+
+    release_attachments([first.id])
+    db.session.commit()
+    assert collect_garbage(orphan_age=3600) == 1
+    assert not os.path.exists(released_path) and refs(PDF) is None
+    assert os.path.exists(kept_path) and refs(OTHER_PDF) == 1
+    assert os.path.exists(orphan_path)
+
+    # Past the grace period the orphan goes too; referenced blobs never do
+    old = time.time() - 7200
+    os.utime(orphan_path, (old, old))
+    os.utime(kept_path, (old, old))
+    assert collect_garbage(orphan_age=3600) == 1
+    assert not os.path.exists(orphan_path) and os.path.exists(kept_path)
+
+
+def test_legacy_migration_is_idempotent(app, upload_dir):
+    first, second, third = add_complaints(3)
+    for complaint, content in ((first, PDF), (second, PDF), (third, OTHER_PDF)):
+        complaint.attachment_path = f'{complaint.complaint_id}_report.pdf'
+        with open(os.path.join(str(upload_dir), complaint.attachment_path), 'wb') as f:
+            f.write(content)
+    db.session.commit()
+
+    assert migrate_legacy_attachments(batch_size=2) == (3, 1, 0)
+    sha256 = hashlib.sha256(PDF).hexdigest()
+    assert first.attachment_path == f'{sha256[:2]}/{sha256[2:4]}/{sha256}/report.pdf'
+    assert refs(PDF) == 2 and refs(OTHER_PDF) == 1
+    assert not [name for name in os.listdir(upload_dir) if name.endswith('.pdf')]
+
+    # A second run finds nothing to do and takes no extra references
+    assert migrate_legacy_attachments() == (0, 0, 0)
+    assert refs(PDF) == 2 and ComplaintAttachment.query.count() == 3
+
+
+def test_garbage_collection_skips_blobs_relinked_meanwhile(app, upload_dir, monkeypatch):
+    first, second = add_complaints(2)
+    attachment = attach(app, first, PDF)
+    path = store_path(attachment.sha256)
+    release_attachments([first.id])
+    db.session.commit()
+
+    # Another upload links the same content between the SELECT and the DELETE
+    def relinked(sha256):
+        link_attachment(second, attachment, 'again.pdf')
+        db.session.flush()
+        return path
+
+    monkeypatch.setattr(attachments, 'store_path', relinked)
+    assert collect_garbage() == 0
+    assert refs(PDF) == 1 and os.path.exists(path)
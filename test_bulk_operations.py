@@ -0,0 +1,90 @@
+"""
+Bulk updates: many complaints change in one transaction with a fixed
+number of queries, and each recipient gets one notification.
+"""
+from app import notifications
+from app.extensions import db
+from app.models import Admin, Complaint, ComplaintLog, Lab, NotificationEvent
+
+
+def seed(count):
+    lab = Lab(name='Lab A')
+    assignee = Admin(name='Assignee', email='assignee@test.local', password_hash='x')
+    db.session.add_all([lab, assignee])
+    db.session.flush()
+    for n in range(count):
+        db.session.add(Complaint(
+            complaint_id=f'CMP2025-{n:04d}', email=f'user{n % 2}@test.local', name='User', lab_id=lab.id,
+            category='Network', description='Wi-Fi down', status='Pending', priority='Low'
+        ))
+    db.session.commit()
+    return assignee, [c.id for c in Complaint.query.order_by(Complaint.id)]
+
+
+def test_bulk_update_in_one_transaction(app, admin_client, query_budget, monkeypatch):
+    sent = []
+    monkeypatch.setattr(notifications, 'send_email', lambda to, subject, *args: sent.append((to, subject)))
+    assignee, ids = seed(20)
+
+    # Fixed query count whatever the number of complaints
+    with query_budget(8):
+        response = admin_client.post('/admin/api/complaints/bulk', json={
+            'ids': ids + [9999], 'status': 'Resolved', 'priority': 'High',
+            'assigned_admin_id': assignee.id, 'remarks': 'Outage fixed'
+        })
+    data = response.get_json()
+    assert response.status_code == 200 and data['updated'] == 20
+    assert data['results'][-1] == {'id': 9999, 'result': 'not_found'}
+    assert data['results'][0]['changed'] == ['status', 'priority', 'assigned_admin_id']
+
+    complaints = Complaint.query.all()
+    assert {(c.status, c.priority, c.assigned_admin_id) for c in complaints} == {('Resolved', 'High', assignee.id)}
+    assert all(c.resolved_at and c.first_assigned_at for c in complaints)
+    assert ComplaintLog.query.filter_by(action='STATUS_CHANGED', description='Outage fixed').count() == 20
+
+    # One email per reporter and one for the assignee
+    assert sorted(to for to, _ in sent) == ['assignee@test.local', 'user0@test.local', 'user1@test.local']
+
+
+def test_bulk_update_validation(app, admin_client):
+    _, ids = seed(2)
+    bad = [
+        {'ids': [], 'status': 'Resolved'},
+        {'ids': ids, 'status': 'Done'},
+        {'ids': ids},
+        {'ids': ids, 'assigned_admin_id': 9999},
+    ]
+    for body in bad:
+        response = admin_client.post('/admin/api/complaints/bulk', json=body)
+        assert response.status_code == 400 and response.get_json()['success'] is False
+    assert ComplaintLog.query.count() == 0
+
+    response = admin_client.post('/admin/api/complaints/bulk', json={'ids': ids, 'tags': 'network', 'archived': True})
+    assert response.get_json()['updated'] == 2
+    assert {(c.tags, c.archived) for c in Complaint.query} == {('network', True)}
+
+
+def test_bulk_update_queues_lab_events_only_for_labs_with_a_webhook(app, admin_client, monkeypatch):
+    monkeypatch.setattr(notifications, 'send_email', lambda *args: True)
+    monkeypatch.delenv('DISCORD_LAB_A_WEBHOOK', raising=False)
+    app.config['NOTIFICATION_DIGEST_WINDOW'] = 300
+    _, ids = seed(2)
+
+    admin_client.post('/admin/api/complaints/bulk', json={'ids': ids, 'status': 'In Progress'})
+    assert NotificationEvent.query.filter_by(channel='discord').count() == 0
+
+    Lab.query.one().discord_webhook = 'https://discord.test/webhook'
+    db.session.commit()
+    admin_client.post('/admin/api/complaints/bulk', json={'ids': ids, 'status': 'Resolved'})
+    assert NotificationEvent.query.filter_by(channel='discord').count() == 2
+
+
+def test_status_only_bulk_update_does_not_email_assignees(app, admin_client, monkeypatch):
+    sent = []
+    monkeypatch.setattr(notifications, 'send_email', lambda to, subject, *args: sent.append(to))
+    assignee, ids = seed(2)
+    admin_client.post('/admin/api/complaints/bulk', json={'ids': ids, 'assigned_admin_id': assignee.id})
+    sent.clear()
+
+    admin_client.post('/admin/api/complaints/bulk', json={'ids': ids, 'status': 'Resolved'})
+    assert sorted(sent) == ['user0@test.local', 'user1@test.local']
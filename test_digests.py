@@ -0,0 +1,194 @@
+"""
+Notification digests: queued events are batched per recipient, only marked
+sent after delivery, and retried when a send fails.
+"""
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from app import digests, notifications, sla
+from app.digests import flush_due_digests, queue_admin_event, queue_lab_event, save_notification_prefs
+from app.extensions import db
+from app.models import Admin, Complaint, Lab, NotificationEvent
+
+WEBHOOK = 'https://discord.test/webhook'
+
+
+@pytest.fixture
+def outbox(app, monkeypatch):
+    """Digests on; records Discord posts and emails, which succeed unless told otherwise."""
+    app.config['NOTIFICATION_DIGEST_WINDOW'] = 300
+    app.config['NOTIFICATION_DIGEST_MAX_ITEMS'] = 2
+    sent = SimpleNamespace(posts=[], emails=[], ok=True)
+
+    def post(url, data):
+        sent.posts.append(data)
+        return sent.ok
+
+    def email(to, subject, body, text_body=None):
+        sent.emails.append((to, subject))
+        return sent.ok
+
+    monkeypatch.setattr(notifications, 'send_discord_notification', post)
+    monkeypatch.setattr(notifications, 'send_email', email)
+    return sent
+
+
+class StopScheduler(Exception):
+    pass
+
+
+def seed():
+    lab = Lab(name='Lab A', discord_webhook=WEBHOOK)
+    admin = Admin(name='Admin', email='admin@test.local', password_hash='x')
+    db.session.add_all([lab, admin])
+    db.session.flush()
+    complaint = Complaint(
+        complaint_id='CMP2025-0001', email='u@test.local', name='User', lab_id=lab.id,
+        category='Network', description='x', status='Pending', priority='Low'
+    )
+    db.session.add(complaint)
+    db.session.commit()
+    return lab, admin, complaint
+
+
+def pending():
+    return NotificationEvent.query.filter(NotificationEvent.sent_at.is_(None)).count()
+
+
+def test_events_are_batched_per_recipient(outbox):
+    lab, admin, complaint = seed()
+    for n in range(3):
+        assert queue_lab_event(lab, 'STATUS_CHANGED', complaint, f'update {n}')
+    assert queue_admin_event(admin, 'ADMIN_ASSIGNED', complaint, 'assigned')
+    assert queue_admin_event(admin, 'STATUS_CHANGED', complaint, 'resolved')
+    db.session.commit()
+
+    now = datetime.utcnow()
+    assert flush_due_digests(now) == 0  # nothing due inside the window
+    assert flush_due_digests(now + timedelta(seconds=301)) == 2
+
+    assert len(outbox.posts) == 1 and len(outbox.emails) == 1
+    post = outbox.posts[0]
+    assert post['content'] == '🗂️ **3 complaint update(s) in Lab A**'
+    assert post['description'].splitlines() == [
+        '• **CMP2025-0001** update 0', '• **CMP2025-0001** update 1', '…and 1 more'
+    ]
+    assert outbox.emails[0] == ('admin@test.local', '🗂️ TechResolve digest: 2 update(s)')
+    assert pending() == 0
+    assert flush_due_digests(now + timedelta(seconds=600)) == 0
+
+
+def test_outbox_follows_the_transaction(app, outbox):
+    lab, admin, complaint = seed()
+    queue_lab_event(lab, 'STATUS_CHANGED', complaint, 'never committed')
+    db.session.rollback()
+    assert NotificationEvent.query.count() == 0
+
+    app.config['NOTIFICATION_DIGEST_WINDOW'] = 0
+    assert queue_lab_event(lab, 'STATUS_CHANGED', complaint, 'sent directly') is False
+
+
+def test_failed_digest_is_retried_after_the_lease(app, outbox):
+    lab, _, complaint = seed()
+    queue_lab_event(lab, 'STATUS_CHANGED', complaint, 'resolved')
+    db.session.commit()
+
+    due = datetime.utcnow() + timedelta(seconds=301)
+    outbox.ok = False
+    assert flush_due_digests(due) == 0
+    assert pending() == 1 and len(outbox.posts) == 1
+
+    # Leased: neither this worker nor another resends before it expires
+    outbox.ok = True
+    assert flush_due_digests(due + timedelta(seconds=60)) == 0
+    assert len(outbox.posts) == 1
+
+    lease = app.config['NOTIFICATION_DIGEST_LEASE']
+    assert flush_due_digests(due + timedelta(seconds=lease)) == 1
+    assert len(outbox.posts) == 2 and pending() == 0
+
+
+def test_sender_errors_keep_events(outbox, monkeypatch):
+    _, admin, complaint = seed()
+    queue_admin_event(admin, 'ADMIN_ASSIGNED', complaint, 'assigned')
+    db.session.commit()
+
+    def broken(*args, **kwargs):
+        raise RuntimeError('template missing')
+
+    monkeypatch.setattr(notifications, 'render_notification', broken)
+    assert flush_due_digests(force=True) == 0
+    assert pending() == 1
+
+
+def test_daily_summary_waits_for_its_hour(app, outbox):
+    _, admin, complaint = seed()
+    app.config['NOTIFICATION_DIGEST_WINDOW'] = 0
+    save_notification_prefs(admin.id, {'email_notifications': True, 'daily_summary': True})
+    db.session.commit()
+
+    assert queue_admin_event(admin, 'ADMIN_ASSIGNED', complaint, 'assigned')
+    db.session.commit()
+    event = NotificationEvent.query.one()
+    assert event.due_at > datetime.utcnow()
+    assert event.due_at.hour == app.config['NOTIFICATION_DAILY_SUMMARY_HOUR']
+
+    assert flush_due_digests() == 0
+    assert flush_due_digests(event.due_at) == 1 and len(outbox.emails) == 1
+
+
+def test_scheduler_starts_once_and_flushes(app, monkeypatch):
+    run_scheduler, started = digests._run_scheduler, []
+    monkeypatch.setattr(digests, '_scheduler', None)
+    monkeypatch.setattr(digests, '_run_scheduler', started.append)
+    app.config['TESTING'] = False
+    digests._ensure_scheduler()
+    digests._ensure_scheduler()
+    digests._scheduler.join(1)
+    app.config['TESTING'] = True
+    assert started == [app]
+
+    # One loop iteration: sleep for the poll interval, then flush
+    calls = []
+
+    def sleep(seconds):
+        if calls:
+            raise StopScheduler
+        calls.append(seconds)
+
+    monkeypatch.setattr(digests, 'time', SimpleNamespace(sleep=sleep, monotonic=time.monotonic))
+    monkeypatch.setattr(digests, 'flush_due_digests', lambda: calls.append('flush'))
+    with pytest.raises(StopScheduler):
+        run_scheduler(app)
+    assert calls == [app.config['NOTIFICATION_DIGEST_POLL_INTERVAL'], 'flush']
+
+
+def test_fresh_app_flushes_events_queued_before_restart(app, outbox, monkeypatch):
+    lab, admin, complaint = seed()
+    # Left in the outbox by a previous process: nothing is queued in this one
+    queue_lab_event(lab, 'STATUS_CHANGED', complaint, 'resolved')
+    queue_admin_event(admin, 'ADMIN_ASSIGNED', complaint, 'assigned')
+    db.session.commit()
+    NotificationEvent.query.update({NotificationEvent.due_at: datetime.utcnow() - timedelta(minutes=1)})
+    db.session.commit()
+
+    run_scheduler, started = digests._run_scheduler, []
+    monkeypatch.setattr(digests, '_scheduler', None)
+    monkeypatch.setattr(digests, '_run_scheduler', started.append)
+    monkeypatch.setattr(sla, '_poller', object())  # keep the SLA thread out of this test
+    app.config['TESTING'] = False
+    app.test_client().get('/')
+    digests._scheduler.join(1)
+    app.config['TESTING'] = True
+    assert started == [app]
+
+    # The thread's first pass sends what was already due
+    def sleep(seconds):
+        if pending() == 0:
+            raise StopScheduler
+
+    monkeypatch.setattr(digests, 'time', SimpleNamespace(sleep=sleep, monotonic=time.monotonic))
+    with pytest.raises(StopScheduler):
+        run_scheduler(app)
+    assert len(outbox.posts) == 1 and len(outbox.emails) == 1
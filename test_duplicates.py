@@ -0,0 +1,80 @@
+"""
+Duplicate detection: near-identical descriptions in the same lab link to
+the first open report, and the index follows committed status changes.
+"""
+from types import SimpleNamespace
+from app.duplicates import DuplicateIndex, link_duplicate, signature, similarity
+from app.extensions import db
+from app.models import Admin, Complaint, Lab
+
+PROJECTOR = 'The projector in room 204 shows no signal when a laptop is connected over HDMI.'
+
+
+def use_detection(app):
+    app.config['DUPLICATE_DETECTION'] = True
+    index = DuplicateIndex(0.6)
+    app.extensions['duplicate_index'] = index
+    index.load()
+    return index
+
+
+def submit(lab, number, description):
+    complaint = Complaint(
+        complaint_id=f'CMP2025-{number:04d}', email='u@test.local', name='User', lab_id=lab.id,
+        category='Hardware', description=description, status='Pending', priority='Low'
+    )
+    db.session.add(complaint)
+    db.session.flush()
+    parent = link_duplicate(complaint)
+    db.session.commit()
+    return complaint, parent
+
+
+def test_signature_similarity():
+    near = signature(PROJECTOR.replace('204', '205') + ' Please help!')
+    assert similarity(signature(PROJECTOR), signature(PROJECTOR)) == 1
+    assert similarity(signature(PROJECTOR), near) >= 0.6
+    assert similarity(signature(PROJECTOR), signature('Wi-Fi keeps dropping on every lab machine after login.')) < 0.3
+    assert signature('hi') is None
+
+
+def test_links_duplicates_to_first_open_report(app):
+    lab_a, lab_b = Lab(name='Lab A'), Lab(name='Lab B')
+    admin = Admin(name='Admin', email='admin@test.local', password_hash='x')
+    db.session.add_all([lab_a, lab_b, admin])
+    db.session.commit()
+    index = use_detection(app)
+
+    original, parent = submit(lab_a, 1, PROJECTOR)
+    assert parent is None
+    original.assign(admin)
+    db.session.commit()
+
+    first_repeat, parent = submit(lab_a, 2, PROJECTOR.replace('204', '205') + ' Please help!')
+    assert parent.id == original.id
+    assert first_repeat.duplicate_of_id == original.id
+    assert first_repeat.assigned_admin_id == admin.id
+
+    # Repeats of a duplicate chain to the original, even when only the duplicate matches
+    index.track(SimpleNamespace(id=original.id, status='Resolved'))
+    _, parent = submit(lab_a, 3, PROJECTOR)
+    assert parent.id == original.id
+
+    # Other labs and unrelated reports are not linked
+    assert submit(lab_b, 4, PROJECTOR)[1] is None
+    assert submit(lab_a, 5, 'Wi-Fi keeps dropping on every lab machine after login.')[1] is None
+    assert [d.id for d in Complaint.query.get(original.id).duplicates] == [first_repeat.id, first_repeat.id + 1]
+
+
+def test_closed_complaints_leave_the_index(app):
+    lab = Lab(name='Lab A')
+    db.session.add(lab)
+    db.session.commit()
+    index = use_detection(app)
+
+    original, _ = submit(lab, 1, PROJECTOR)
+    original.set_status('Resolved')
+    db.session.commit()
+
+    assert index.find(lab.id, PROJECTOR) is None
+    assert submit(lab, 2, PROJECTOR)[1] is None
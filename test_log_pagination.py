@@ -0,0 +1,114 @@
+"""
+Activity log keyset pagination: cursors walk every row exactly once, ties
+on timestamp are broken by id, and filters and count modes are honoured.
+"""
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import Admin, Complaint, ComplaintLog, Lab
+from app.pagination import decode_cursor, encode_cursor
+
+BASE = datetime(2025, 3, 10, 12, 0)
+
+
+def seed_logs():
+    """Seven logs: two pairs share a timestamp, two admins, two actions, three days."""
+    lab = Lab(name='Lab A')
+    other = Admin(name='Other', email='other@test.local', password_hash='x')
+    db.session.add_all([lab, other])
+    db.session.flush()
+    complaint = Complaint(
+        complaint_id='CMP2025-0001', email='u@test.local', name='User', lab_id=lab.id,
+        category='Network', description='x', status='Pending', priority='Low'
+    )
+    db.session.add(complaint)
+    db.session.flush()
+    admin = Admin.query.filter_by(email='admin@test.local').one()
+    stamps = [BASE, BASE, BASE - timedelta(hours=1), BASE - timedelta(days=1),
+              BASE - timedelta(days=1), BASE - timedelta(days=2), BASE - timedelta(days=2, hours=1)]
+    for n, stamp in enumerate(stamps):
+        db.session.add(ComplaintLog(
+            complaint_id=complaint.id, admin_id=admin.id if n % 2 == 0 else other.id,
+            action='STATUS_CHANGED' if n < 4 else 'VIEWED', timestamp=stamp
+        ))
+    db.session.commit()
+    return admin, other
+
+
+def walk(client, **params):
+    """Follow next_cursor to the end; return the ids of every page."""
+    pages, cursor = [], None
+    while True:
+        query = dict(params, **({'cursor': cursor} if cursor else {}))
+        data = client.get('/admin/api/logs', query_string=query).get_json()
+        pages.append([log['id'] for log in data['logs']])
+        cursor = data['pagination']['next_cursor']
+        if not cursor:
+            return pages, data['pagination']
+
+
+def test_cursor_round_trip():
+    position = (datetime(2025, 3, 10, 12, 0, 0, 123456), 42)
+    assert decode_cursor(encode_cursor(*position)) == position
+    assert decode_cursor(None) is None
+    assert decode_cursor('not-a-cursor') is None
+
+
+def test_pages_cover_every_row_once(app, admin_client):
+    seed_logs()
+    newest_first = [log.id for log in ComplaintLog.query.order_by(
+        ComplaintLog.timestamp.desc(), ComplaintLog.id.desc())]
+
+    # Page size 2 splits both timestamp ties across the id tie-break
+    pages, last = walk(admin_client, per_page=2, count='none')
+    assert pages == [newest_first[0:2], newest_first[2:4], newest_first[4:6], newest_first[6:]]
+    assert last['has_next'] is False and last['has_prev'] is True
+
+    # Exactly per_page rows left: no further page; per_page + 1: one more
+    pages, _ = walk(admin_client, per_page=7)
+    assert pages == [newest_first]
+    pages, _ = walk(admin_client, per_page=6)
+    assert pages == [newest_first[:6], newest_first[6:]]
+
+
+def test_malformed_cursor_is_rejected(app, admin_client):
+    seed_logs()
+    response = admin_client.get('/admin/api/logs?cursor=not-a-cursor')
+    assert response.status_code == 400 and response.get_json()['success'] is False
+    assert admin_client.get('/admin/logs?cursor=%%%').status_code == 400
+    assert admin_client.get('/admin/logs').status_code == 200
+
+
+def test_filters(app, admin_client):
+    admin, other = seed_logs()
+
+    def ids(**params):
+        pages, _ = walk(admin_client, per_page=100, **params)
+        return set(pages[0])
+
+    def expected(*criteria):
+        return {log.id for log in ComplaintLog.query.filter(*criteria)}
+
+    assert ids(admin_id=other.id) == expected(ComplaintLog.admin_id == other.id)
+    assert ids(action='VIEWED') == expected(ComplaintLog.action == 'VIEWED')
+    day = BASE - timedelta(days=1)
+    assert ids(date_from=f'{day:%Y-%m-%d}') == expected(ComplaintLog.timestamp >= day.replace(hour=0))
+    assert ids(date_to=f'{day:%Y-%m-%d}') == expected(ComplaintLog.timestamp < BASE.replace(hour=0))
+    assert ids(date_from=f'{day:%Y-%m-%d}', date_to=f'{day:%Y-%m-%d}', action='VIEWED') == expected(
+        ComplaintLog.action == 'VIEWED', ComplaintLog.timestamp >= day.replace(hour=0),
+        ComplaintLog.timestamp < BASE.replace(hour=0))
+    # Bad dates are ignored rather than failing the page
+    assert len(ids(date_from='yesterday')) == 7
+
+
+def test_count_modes(app, admin_client):
+    admin, _ = seed_logs()
+
+    def pagination(**params):
+        return admin_client.get('/admin/api/logs', query_string=dict(per_page=2, **params)).get_json()['pagination']
+
+    assert pagination(count='exact')['total'] == 7
+    assert pagination(count='exact', admin_id=admin.id)['total'] == 4
+    # SQLite has no planner estimate, so approximate falls back to COUNT(*)
+    assert pagination(count='approximate')['total'] == 7
+    assert pagination(count='none')['total'] is None
+    assert pagination(count='bogus')['count_mode'] == 'approximate'
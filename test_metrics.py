@@ -0,0 +1,66 @@
+"""
+/metrics exposes request and SQL statistics only to scrapers holding
+METRICS_TOKEN (or to anyone in debug mode).
+"""
+import re
+from app.extensions import db
+from app.instrumentation import metrics
+from app.models import Lab
+
+
+def sample(text, name, endpoint, extra=''):
+    match = re.search(rf'^{name}{{endpoint="{endpoint}"{extra}}} (\S+)$', text, re.M)
+    assert match, f'{name} missing for {endpoint}'
+    return float(match.group(1))
+
+
+def test_metrics_requires_token(app):
+    client = app.test_client()
+    client.get('/')
+
+    assert client.get('/metrics').status_code == 404
+
+    app.config['METRICS_TOKEN'] = 'secret'
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200 and b'main.home' in response.data
+
+
+def test_metrics_open_in_debug(app):
+    app.debug = True
+    assert app.test_client().get('/metrics').status_code == 200
+
+
+def test_metrics_report_sql_and_latency_per_endpoint(app):
+    db.session.add(Lab(name='Lab A'))
+    db.session.commit()
+    metrics.reset()
+    client = app.test_client()
+    client.get('/user/submit')   # loads the lab list
+    client.get('/user/submit')
+    client.get('/')              # renders a template, no SQL
+
+    app.debug = True
+    text = client.get('/metrics').get_data(as_text=True)
+    submit = 'user.submit_complaint'
+    assert sample(text, 'techresolve_request_duration_seconds_count', submit) == 2
+    assert sample(text, 'techresolve_request_duration_seconds_bucket', submit, ',le="\\+Inf"') == 2
+    assert sample(text, 'techresolve_request_duration_seconds_sum', submit) > 0
+    assert sample(text, 'techresolve_sql_queries_total', submit) >= 2
+    assert sample(text, 'techresolve_sql_duration_seconds_total', submit) > 0
+    assert sample(text, 'techresolve_request_errors_total', submit) == 0
+    assert sample(text, 'techresolve_sql_queries_total', 'main.home') == 0
+
+
+def test_server_timing_header(app):
+    client = app.test_client()
+    assert 'Server-Timing' not in client.get('/').headers
+
+    app.config['METRICS_SERVER_TIMING'] = True
+    header = client.get('/').headers['Server-Timing']
+    assert re.fullmatch(r'app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"', header)
+
+    app.config['METRICS_SERVER_TIMING'] = None
+    app.debug = True
+    assert 'Server-Timing' in client.get('/').headers
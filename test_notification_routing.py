@@ -0,0 +1,43 @@
+"""
+Notification routing: admin emails follow the stored preferences, and
+preferences for all candidates are resolved with at most one query.
+"""
+from app.digests import get_notification_prefs, route_admin_event, save_notification_prefs
+from app.extensions import db
+from app.models import Admin
+from app.nplusone import QueryRecorder
+
+
+def make_admins(count):
+    admins = [Admin(name=f'Admin {i}', email=f'admin{i}@test.local', password_hash='x') for i in range(count)]
+    db.session.add_all(admins)
+    db.session.commit()
+    return admins
+
+
+def test_route_honours_preferences(app):
+    muted, no_status, default, actor = make_admins(4)
+    save_notification_prefs(muted.id, {'assignment_notifications': True, 'status_notifications': True})
+    save_notification_prefs(no_status.id, {'email_notifications': True, 'assignment_notifications': True})
+    db.session.commit()
+
+    candidates = [muted, no_status, default, actor]
+    assigned = {admin.id for admin, _ in route_admin_event('ADMIN_ASSIGNED', candidates, actor)}
+    status = {admin.id for admin, _ in route_admin_event('STATUS_CHANGED', candidates, actor)}
+
+    assert assigned == {no_status.id, default.id}
+    assert status == {default.id}
+
+
+def test_preferences_are_loaded_once(app):
+    make_admins(5)
+    admins = Admin.query.all()
+    with QueryRecorder(db.engine) as recorder:
+        route_admin_event('ADMIN_ASSIGNED', admins)
+        route_admin_event('STATUS_CHANGED', admins)
+        get_notification_prefs(admins[0].id)
+    assert recorder.count == 1
+
+    save_notification_prefs(admins[0].id, {})
+    db.session.commit()
+    assert get_notification_prefs(admins[0].id)['email_notifications'] is False
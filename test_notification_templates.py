@@ -0,0 +1,44 @@
+"""
+Notification templates: each event renders an escaped HTML body and a
+plain-text alternative from the precompiled environment.
+"""
+from types import SimpleNamespace
+from app.notifications import NOTIFICATION_TEMPLATES, NotificationTemplates, render_notification
+
+
+def complaint(**fields):
+    values = dict(
+        complaint_id='CMP2025-0042', name='Asha <script>', category='Network', status='Pending',
+        priority=None, lab=SimpleNamespace(name='Lab A & B')
+    )
+    values.update(fields)
+    return SimpleNamespace(**values)
+
+
+def test_complaint_created_renders_html_and_text(app):
+    html, text = render_notification('complaint_created', complaint=complaint())
+
+    assert 'Hello <strong>Asha &lt;script&gt;</strong>' in html
+    assert '<strong style="color: #4f46e5;">CMP2025-0042</strong>' in html
+    assert 'Lab A &amp; B' in html and '<script>' not in html
+    assert 'TechResolve - Complaint Registered' in html
+
+    # Plain text is not escaped and keeps the same facts
+    assert text.startswith('Hello Asha <script>,')
+    assert 'Complaint ID: CMP2025-0042' in text
+    assert 'Lab:          Lab A & B' in text
+    assert 'Priority:     Low' in text
+    assert text.rstrip().endswith('PSG College of Technology')
+
+
+def test_templates_compile_once_into_the_bytecode_cache(tmp_path):
+    templates = NotificationTemplates(str(tmp_path))
+    assert set(templates.templates) == set(NOTIFICATION_TEMPLATES)
+    assert any(tmp_path.iterdir())
+
+    # Context-free fragments (the footer) are rendered once and reused
+    first = templates.render('complaint_created', complaint=complaint())
+    footer = templates.fragment('email/footer.txt')
+    second = templates.render('complaint_created', complaint=complaint(complaint_id='CMP2025-0043'))
+    assert templates.fragment('email/footer.txt') is footer
+    assert 'CMP2025-0043' in second[1] and first[1] != second[1]
@@ -0,0 +1,58 @@
+"""
+Query budgets for list endpoints: the number of SQL statements must not
+grow with the number of rows returned.
+"""
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import Admin, Complaint, ComplaintLog, Lab
+
+
+def seed(count):
+    labs = [Lab(name=f'Lab {i}') for i in range(3)]
+    admins = [Admin(name=f'Admin {i}', email=f'admin{i}@test.local', password_hash='x') for i in range(4)]
+    db.session.add_all(labs + admins)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    for i in range(count):
+        complaint = Complaint(
+            complaint_id=f'CMP2025-{i + 1:04d}',
+            email=f'user{i}@test.local',
+            name=f'User {i}',
+            lab_id=labs[i % len(labs)].id,
+            assigned_admin_id=admins[i % len(admins)].id,
+            category='Hardware',
+            description='Monitor not working',
+            status='Resolved' if i % 3 == 0 else 'Pending',
+            priority='Low',
+            created_at=now - timedelta(days=i),
+            updated_at=now - timedelta(days=i)
+        )
+        db.session.add(complaint)
+        db.session.flush()
+        db.session.add(ComplaintLog(
+            complaint_id=complaint.id,
+            admin_id=admins[i % len(admins)].id,
+            target_admin_id=admins[(i + 1) % len(admins)].id,
+            action='ADMIN_ASSIGNED',
+            timestamp=now - timedelta(days=i)
+        ))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def test_api_complaints_query_budget(admin_client, query_budget):
+    seed(60)
+    with query_budget(3):
+        response = admin_client.get('/admin/api/complaints')
+    assert response.status_code == 200
+    assert len(response.get_json()['complaints']) == 60
+
+
+def test_api_logs_query_budget(admin_client, query_budget):
+    seed(60)
+    with query_budget(3):
+        response = admin_client.get('/admin/api/logs?count=exact')
+    assert response.status_code == 200
+    assert len(response.get_json()['logs']) == 20
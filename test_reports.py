@@ -0,0 +1,113 @@
+"""
+Report aggregates computed in SQL must match the straightforward Python
+computation over the same rows.
+"""
+from datetime import datetime, timedelta
+
+from app.analytics import complaint_filters, counts_by_bucket, resolution_stats
+from app.extensions import db
+from app.lifecycle import backfill_lifecycle
+from app.models import Complaint, ComplaintLog, Lab
+
+HOURS = [0.25, 2, 2.5, 5, 12, 30, 30, 100, 200, 400]
+
+
+def seed():
+    labs = [Lab(name='Lab A'), Lab(name='Lab B')]
+    db.session.add_all(labs)
+    db.session.flush()
+    start = datetime(2025, 1, 1, 9, 0)
+    for i, hours in enumerate(HOURS):
+        created = start + timedelta(days=i)
+        db.session.add(Complaint(
+            complaint_id=f'CMP2025-{i + 1:04d}', email='u@test.local', name='User',
+            lab_id=labs[i % 2].id, category='Hardware' if i < 5 else 'Network',
+            description='x', status='Resolved', priority='Low',
+            created_at=created, updated_at=created + timedelta(hours=hours) + timedelta(days=30),
+            resolved_at=created + timedelta(hours=hours)
+        ))
+    db.session.add(Complaint(
+        complaint_id='CMP2025-0099', email='u@test.local', name='User', lab_id=labs[0].id,
+        category='Hardware', description='x', status='Pending', priority='Low',
+        created_at=start, updated_at=start + timedelta(hours=1)
+    ))
+    db.session.commit()
+    return labs
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    position = fraction * (len(values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def test_resolution_stats_match_python(app):
+    seed()
+    stats = resolution_stats()
+    seconds = [h * 3600 for h in HOURS]
+
+    assert stats['count'] == len(HOURS)
+    assert stats['min_seconds'] == min(seconds)
+    assert stats['max_seconds'] == max(seconds)
+    assert stats['buckets'] == {
+        '0-1h': 1, '1-3h': 2, '3-8h': 1, '8-24h': 1, '1-3d': 2, '3-7d': 1, '7d+': 2
+    }
+    for key, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+        assert abs(stats['percentiles'][key] - percentile(seconds, fraction)) < 1
+
+
+def test_resolution_stats_filters(app, admin_client):
+    labs = seed()
+    stats = resolution_stats(complaint_filters(lab_id=labs[1].id, category='Network'))
+    assert stats['count'] == len([h for i, h in enumerate(HOURS) if i % 2 == 1 and i >= 5])
+
+    data = admin_client.get('/admin/api/reports?category=Network&date_to=2025-01-08').get_json()
+    assert data['resolved_count'] == 3
+    assert sum(data['resolution_buckets'].values()) == 3
+
+
+def test_counts_by_bucket(app):
+    seed()  # ten complaints, daily from Wed 2025-01-01
+    assert counts_by_bucket('month') == [(datetime(2025, 1, 1), 11)]
+    assert counts_by_bucket('week') == [
+        (datetime(2024, 12, 30), 6), (datetime(2025, 1, 6), 5)
+    ]
+    days = counts_by_bucket('day')
+    assert days[0] == (datetime(2025, 1, 1), 2) and len(days) == 10
+
+
+def test_trend_fills_gaps(app, admin_client):
+    seed()
+    data = admin_client.get(
+        '/admin/api/reports/trend?granularity=week&start=2024-12-16&end=2025-01-19&breakdown=category'
+    ).get_json()
+    assert data['labels'] == ['2024-12-16', '2024-12-23', '2024-12-30', '2025-01-06', '2025-01-13']
+    assert data['total'] == [0, 0, 6, 5, 0]
+    assert {s['key']: s['counts'] for s in data['series']} == {
+        'Hardware': [0, 0, 6, 0, 0], 'Network': [0, 0, 0, 5, 0]
+    }
+
+    bad = admin_client.get('/admin/api/reports/trend?granularity=day&start=2000-01-01&end=2025-01-01')
+    assert bad.status_code == 400
+
+
+def test_backfill_lifecycle_from_logs(app):
+    labs = seed()
+    complaint = Complaint.query.filter_by(complaint_id='CMP2025-0099').one()
+    start = complaint.created_at
+    for hours, action, value in ((1, 'ADMIN_ASSIGNED', 'Admin'), (2, 'STATUS_CHANGED', 'In Progress'),
+                                 (5, 'STATUS_CHANGED', 'Resolved')):
+        db.session.add(ComplaintLog(complaint_id=complaint.id, action=action, new_value=value,
+                                    timestamp=start + timedelta(hours=hours)))
+    complaint.status = 'Resolved'
+    db.session.commit()
+    updated_at = complaint.updated_at
+
+    assert backfill_lifecycle() == 1
+    db.session.expire_all()
+    assert complaint.first_assigned_at == start + timedelta(hours=1)
+    assert complaint.first_in_progress_at == start + timedelta(hours=2)
+    assert complaint.resolved_at == start + timedelta(hours=5)
+    assert complaint.updated_at == updated_at
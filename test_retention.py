@@ -0,0 +1,110 @@
+"""
+Log retention: expired rows are deleted or folded into daily view rollups,
+and nothing inside the retention window is touched.
+"""
+from datetime import datetime, timedelta
+import pytest
+from app.extensions import db
+from app.models import Admin, Complaint, ComplaintLog, ComplaintViewRollup, Lab
+from app.retention import apply_retention
+
+NOW = datetime.utcnow()
+OLD = (NOW - timedelta(days=40)).replace(hour=10)
+
+
+def seed():
+    lab = Lab(name='Lab A')
+    admin = Admin(name='Viewer', email='viewer@test.local', password_hash='x')
+    db.session.add_all([lab, admin])
+    db.session.flush()
+    complaint = Complaint(
+        complaint_id='CMP2025-0001', email='u@test.local', name='User', lab_id=lab.id,
+        category='Network', description='x', status='Pending', priority='Low'
+    )
+    db.session.add(complaint)
+    db.session.flush()
+    return complaint, admin
+
+
+def add_log(complaint, action, timestamp, admin=None, duration=None):
+    db.session.add(ComplaintLog(
+        complaint_id=complaint.id, admin_id=admin.id if admin else None, action=action,
+        timestamp=timestamp, view_duration=duration
+    ))
+
+
+def test_delete_mode_removes_only_expired_rows(app):
+    complaint, admin = seed()
+    for hours in range(3):
+        add_log(complaint, 'NOTE_ADDED', OLD + timedelta(hours=hours), admin)
+    add_log(complaint, 'NOTE_ADDED', NOW - timedelta(days=5), admin)   # inside the window
+    add_log(complaint, 'STATUS_CHANGED', OLD, admin)                   # other action
+    db.session.commit()
+
+    result = apply_retention({'NOTE_ADDED': {'mode': 'delete', 'after_days': 30}}, batch_size=2)
+    assert result == {'NOTE_ADDED': 3}
+    remaining = sorted((log.action, log.timestamp > OLD + timedelta(days=1)) for log in ComplaintLog.query)
+    assert remaining == [('NOTE_ADDED', True), ('STATUS_CHANGED', False)]
+    assert apply_retention({'NOTE_ADDED': {'mode': 'delete', 'after_days': 30}}) == {'NOTE_ADDED': 0}
+
+
+def test_rollup_merges_into_existing_days(app):
+    complaint, admin = seed()
+    day = OLD.date()
+    # Rows left by an earlier run, for an admin and for system (NULL admin) views
+    db.session.add_all([
+        ComplaintViewRollup(complaint_id=complaint.id, admin_id=admin.id, day=day,
+                            view_count=2, total_view_duration=30),
+        ComplaintViewRollup(complaint_id=complaint.id, admin_id=None, day=day,
+                            view_count=1, total_view_duration=5),
+    ])
+    add_log(complaint, 'ISSUE_VIEWED', OLD, admin, 10)
+    add_log(complaint, 'ISSUE_VIEWED', OLD + timedelta(hours=1), admin, 20)
+    add_log(complaint, 'ISSUE_VIEWED', OLD + timedelta(hours=2), None, None)
+    add_log(complaint, 'ISSUE_VIEWED', OLD - timedelta(days=1), admin, 7)   # a new day
+    add_log(complaint, 'ISSUE_VIEWED', NOW, admin, 99)                      # kept raw
+    db.session.commit()
+
+    result = apply_retention({'ISSUE_VIEWED': {'mode': 'rollup', 'after_days': 30}}, batch_size=2)
+    assert result == {'ISSUE_VIEWED': 4}
+
+    rollups = {
+        (r.admin_id, r.day): (r.view_count, r.total_view_duration)
+        for r in ComplaintViewRollup.query
+    }
+    assert rollups == {
+        (admin.id, day): (4, 60),
+        (None, day): (2, 5),
+        (admin.id, day - timedelta(days=1)): (1, 7),
+    }
+    assert [log.view_duration for log in ComplaintLog.query] == [99]
+
+
+def test_keep_and_unknown_modes(app):
+    complaint, admin = seed()
+    add_log(complaint, 'ISSUE_VIEWED', OLD, admin, 10)
+    db.session.commit()
+    assert apply_retention({'ISSUE_VIEWED': {'mode': 'keep'}}) == {}
+    with pytest.raises(ValueError, match='shred'):
+        apply_retention({'ISSUE_VIEWED': {'mode': 'shred'}})
+    assert ComplaintLog.query.count() == 1
+
+
+def test_rollup_merges_duplicate_system_rows(app):
+    complaint, admin = seed()
+    day = OLD.date()
+    # Two NULL-admin rows for the same day: the unique constraint doesn't stop them
+    db.session.add_all([
+        ComplaintViewRollup(complaint_id=complaint.id, admin_id=None, day=day,
+                            view_count=1, total_view_duration=5),
+        ComplaintViewRollup(complaint_id=complaint.id, admin_id=None, day=day,
+                            view_count=2, total_view_duration=7),
+    ])
+    add_log(complaint, 'ISSUE_VIEWED', OLD, None, 3)
+    add_log(complaint, 'ISSUE_VIEWED', OLD + timedelta(hours=1), admin, 4)
+    db.session.commit()
+
+    assert apply_retention({'ISSUE_VIEWED': {'mode': 'rollup', 'after_days': 30}}) == {'ISSUE_VIEWED': 2}
+    rollups = sorted((r.admin_id is None, r.view_count, r.total_view_duration) for r in ComplaintViewRollup.query)
+    assert rollups == [(False, 1, 4), (True, 4, 15)]
+    assert ComplaintLog.query.count() == 0
@@ -0,0 +1,67 @@
+"""
+SLA monitor: deadlines follow priority targets and complaint changes, the
+at-risk list comes from the in-memory index, and a breach fires once.
+"""
+from datetime import datetime, timedelta
+
+from app import notifications
+from app.extensions import db
+from app.models import Admin, Complaint, ComplaintLog, Lab, SlaBreach
+from app.sla import check_sla_breaches, ensure_sla_monitor
+
+
+def make_complaint(lab, number, priority, hours_ago, **fields):
+    complaint = Complaint(
+        complaint_id=f'CMP2025-{number:04d}', email='u@test.local', name='User', lab_id=lab.id,
+        category='Hardware', description='x', priority=priority,
+        created_at=datetime.utcnow() - timedelta(hours=hours_ago), **fields
+    )
+    db.session.add(complaint)
+    return complaint
+
+
+def test_at_risk_and_breaches(app, admin_client):
+    lab = Lab(name='Lab A')
+    db.session.add(lab)
+    db.session.flush()
+    overdue = make_complaint(lab, 1, 'High', 2)          # assign target 1h: breached
+    soon = make_complaint(lab, 2, 'Medium', 3)           # assign target 4h: due in 1h
+    make_complaint(lab, 3, 'Low', 1)                     # assign target 24h: not at risk
+    make_complaint(lab, 4, 'High', 5, status='Resolved')  # closed: not tracked
+    db.session.commit()
+
+    data = admin_client.get('/admin/api/sla/at-risk?within=2').get_json()
+    assert [(c['complaint_id'], c['clock'], c['breached']) for c in data['complaints']] == [
+        ('CMP2025-0001', 'assign', True), ('CMP2025-0002', 'assign', False)
+    ]
+
+    assert check_sla_breaches() == 1
+    assert check_sla_breaches() == 0
+    assert SlaBreach.query.count() == 1
+    assert ComplaintLog.query.filter_by(action='SLA_BREACHED', complaint_id=overdue.id).count() == 1
+
+    # Assigning stops the assign clock; the change reaches the index on commit
+    soon.assign(Admin.query.first())
+    db.session.commit()
+    later = datetime.utcnow() + timedelta(hours=2)
+    remaining = ensure_sla_monitor().at_risk(later)
+    assert soon.id not in {complaint_id for _, complaint_id, _ in remaining}
+
+
+def test_failed_breach_is_raised_again(app, monkeypatch):
+    lab = Lab(name='Lab A')
+    db.session.add(lab)
+    db.session.flush()
+    overdue = make_complaint(lab, 1, 'High', 2)
+    db.session.commit()
+
+    def failing(*args):
+        raise RuntimeError('mail server down')
+
+    monkeypatch.setattr(notifications, 'notify_sla_breach', failing)
+    assert check_sla_breaches() == 0
+
+    # The rolled-back deadline went back on the heap, not into the breached set
+    monitor = ensure_sla_monitor()
+    assert [(complaint_id, clock) for _, complaint_id, clock in monitor.pop_due()] == [(overdue.id, 'assign')]
+    assert monitor.pop_due() == []
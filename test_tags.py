@@ -0,0 +1,90 @@
+"""
+Tag tables: complaint_tags follows Complaint.tags on every write, and tag
+filters and counts are answered from it.
+"""
+from sqlalchemy import text
+from app.analytics import complaint_filters, tag_counts
+from app.extensions import db
+from app.models import Complaint, ComplaintTag, Lab, Tag
+from app.tags import backfill_tags, parse_tags
+
+
+def add_complaint(lab, number, tags='none', category='Hardware'):
+    complaint = Complaint(
+        complaint_id=f'CMP2025-{number:04d}', email='u@test.local', name='User', lab_id=lab.id,
+        category=category, description='x', status='Pending', priority='Low', tags=tags
+    )
+    db.session.add(complaint)
+    return complaint
+
+
+def tags_of(complaint):
+    return sorted(
+        name for (name,) in db.session.query(Tag.name).join(ComplaintTag, ComplaintTag.tag_id == Tag.id)
+        .filter(ComplaintTag.complaint_id == complaint.id)
+    )
+
+
+def test_parse_tags():
+    assert parse_tags(' Network, wifi ,NETWORK,,none') == ['network', 'wifi']
+    assert parse_tags('none') == parse_tags(None) == []
+
+
+def test_tags_follow_every_write(app):
+    lab = Lab(name='Lab A')
+    db.session.add(lab)
+    db.session.flush()
+    first = add_complaint(lab, 1, 'Network,WiFi')
+    second = add_complaint(lab, 2)
+    db.session.commit()
+    assert tags_of(first) == ['network', 'wifi'] and tags_of(second) == []
+
+    first.tags = 'wifi,printer'
+    second.tags = 'printer'
+    db.session.commit()
+    assert tags_of(first) == ['printer', 'wifi'] and tags_of(second) == ['printer']
+    assert Tag.query.count() == 3  # existing tags are reused
+
+    first.tags = 'none'
+    db.session.commit()
+    assert tags_of(first) == []
+    assert [tag.name for tag in second.tag_list] == ['printer']
+
+
+def test_filter_and_count(app, admin_client):
+    lab = Lab(name='Lab A')
+    db.session.add(lab)
+    db.session.flush()
+    add_complaint(lab, 1, 'network,wifi', 'Network')
+    add_complaint(lab, 2, 'network')
+    add_complaint(lab, 3, 'printer')
+    db.session.commit()
+
+    listed = admin_client.get('/admin/api/complaints?tag=network').get_json()['complaints']
+    assert sorted(c['complaint_id'] for c in listed) == ['CMP2025-0001', 'CMP2025-0002']
+    listed = admin_client.get('/admin/api/complaints?tag=Network,wifi').get_json()['complaints']
+    assert [c['complaint_id'] for c in listed] == ['CMP2025-0001']
+
+    assert tag_counts() == [('network', 2), ('printer', 1), ('wifi', 1)]
+    assert tag_counts(complaint_filters(category='Network')) == [('network', 1), ('wifi', 1)]
+    report = admin_client.get('/admin/api/reports').get_json()
+    assert report['complaints_by_tag'][0] == {'tag': 'network', 'count': 2}
+
+
+def test_backfill_existing_strings(app):
+    lab = Lab(name='Lab A')
+    db.session.add(lab)
+    db.session.commit()
+    # Rows written before the tag tables existed
+    for number, tags in ((1, 'hardware,projector'), (2, 'none'), (3, 'projector')):
+        db.session.execute(text(
+            "INSERT INTO complaints (complaint_id, email, name, lab_id, category, description, status, tags, archived) "
+            f"VALUES ('CMP2025-{number:04d}', 'u@test.local', 'User', {lab.id}, 'Hardware', 'x', 'Pending', '{tags}', 0)"
+        ))
+    db.session.commit()
+    assert ComplaintTag.query.count() == 0
+
+    assert backfill_tags(batch_size=2) == 3
+    assert tag_counts() == [('projector', 2), ('hardware', 1)]
+    backfill_tags()
+    assert ComplaintTag.query.count() == 3
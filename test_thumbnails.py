@@ -0,0 +1,60 @@
+"""
+Attachment thumbnails: images are scaled into a bounded rendition next to
+their blob, recorded on the Attachment row and served as immutable files.
+"""
+import hashlib
+import io
+import os
+from PIL import Image
+from app.attachments import store_path
+from app.extensions import db
+from app.models import Attachment
+from app.thumbnails import backfill_thumbnails, generate_thumbnail
+
+
+def store_blob(content):
+    sha256 = hashlib.sha256(content).hexdigest()
+    path = store_path(sha256)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    db.session.add(Attachment(sha256=sha256, size=len(content), ref_count=1))
+    db.session.commit()
+    return sha256
+
+
+def png(width, height):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def test_thumbnail_is_generated_and_served(app, upload_dir):
+    app.config.update(THUMBNAIL_SIZE=320, THUMBNAIL_FORMAT='webp')
+    sha256 = store_blob(png(1000, 500))
+
+    relative = generate_thumbnail(sha256)
+    assert relative == f'{sha256[:2]}/{sha256[2:4]}/{sha256}.t320.webp'
+    assert Attachment.query.one().thumbnail_path == relative
+    with Image.open(os.path.join(str(upload_dir), relative)) as image:
+        assert (image.format, image.size) == ('WEBP', (320, 160))
+
+    response = app.test_client().get(f'/uploads/{relative}')
+    assert response.status_code == 200 and response.mimetype == 'image/webp'
+    assert 'immutable' in response.headers['Cache-Control']
+
+    # A new format replaces the old rendition
+    app.config['THUMBNAIL_FORMAT'] = 'jpg'
+    jpg = generate_thumbnail(sha256, force=True)
+    assert jpg.endswith('.t320.jpg')
+    assert not os.path.exists(os.path.join(str(upload_dir), relative))
+    assert app.test_client().get(f'/uploads/{jpg}').mimetype == 'image/jpeg'
+
+
+def test_non_images_are_skipped(app, upload_dir):
+    store_blob(b'plain text notes')
+    store_blob(png(40, 40))
+    assert backfill_thumbnails() == (1, 1)
+    assert Attachment.query.filter(Attachment.thumbnail_path.isnot(None)).count() == 1
+    # Only the text blob is left without a thumbnail
+    assert backfill_thumbnails() == (0, 1)
@@ -0,0 +1,72 @@
+"""
+Auto-triage: a model trained on reviewed complaints suggests priority and
+tags for new ones, and is reloaded from TRIAGE_MODEL_PATH.
+"""
+from app.extensions import db
+from app.models import Admin, Complaint, ComplaintLog, Lab
+from app.triage import TriageModel, get_triage_model, train_triage, triage_complaint
+
+EXAMPLES = [
+    ('Projector shows no signal over HDMI', 'Hardware', 'High', 'projector'),
+    ('Projector bulb is flickering during lectures', 'Hardware', 'High', 'projector'),
+    ('Wi-Fi drops every few minutes in the lab', 'Network', 'Medium', 'wifi'),
+    ('Cannot connect to Wi-Fi with my student login', 'Network', 'Medium', 'wifi'),
+    ('Please install the latest Python on the machines', 'Software', 'Low', 'none'),
+    ('Request to update the office suite licence', 'Software', 'Low', 'none'),
+]
+
+
+def seed():
+    lab = Lab(name='Lab A')
+    admin = Admin(name='Admin', email='admin@test.local', password_hash='x')
+    db.session.add_all([lab, admin])
+    db.session.flush()
+    for n in range(30):
+        description, category, priority, tags = EXAMPLES[n % len(EXAMPLES)]
+        complaint = Complaint(
+            complaint_id=f'CMP2025-{n:04d}', email='u@test.local', name='User', lab_id=lab.id,
+            category=category, description=f'{description} (room {n})', status='Resolved',
+            priority=priority, tags=tags
+        )
+        db.session.add(complaint)
+        db.session.flush()
+        db.session.add(ComplaintLog(complaint_id=complaint.id, admin_id=admin.id, action='TAG_CHANGED',
+                                    old_value='none', new_value=tags))
+    db.session.commit()
+    return lab
+
+
+def test_train_and_suggest(app, tmp_path):
+    lab = seed()
+    model = train_triage()
+    assert set(model.heads) == {'category', 'priority', 'tags'}
+    path = tmp_path / 'triage.json'
+    model.save(str(path))
+    app.config['TRIAGE_MODEL_PATH'] = str(path)
+
+    loaded = get_triage_model()
+    suggestion = loaded.suggest('The projector has no HDMI signal', 'Hardware')
+    assert suggestion['category'][0] == 'Hardware'
+    assert suggestion['priority'][0] == 'High'
+    assert [tag for tag, _ in suggestion['tags']] == ['projector']
+
+    # New complaints get a logged suggestion, applied only with auto-apply
+    app.config.update(TRIAGE_AUTO_APPLY=True, TRIAGE_MIN_CONFIDENCE=0.5)
+    complaint = Complaint(complaint_id='CMP2025-0100', email='u@test.local', name='User', lab_id=lab.id,
+                          category='Network', description='Wi-Fi drops constantly in the lab',
+                          status='Pending', priority='Low')
+    db.session.add(complaint)
+    db.session.flush()
+    triage_complaint(complaint)
+    db.session.commit()
+    assert complaint.priority == 'Medium' and complaint.tags == 'wifi'
+    actions = {log.action for log in ComplaintLog.query.filter_by(complaint_id=complaint.id)}
+    assert actions == {'TRIAGE_SUGGESTED', 'PRIORITY_CHANGED', 'TAG_CHANGED'}
+
+
+def test_no_model_no_suggestions(app):
+    seed()
+    complaint = Complaint.query.first()
+    assert get_triage_model() is None
+    assert triage_complaint(complaint) is None
+    assert isinstance(train_triage(epochs=1), TriageModel)
@@ -0,0 +1,94 @@
+"""
+Streaming uploads: files are checked while they arrive, rejected files
+leave nothing in the upload folder, and accepted ones land in the store.
+"""
+import hashlib
+import io
+import os
+import pytest
+from app.attachments import store_path
+from app.extensions import db
+from app.models import Attachment, Complaint, Lab
+from app.uploads import HashingUploadFile
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 200
+
+
+def files_in(directory):
+    return sorted(
+        os.path.relpath(os.path.join(root, name), directory)
+        for root, _dirs, names in os.walk(directory) for name in names
+    )
+
+
+def submit(app, filename, content):
+    lab = Lab.query.first()
+    if lab is None:
+        lab = Lab(name='Lab A')
+        db.session.add(lab)
+        db.session.commit()
+    return app.test_client().post('/user/submit', data={
+        'email': 'u@test.local', 'name': 'User', 'lab': str(lab.id), 'category': 'Hardware',
+        'description': 'Broken', 'attachment': (io.BytesIO(content), filename)
+    }, content_type='multipart/form-data')
+
+
+def test_oversized_upload_stops_writing(upload_dir):
+    upload = HashingUploadFile('big.png', directory=str(upload_dir), max_size=1024, allowed_extensions={'png'})
+    upload.write(PNG)
+    upload.flush()
+    assert upload.error is None and os.path.getsize(upload.temp_path) == len(PNG)
+
+    for _ in range(10):
+        upload.write(b'\x00' * 512)
+    upload.flush()
+    # Rejected as soon as the limit was crossed; later chunks are dropped
+    assert upload.error.startswith('File is larger than')
+    assert os.path.getsize(upload.temp_path) == 0
+    with pytest.raises(ValueError):
+        upload.finish()
+    upload.close()
+    assert files_in(upload_dir) == []
+
+
+def test_spoofed_extension_is_rejected(upload_dir):
+    upload = HashingUploadFile('photo.png', directory=str(upload_dir), allowed_extensions={'png', 'pdf'})
+    upload.write(b'%PDF-1.4 not really a picture')
+    assert 'does not match its .png extension' in upload.error
+    upload.close()
+
+    # Too short to hold the signature: caught when the upload ends
+    upload = HashingUploadFile('tiny.png', directory=str(upload_dir), allowed_extensions={'png'})
+    upload.write(b'\x89PN')
+    with pytest.raises(ValueError, match='does not match'):
+        upload.finish()
+    upload.close()
+    assert files_in(upload_dir) == []
+
+
+def test_rejected_submissions_leave_no_files(app, upload_dir):
+    app.config['MAX_ATTACHMENT_SIZE'] = 1024
+    for filename, content in (
+        ('big.png', PNG + b'\x00' * 4096),
+        ('photo.png', b'%PDF-1.4 spoofed'),
+        ('script.exe', b'MZ'),
+    ):
+        response = submit(app, filename, content)
+        assert response.status_code == 302
+    assert files_in(upload_dir) == []
+    assert Complaint.query.count() == 0 and Attachment.query.count() == 0
+
+
+def test_valid_upload_lands_in_store(app, upload_dir):
+    response = submit(app, 'photo.png', PNG)
+    assert response.status_code == 200
+
+    sha256 = hashlib.sha256(PNG).hexdigest()
+    path = store_path(sha256)
+    with open(path, 'rb') as f:
+        assert f.read() == PNG
+    assert files_in(upload_dir) == [os.path.relpath(path, upload_dir)]
+
+    complaint = Complaint.query.one()
+    assert complaint.attachment_path == f'{sha256[:2]}/{sha256[2:4]}/{sha256}/photo.png'
+    assert Attachment.query.one().ref_count == 1
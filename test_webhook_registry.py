@@ -0,0 +1,37 @@
+"""
+Discord webhook registry: one query loads every lab's webhook, and lab
+changes made in this process are visible on the next lookup.
+"""
+from app.extensions import db
+from app.models import Lab
+from app.notifications import get_discord_webhook_for_lab
+
+
+def test_lab_changes_invalidate_the_registry(app, query_budget, monkeypatch):
+    monkeypatch.setenv('DISCORD_LAB_B_WEBHOOK', 'https://discord.test/env-b')
+    lab = Lab(name='Lab A')
+    db.session.add_all([lab, Lab(name='Lab B')])
+    db.session.commit()
+
+    assert get_discord_webhook_for_lab('Lab A') is None
+    with query_budget(0):
+        # Cached: later lookups, for any lab, run no SQL
+        assert get_discord_webhook_for_lab('Lab B') == 'https://discord.test/env-b'
+        assert get_discord_webhook_for_lab('Lab A') is None
+
+    lab.discord_webhook = 'https://discord.test/a'
+    db.session.commit()
+    assert get_discord_webhook_for_lab('Lab A') == 'https://discord.test/a'
+
+    lab.discord_webhook = '   '
+    db.session.commit()
+    assert get_discord_webhook_for_lab('Lab A') is None
+
+    # A database webhook wins over the environment; deleting the lab falls back
+    other = Lab.query.filter_by(name='Lab B').one()
+    other.discord_webhook = 'https://discord.test/b'
+    db.session.commit()
+    assert get_discord_webhook_for_lab('Lab B') == 'https://discord.test/b'
+    db.session.delete(other)
+    db.session.commit()
+    assert get_discord_webhook_for_lab('Lab B') == 'https://discord.test/env-b'